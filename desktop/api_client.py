@@ -1,13 +1,15 @@
 
 """Abstraction for accessing Flow-PT like entities.
 
-In development mode this uses :class:`dummy_server.fake_shotgun.FakeShotgun`.
-When ``USE_DUMMY_SHOTGUN`` is unset it falls back to ``shotgun_api3.Shotgun``.
+In development mode this uses :class:`dummy_server.fake_shotgun.FakeShotgun`,
+in-process or, with ``DUMMY_SHOTGUN_URL`` set, through the dummy server's
+HTTP endpoint.  When ``USE_DUMMY_SHOTGUN`` is unset it falls back to
+``shotgun_api3.Shotgun``.
 The exported helper functions keep the old interface used by the Qt bridge
 layer so the frontend does not need to change.
 """
 
-from typing import Any, List, Optional, Tuple
+from typing import Any, Callable, List, Optional, Tuple
 from decimal import Decimal
 
 import os
@@ -18,13 +20,55 @@ sys.path.append(BASE_DIR)
 sys.path.append(os.path.join(BASE_DIR, "dummy_server"))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dummy_server.settings')
 
-# import django
-# django.setup()
+import threading
 
 from shotgun_wrapper import ShotgunClient
 
+import entity_store
+import perf
+import startup_profile
 
-sg = ShotgunClient()
+# Record latency / SQL counts for every backend call when perf is enabled
+perf.instrument_class(ShotgunClient)
+
+
+class _LazyClient:
+    """Build :class:`ShotgunClient` (``django.setup`` etc.) on first use.
+
+    :func:`start_backend_init` constructs it on a background thread so the
+    window can appear first; calls made before it finishes wait on the lock.
+    """
+
+    def __init__(self) -> None:
+        self._client: Optional[ShotgunClient] = None
+        self._lock = threading.Lock()
+
+    def _get(self) -> ShotgunClient:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    with startup_profile.measure("django_setup"):
+                        self._client = ShotgunClient()
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get(), name)
+
+
+sg = _LazyClient()
+
+
+def start_backend_init() -> threading.Thread:
+    """Initialise the backend client off the UI thread."""
+    def _run() -> None:
+        try:
+            sg._get()
+        except Exception as e:
+            # The next bridge call retries and reports the error to the frontend
+            print(f"[api_client] backend init failed: {e}")
+    thread = threading.Thread(target=_run, name="backend-init", daemon=True)
+    thread.start()
+    return thread
 
 
 
@@ -155,20 +199,52 @@ entity_fields = {
     "WorkCategory": ["id", "name", "description"],
 }
 
+# --- Change notification ---
+# Listeners receive a list of change events
+# {"op": "create"|"update"|"delete", "type", "id", "fields", "data"}.
+_change_listeners: List[Callable[[List[dict]], None]] = []
+
+def add_change_listener(listener: Callable[[List[dict]], None]) -> None:
+    _change_listeners.append(listener)
+
+def remove_change_listener(listener: Callable[[List[dict]], None]) -> None:
+    if listener in _change_listeners:
+        _change_listeners.remove(listener)
+
+def _notify_changes(events: List[dict]) -> None:
+    if not events:
+        return
+    for listener in list(_change_listeners):
+        try:
+            listener(events)
+        except Exception as e:
+            print(f"[api_client] change listener failed: {e}")
+
+def _mirror(func, *args) -> None:
+    """Apply a change to the local entity store without failing the caller."""
+    try:
+        func(*args)
+    except Exception as e:
+        print(f"[entity_store] mirror failed: {e}")
+
 def get_entities(entity: str, filters: Optional[List] = None) -> Any:
     field_list = entity_fields.get(entity)
     data = sg.find(entity, filters or [], field_list)
+    startup_profile.mark("first_query")
     # 共通のフィールド名調整（内部でtypeチェック）
     data = adjust_field_names(data)
-    return _format_list(data)
+    result = _format_list(data)
+    return result
 
 def get_entity(entity: str, entity_id: int) -> Any:
     filters = [["id", "is", entity_id]]
     field_list = entity_fields.get(entity)
     data = sg.find_one(entity, filters, field_list)
+    startup_profile.mark("first_query")
     # 共通のフィールド名調整（内部でtypeチェック）
     data = adjust_field_names(data)
-    return _format_dict(data) if data else data
+    result = _format_dict(data) if data else data
+    return result
 
 
 # モデルごとのフィールドリマップルール
@@ -295,6 +371,162 @@ def fetch_project_page(project_id: int) -> Any:
     "milestoneTasks": milestone_tasks,
     }
 
+# PMMエクスポート用: Subproject単位で集計済みのPMMWorkloadとPhaseを取得
+_PMM_EXPORT_RECORD_FIELDS = ["name", "work_category", "week", "man_week"]
+
+def fetch_pmm_export_source(subproject_id: int, start_iso: Optional[str] = None,
+                            end_iso: Optional[str] = None, include_records: bool = True) -> Optional[dict]:
+    """Export payload for ``pmm_export`` read straight from the backend.
+
+    The Manpower matrix comes from one grouped ``summarize`` call
+    (work_category x week) as ``pivot_rows``; ``records`` (only the columns
+    of the 4QV2 sheet) are fetched when *include_records* is set.  Weeks
+    can be limited to ``start_iso``..``end_iso``.  Returns None when the
+    subproject does not exist.
+    """
+    subproject = get_entity("Subproject", subproject_id)
+    if not subproject:
+        return None
+    filters: List = [["subproject", "is", {"type": "Subproject", "id": subproject_id}]]
+    if start_iso:
+        filters.append(["week", ">=", start_iso])
+    if end_iso:
+        filters.append(["week", "<=", end_iso])
+
+    # The dummy backends keep work_category x week totals in PMMWeekRollup
+    if supports_rollups():
+        entity, count = "PMMWeekRollup", {"field": "rows", "type": "sum"}
+    else:
+        entity, count = "PMMWorkload", {"field": "id", "type": "count"}
+    summary = sg.summarize(
+        entity, filters,
+        [{"field": "man_week", "type": "sum"}, count],
+        grouping=[{"field": "work_category", "type": "exact", "direction": "asc"},
+                  {"field": "week", "type": "exact", "direction": "asc"}],
+    )
+    pivot_rows = []
+    for category in summary.get("groups") or []:
+        name = category.get("group_name") or None
+        for week in category.get("groups") or []:
+            sums = week.get("summaries") or {}
+            pivot_rows.append([name, week.get("group_value"), _format_value(sums.get("man_week") or 0),
+                               int(sums.get(count["field"]) or 0)])
+
+    records: List[dict] = []
+    if include_records:
+        # Partial rows: not mirrored into entity_store (they would overwrite full rows)
+        records = _format_list(sg.find("PMMWorkload", filters, _PMM_EXPORT_RECORD_FIELDS))
+    return {
+        "subproject": {"id": subproject["id"], "name": subproject.get("name")},
+        "records": records,
+        "phases": get_entities("Phase", [["subproject", "is", subproject_id]]),
+        "pivot_rows": pivot_rows,
+    }
+
+
+# PersonWorkload export: secondary grouping -> summarize field
+_PERSON_EXPORT_GROUPS = {
+    "task": "task",
+    "subproject": "task.asset.phase.subproject",
+}
+
+
+def fetch_person_workload_export_source(start_iso: str, end_iso: str,
+                                        person_ids: Optional[List[int]] = None,
+                                        group_by: Optional[str] = None) -> dict:
+    """Person x week man_week totals for ``person_workload_export``.
+
+    One grouped ``summarize`` call (person[, task | subproject], week) over
+    the weeks ``start_iso``..``end_iso``; no PersonWorkload rows are fetched.
+    *person_ids* limits the persons (all persons when empty) and *group_by*
+    ("task" / "subproject") adds a second row key.
+
+    Returns ``{"range", "group_by", "persons", "rows"}`` where rows are
+    ``[person_id, group_id, group_name, week_iso, total]``.
+    """
+    if group_by and group_by not in _PERSON_EXPORT_GROUPS:
+        raise ValueError(f"Unsupported group_by: {group_by}")
+    filters: List = [["week", ">=", start_iso], ["week", "<=", end_iso]]
+    person_filters: List = []
+    if person_ids:
+        filters.append(["person", "in", list(person_ids)])
+        person_filters.append(["id", "in", list(person_ids)])
+
+    grouping = [{"field": "person", "type": "exact", "direction": "asc"}]
+    if group_by:
+        grouping.append({"field": _PERSON_EXPORT_GROUPS[group_by], "type": "exact", "direction": "asc"})
+    grouping.append({"field": "week", "type": "exact", "direction": "asc"})
+    # Without a second key the person x week totals are precomputed on the dummy backends
+    entity = "PersonWeekRollup" if not group_by and supports_rollups() else "PersonWorkload"
+    summary = sg.summarize(entity, filters, [{"field": "man_week", "type": "sum"}], grouping=grouping)
+
+    def _weeks(node: dict, person_id: Any, group: Optional[dict], rows: List) -> None:
+        for week in node.get("groups") or []:
+            total = _format_value((week.get("summaries") or {}).get("man_week") or 0)
+            rows.append([person_id, (group or {}).get("id"), (group or {}).get("name"), week.get("group_value"), total])
+
+    rows: List[list] = []
+    for person in summary.get("groups") or []:
+        person_id = (person.get("group_value") or {}).get("id")
+        if group_by:
+            for group in person.get("groups") or []:
+                _weeks(group, person_id, group.get("group_value"), rows)
+        else:
+            _weeks(person, person_id, None, rows)
+
+    persons = [{"id": p["id"], "name": p.get("name")} for p in sg.find("Person", person_filters, ["id", "name"])]
+    return {"range": [start_iso, end_iso], "group_by": group_by, "persons": persons, "rows": rows}
+
+
+def fetch_over_allocations(start_iso: str, end_iso: str, threshold: float = 1.0,
+                           person_ids: Optional[List[int]] = None,
+                           department_ids: Optional[List[int]] = None) -> dict:
+    """Person x week man_week totals above *threshold* in the weeks ``start_iso``..``end_iso``.
+
+    One grouped ``summarize`` (person, week).  On the dummy backends it runs
+    on ``PersonWeekRollup``, where the person x week sums are kept, so the
+    threshold is an indexed ``man_week > threshold`` filter; otherwise on
+    PersonWorkload with the groups filtered here, as ShotGrid has no
+    HAVING.  *person_ids* / *department_ids* limit the persons.
+
+    Returns ``{"range", "threshold", "rows"}`` with rows
+    ``{"person": {"id", "name"}, "week", "total", "excess"}`` ordered by
+    person name and week.
+    """
+    filters: List = [["week", ">=", start_iso], ["week", "<=", end_iso]]
+    if person_ids:
+        filters.append(["person", "in", list(person_ids)])
+    if department_ids:
+        filters.append(["person.department", "in", list(department_ids)])
+
+    if supports_rollups():
+        # One row per person x week: the threshold is a plain (indexed) filter
+        entity, filters = "PersonWeekRollup", filters + [["man_week", ">", threshold]]
+    else:
+        entity = "PersonWorkload"
+    summary = sg.summarize(
+        entity, filters, [{"field": "man_week", "type": "sum"}],
+        grouping=[{"field": "person", "type": "exact"}, {"field": "week", "type": "exact"}],
+    )
+    cells: List[Tuple[dict, Any, float]] = []
+    for person in summary.get("groups") or []:
+        for week in person.get("groups") or []:
+            total = float((week.get("summaries") or {}).get("man_week") or 0)
+            if total > threshold:
+                cells.append((person.get("group_value") or {}, week.get("group_value"), total))
+
+    rows = [
+        {
+            "person": {"id": p.get("id"), "name": p.get("name")},
+            "week": week,
+            "total": round(total, 6),
+            "excess": round(total - threshold, 6),
+        }
+        for p, week, total in sorted(cells, key=lambda c: (c[0].get("name") or "", c[0].get("id") or 0, c[1] or ""))
+    ]
+    return {"range": [start_iso, end_iso], "threshold": threshold, "rows": rows}
+
+
 # メンバーリストにあるpersonに関連する情報を取得
 def _parse_iso_date(s: str) -> datetime.date:
     return datetime.date.fromisoformat(s)
@@ -387,7 +619,12 @@ def create_entity(data: dict) -> Any:
         data.pop("type")  # typeフィールドは削除
         result = sg.create(entity_type, data, fields)
         result = adjust_field_names(result)
-        return _format_dict(result)
+        result = _format_dict(result)
+        _mirror(entity_store.upsert_entity, result)
+        if result and result.get("id") is not None:
+            _notify_changes([{"op": "create", "type": result.get("type") or entity_type, "id": result["id"],
+                              "fields": list(result.keys()), "data": result}])
+        return result
     except Exception as e:
         return {"error": True, "message": str(e)}
 
@@ -398,17 +635,103 @@ def update_entity(entity_id: int, data: dict) -> Any:
         sg.update(entity_type, entity_id, data)
         result = get_entity(entity_type, entity_id)
         result = adjust_field_names(result)
-        return _format_dict(result)
+        result = _format_dict(result)
+        if result:
+            _mirror(entity_store.upsert_entity, result)
+            _notify_changes([{"op": "update", "type": entity_type, "id": entity_id,
+                              "fields": list(data.keys()), "data": result}])
+        return result
     except Exception as e:
         return {"error": True, "message": str(e)}
 
 def delete_entity(entity_type: str, entity_id: int) -> bool:
     try:
-        return sg.delete(entity_type, entity_id)
+        deleted = sg.delete(entity_type, entity_id)
+        if deleted:
+            _mirror(entity_store.delete_entity, entity_type, entity_id)
+            _notify_changes([{"op": "delete", "type": entity_type, "id": entity_id, "fields": [], "data": None}])
+        return deleted
     except Exception as e:
         return {"error": True, "message": str(e)}
     
 
+_NO_CASCADE_DELETE = "Cascading delete is not available on this backend"
+
+
+def preview_delete(entity_type: str, entity_id: int) -> dict:
+    """What deleting the entity would take with it, counted on the backend.
+
+    Returns ``{"success": True, "found", "deleted": {type: rows},
+    "updated": {"Type.field": rows}}`` (``deleted`` includes the entity
+    itself), or ``{"success": False, "error"}``.
+    """
+    if not supports_cascade_delete():
+        return {"success": False, "error": _NO_CASCADE_DELETE}
+    try:
+        return {"success": True, **sg.delete_impact(entity_type, entity_id)}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def delete_entity_cascade(entity_type: str, entity_id: int) -> dict:
+    """Delete the entity and its dependents in one backend transaction.
+
+    Returns the rows removed in the format of :func:`preview_delete`;
+    ``success`` is False when the entity did not exist.  Every removed row
+    is purged from entity_store (so no snapshot shows it again) and
+    announced as a ``delete`` event; rows that only lost a link are re-read
+    and announced as ``update`` events.
+    """
+    if not supports_cascade_delete():
+        return {"success": False, "error": _NO_CASCADE_DELETE}
+    try:
+        result = sg.delete_cascade(entity_type, entity_id)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    if result.get("found"):
+        ids = result.get("ids") or {}
+        deleted = [(t, i) for t, id_list in (ids.get("deleted") or {}).items() for i in id_list]
+        _mirror(entity_store.delete_entities, deleted)
+        # Only the entity types the frontend holds (not rollups or M2M link tables)
+        events = [{"op": "delete", "type": t, "id": i, "fields": [], "data": None}
+                  for t, i in deleted if t in entity_fields]
+        for t, id_list in (ids.get("changed") or {}).items():
+            if t not in entity_fields or not id_list:
+                continue
+            try:
+                rows = get_entities(t, [["id", "in", id_list]])
+            except Exception as e:
+                print(f"[api_client] re-read after cascade failed: {e}")
+                continue
+            _mirror(entity_store.upsert_entities, rows)
+            events.extend({"op": "update", "type": t, "id": row["id"], "fields": list(row.keys()), "data": row}
+                          for row in rows)
+        _notify_changes(events)
+    return {"success": bool(result.get("found")), **result}
+
+
+def transaction():
+    """Context manager running the enclosed writes in one backend transaction.
+
+    Falls back to a no-op when the backend has no transactions (shotgun_api3).
+    """
+    return sg.transaction()
+
+
+def supports_transactions() -> bool:
+    return bool(getattr(sg._get(), "supports_transactions", False))
+
+
+def supports_rollups() -> bool:
+    """Whether the backend has the weekly rollup entities (PersonWeekRollup etc.)."""
+    return bool(getattr(sg._get(), "supports_rollups", False))
+
+
+def supports_cascade_delete() -> bool:
+    """Whether the backend offers :func:`preview_delete` / :func:`delete_entity_cascade` (dummy backends)."""
+    return bool(getattr(sg._get(), "supports_cascade_delete", False))
+
+
 # --- Edit Lock Control ---
 def acquire_edit_lock(subproject_id: int, user_id: int) -> dict:
     """
@@ -1,3 +1,5 @@
+import startup_profile  # noqa: I001 - first import; marks t0 for --profile-startup
+
 import os
 import sys
 import webbrowser
@@ -15,10 +17,15 @@ from PySide6.QtWebChannel import QWebChannel
 from PySide6.QtWebSockets import QWebSocketServer
 from PySide6.QtNetwork import QHostAddress
 
+# webchannel_bridge -> api_client is cheap to import: Django and the backend
+# client are initialised by api_client.start_backend_init() after the window shows.
+import api_client
 from webchannel_bridge import DataBridge
 from websocket_transport import WebSocketTransport
 from app_config import load_config
 
+startup_profile.mark("import")
+
 os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = "--enable-logging --log-level=0"
 
 
@@ -55,6 +62,7 @@ class AppWindow(QMainWindow):
         self.channel = QWebChannel(self.view.page())
         self.channel.registerObject("dataBridge", self.data_bridge)
         self.view.page().setWebChannel(self.channel)
+        self.view.loadFinished.connect(lambda _ok: startup_profile.mark("first_paint"))
         print("[QWebChannel] Objects:", self.channel.registeredObjects())
 
         build_path = os.path.abspath(
@@ -115,8 +123,18 @@ class AppWindow(QMainWindow):
 
 
 if __name__ == "__main__":
+    # Bulk PMM export renders workbooks in worker processes (needed for frozen builds)
+    import multiprocessing
+    multiprocessing.freeze_support()
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        startup_profile.enable()
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(startup_profile.report)
     win = AppWindow()
     if win.config.get("mode", "desktop") == "desktop":
         win.show()
+    # Django setup / backend client construction runs while the web view loads;
+    # the first bridge call blocks until it is ready.
+    api_client.start_backend_init()
     sys.exit(app.exec())
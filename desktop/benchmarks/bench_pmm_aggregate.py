@@ -0,0 +1,101 @@
+"""Benchmark the PMM pivot aggregation (NumPy vs pure-Python fallback).
+
+Usage:
+    python desktop/benchmarks/bench_pmm_aggregate.py [--records 500000] [--repeat 3]
+"""
+
+import argparse
+import datetime as dt
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pmm_export  # noqa: E402
+
+
+def make_records(n: int, categories: int = 40, weeks: int = 156, seed: int = 1) -> list:
+    rnd = random.Random(seed)
+    base = dt.date(2025, 1, 6)
+    week_isos = [(base + dt.timedelta(weeks=k)).isoformat() for k in range(weeks)]
+    cats = [{"type": "WorkCategory", "id": i + 1, "name": f"Category {i + 1:02d}"} for i in range(categories)]
+    return [
+        {
+            "type": "PMMWorkload",
+            "id": i + 1,
+            "name": f"PMM {i + 1}",
+            "work_category": rnd.choice(cats),
+            "week": rnd.choice(week_isos),
+            "man_week": round(rnd.uniform(0, 5), 2),
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_aggregate(records: list) -> dict:
+    """The per-record aggregation used before build_pivot (reference timing)."""
+    agg = {}
+    earliest = None
+    for r in records:
+        week = r.get("week")
+        if not week:
+            continue
+        week_date = dt.date.fromisoformat(week)
+        if earliest is None or week_date < earliest:
+            earliest = week_date
+        wc = r.get("work_category") or {}
+        name = wc.get("name") or "Unassigned"
+        try:
+            fval = float(r.get("man_week") or 0)
+        except Exception:
+            fval = 0.0
+        agg[(name, week)] = agg.get((name, week), 0.0) + fval
+    return agg
+
+
+def _best_of(repeat: int, fn, *args):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"generating {args.records} records ...")
+    records = make_records(args.records)
+
+    t_legacy, _ = _best_of(args.repeat, legacy_aggregate, records)
+    print(f"legacy      : {t_legacy * 1000:9.1f} ms")
+    t_py, pivot_py = _best_of(args.repeat, pmm_export.build_pivot, records, False)
+    print(f"pure python : {t_py * 1000:9.1f} ms  ({t_legacy / t_py:.1f}x)")
+    if pmm_export._np is None:
+        print("numpy       : not installed")
+        return
+    t_np, pivot_np = _best_of(args.repeat, pmm_export.build_pivot, records, True)
+    print(f"numpy       : {t_np * 1000:9.1f} ms  ({t_legacy / t_np:.1f}x)")
+
+    same = (
+        pivot_py.categories == pivot_np.categories
+        and pivot_py.weeks == pivot_np.weeks
+        and all(
+            abs(a - b) < 1e-6
+            for i in range(len(pivot_py.categories))
+            for a, b in zip(pivot_py.row(i), pivot_np.row(i))
+        )
+    )
+    print(f"results match: {same}")
+
+
+if __name__ == "__main__":
+    main()
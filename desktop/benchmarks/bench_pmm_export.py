@@ -0,0 +1,272 @@
+"""Benchmark the PMM CSV / XLSX exports on synthetic datasets.
+
+Generates payloads (records, phases, work categories) at several scales and a
+matching template, runs the exports and records per stage (aggregate,
+template, manpower, rows, save -- as reported through the exporters'
+progress callback) the wall time and the tracemalloc peak, plus the total
+time and output size.  Results are written as JSON; ``--compare`` prints the
+ratio against an earlier result file.
+
+With the stream engine "manpower" also covers serialising the template
+workbook, and "rows" streaming the 4QV2 sheet into the package.
+
+Timings come from runs without tracemalloc (best of ``--repeat``); memory is
+measured in one extra traced run, since tracing slows Python code down.
+
+Usage:
+    python desktop/benchmarks/bench_pmm_export.py [--scales small,medium,large]
+        [--formats csv,xlsx] [--engine stream] [--repeat 3]
+        [--output result.json] [--compare baseline.json]
+"""
+
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pmm_export  # noqa: E402
+
+# name -> (records, categories, weeks, phases)
+SCALES = {
+    "small": (2_000, 20, 52, 4),
+    "medium": (20_000, 40, 104, 8),
+    "large": (100_000, 60, 156, 12),
+}
+
+
+def make_payload(records: int, categories: int, weeks: int, phases: int, seed: int = 1) -> dict:
+    rnd = random.Random(seed)
+    base = dt.date(2025, 1, 6)
+    week_isos = [(base + dt.timedelta(weeks=k)).isoformat() for k in range(weeks)]
+    cats = [{"type": "WorkCategory", "id": i + 1, "name": f"Category {i + 1:02d}"} for i in range(categories)]
+    span = max(1, weeks // phases)
+    phase_list = [
+        {
+            "type": "Phase",
+            "id": k + 1,
+            "name": f"Phase {k + 1}",
+            "end_date": (base + dt.timedelta(weeks=span * (k + 1), days=-1)).isoformat(),
+            "milestone": False,
+        }
+        for k in range(phases)
+    ]
+    recs = [
+        {
+            "type": "PMMWorkload",
+            "id": i + 1,
+            "name": f"PMM {i + 1}",
+            "work_category": rnd.choice(cats),
+            "week": rnd.choice(week_isos),
+            "man_week": round(rnd.uniform(0, 5), 2),
+        }
+        for i in range(records)
+    ]
+    return {
+        "subproject": {"type": "Subproject", "id": 1, "name": "Benchmark"},
+        "records": recs,
+        "phases": phase_list,
+    }
+
+
+def make_template(path: str, categories: int) -> None:
+    """Manpower sheet with one row per category and a styled 4QV2 sheet."""
+    import openpyxl
+    from openpyxl.styles import Font, PatternFill
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Manpower Sheet"
+    ws["A1"] = "PMM"
+    ws["A2"] = "Start"
+    for i in range(categories):
+        ws.cell(row=5 + i, column=1, value=f"Category {i + 1:02d}")
+    ws_list = wb.create_sheet(pmm_export.LIST_SHEET_NAME)
+    headers = ["Name", "Work Category", "Man Week", "Year", "Month", "Week", "Phase"]
+    for col, header in enumerate(headers, 1):
+        ws_list.cell(row=1, column=col, value=header).font = Font(bold=True)
+        proto = ws_list.cell(row=2, column=col)
+        proto.fill = PatternFill("solid", fgColor="FFF2CC")
+        if col == 3:
+            proto.number_format = "0.00"
+    wb.save(path)
+
+
+class StageRecorder:
+    """Progress callback that times the stages it sees (and their memory peak)."""
+
+    def __init__(self, trace_memory: bool = False) -> None:
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self._stage = None
+        self._started = 0.0
+
+    def __call__(self, stage: str, done: int = 0, total: int = 0) -> None:
+        if stage != self._stage:
+            self._close()
+            self._stage = stage
+            self._started = time.perf_counter()
+
+    def _close(self) -> None:
+        if self._stage is None:
+            return
+        entry = self.stages.setdefault(self._stage, {"ms": 0.0})
+        entry["ms"] += (time.perf_counter() - self._started) * 1000.0
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            entry["peak_kb"] = max(entry.get("peak_kb", 0), peak // 1024)
+            tracemalloc.reset_peak()
+
+    def finish(self) -> dict:
+        self._close()
+        self._stage = None
+        return self.stages
+
+
+def _export(fmt: str, payload: dict, template: str, out_path: str, engine: str,
+            use_template_cache: bool, recorder: StageRecorder) -> dict:
+    if fmt == "csv":
+        return pmm_export.export_pmm_workloads_to_csv(payload, out_path, progress=recorder)
+    return pmm_export.export_pmm_workloads_to_xlsx(
+        payload, template, out_path, engine=engine, use_template_cache=use_template_cache, progress=recorder)
+
+
+def run_case(fmt: str, payload: dict, template: str, workdir: str, engine: str,
+             repeat: int, use_template_cache: bool) -> dict:
+    out_path = os.path.join(workdir, f"out.{fmt}")
+    best_ms = None
+    best_stages = {}
+    for _ in range(repeat):
+        recorder = StageRecorder()
+        start = time.perf_counter()
+        result = _export(fmt, payload, template, out_path, engine, use_template_cache, recorder)
+        elapsed = (time.perf_counter() - start) * 1000.0
+        stages = recorder.finish()
+        if not result.get("success"):
+            raise RuntimeError(f"{fmt} export failed: {result.get('error')}")
+        if best_ms is None or elapsed < best_ms:
+            best_ms, best_stages = elapsed, stages
+
+    recorder = StageRecorder(trace_memory=True)
+    tracemalloc.start()
+    try:
+        _export(fmt, payload, template, out_path, engine, use_template_cache, recorder)
+        recorder.finish()
+        peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+    for stage, mem in recorder.stages.items():
+        best_stages.setdefault(stage, {"ms": 0.0})["peak_kb"] = mem.get("peak_kb")
+
+    return {
+        "wall_ms": round(best_ms, 1),
+        "peak_kb": max([peak_kb] + [s.get("peak_kb") or 0 for s in best_stages.values()]),
+        "output_bytes": os.path.getsize(out_path),
+        "stages": {name: {"ms": round(s["ms"], 1), "peak_kb": s.get("peak_kb")} for name, s in best_stages.items()},
+    }
+
+
+def _case_key(entry: dict) -> tuple:
+    return entry["scale"], entry["format"], entry.get("engine")
+
+
+def compare(current: dict, baseline_path: str) -> None:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    old = {_case_key(e): e for e in baseline.get("results", [])}
+    print(f"\ncompared with {baseline_path} (new / old):")
+    for entry in current["results"]:
+        prev = old.get(_case_key(entry))
+        if prev is None:
+            continue
+        label = "/".join(str(x) for x in _case_key(entry) if x)
+        parts = [f"total {entry['wall_ms'] / max(prev['wall_ms'], 0.1):.2f}x",
+                 f"peak {entry['peak_kb'] / max(prev['peak_kb'], 1):.2f}x"]
+        for stage, s in entry["stages"].items():
+            p = prev.get("stages", {}).get(stage)
+            if p and p.get("ms"):
+                parts.append(f"{stage} {s['ms'] / p['ms']:.2f}x")
+        print(f"  {label:24s} " + "  ".join(parts))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="small,medium,large",
+                        help=f"comma separated, from {', '.join(SCALES)}")
+    parser.add_argument("--formats", default="csv,xlsx")
+    parser.add_argument("--engine", default=pmm_export.ENGINE_STREAM,
+                        choices=[pmm_export.ENGINE_STREAM, pmm_export.ENGINE_OPENPYXL])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-template-cache", action="store_true",
+                        help="parse the template on every XLSX export")
+    parser.add_argument("--output", default=None, help="result JSON (default: bench_pmm_export-<time>.json)")
+    parser.add_argument("--compare", default=None, help="earlier result JSON to compare with")
+    args = parser.parse_args()
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    for s in scales:
+        if s not in SCALES:
+            parser.error(f"unknown scale: {s}")
+
+    try:
+        import openpyxl
+        openpyxl_version = openpyxl.__version__
+    except Exception:
+        openpyxl_version = None
+    report = {
+        "created": dt.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": getattr(pmm_export._np, "__version__", None),
+        "openpyxl": openpyxl_version,
+        "repeat": args.repeat,
+        "template_cache": not args.no_template_cache,
+        "results": [],
+    }
+
+    workdir = tempfile.mkdtemp(prefix="bench_pmm_export_")
+    # Keep the parsed templates of the run out of the user's cache
+    saved_cache_dir = pmm_export.TEMPLATE_CACHE_DIR
+    pmm_export.TEMPLATE_CACHE_DIR = os.path.join(workdir, "pmm_templates")
+    try:
+        for scale in scales:
+            n, categories, weeks, phases = SCALES[scale]
+            payload = make_payload(n, categories, weeks, phases)
+            template = os.path.join(workdir, f"template_{scale}.xlsx")
+            make_template(template, categories)
+            for fmt in formats:
+                engine = args.engine if fmt == "xlsx" else None
+                print(f"{scale:7s} {fmt:4s} {n:>8d} records ...", end=" ", flush=True)
+                res = run_case(fmt, payload, template, workdir, engine, args.repeat, not args.no_template_cache)
+                print(f"{res['wall_ms']:9.1f} ms  peak {res['peak_kb'] / 1024:7.1f} MiB  "
+                      f"{res['output_bytes'] / 1024:8.1f} KiB")
+                for stage, s in res["stages"].items():
+                    print(f"        {stage:10s} {s['ms']:9.1f} ms  peak {(s['peak_kb'] or 0) / 1024:7.1f} MiB")
+                report["results"].append({
+                    "scale": scale, "format": fmt, "engine": engine,
+                    "records": n, "categories": categories, "weeks": weeks, "phases": phases,
+                    **res,
+                })
+    finally:
+        pmm_export.TEMPLATE_CACHE_DIR = saved_cache_dir
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or f"bench_pmm_export-{dt.datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
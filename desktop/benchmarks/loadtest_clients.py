@@ -0,0 +1,283 @@
+"""Load test: N virtual desktop clients against the dummy backend.
+
+Every virtual client is a separate process (like a planner's desktop app)
+that loads the app once and then loops over a weighted mix of
+``api_client`` flows with an exponentially distributed think time:
+
+- ``init_load``: the start-up load (distribute page + basic data)
+- ``project_page``: ``fetch_project_page`` of the client's own subproject
+  (or, one time in four, another one)
+- ``assignment``: the next 4-week window of the Assignment page
+  (``fetch_assignment_tasks`` + ``fetch_assignment_workloads``)
+- ``update``: ``update_entity`` of a PersonWorkload of the own subproject
+- ``edit_lock``: acquire the edit lock of the own subproject, then heartbeat
+  it while held (released when the run ends)
+
+Per operation it reports throughput, p50/p95/p99 latency, errors, and of
+those the "database is locked" errors; ``edit_lock`` also counts conflicts
+(the lock is held by another client), which are not errors.
+
+The backend is the one ``api_client`` would use: in-process Django
+(``DUMMY_DB_PATH`` / ``DUMMY_DB_PROFILE`` apply) or, with ``--url``, the
+dummy server's HTTP endpoint (``DUMMY_SHOTGUN_URL``).  Each client mirrors
+into an in-memory entity store so the clients do not share a local file.
+
+Usage:
+    python desktop/benchmarks/loadtest_clients.py [--clients 8] [--duration 30]
+        [--think-ms 500] [--ramp 5] [--url http://127.0.0.1:8000]
+        [--mix init_load=1,project_page=4,assignment=4,update=3,edit_lock=2]
+        [--output result.json]
+"""
+
+import argparse
+import datetime as dt
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import time
+import traceback
+
+DESKTOP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OPERATIONS = ("init_load", "project_page", "assignment", "update", "edit_lock")
+DEFAULT_MIX = "init_load=1,project_page=4,assignment=4,update=3,edit_lock=2"
+
+# Lock conflicts of SQLite, as raised in-process or relayed by the RPC endpoint
+_DB_LOCKED = ("database is locked", "database table is locked")
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"unknown operation: {name} (from {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    if not any(w > 0 for w in mix.values()):
+        raise ValueError("the mix needs at least one operation with a positive weight")
+    return mix
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+class VirtualClient:
+    """One planner: own user, own subproject, own position in the assignment window."""
+
+    WINDOW_WEEKS = 4
+
+    def __init__(self, api_client, index: int, seed: int) -> None:
+        self.api = api_client
+        self.rnd = random.Random(seed * 1000 + index)
+        persons = api_client.get_entities("Person")
+        subprojects = api_client.get_entities("Subproject")
+        if not persons or not subprojects:
+            raise RuntimeError("the backend has no Person / Subproject rows (run generate_sample_data)")
+        self.user_id = persons[index % len(persons)]["id"]
+        self.subproject_ids = [s["id"] for s in subprojects]
+        self.home = self.subproject_ids[index % len(self.subproject_ids)]
+        first, last = self._week_range()
+        self.first_week, self.last_week = first, last
+        self.window = first + dt.timedelta(weeks=self.rnd.randrange(max(1, (last - first).days // 7)))
+        self.workload_ids = []
+        self.holds_lock = False
+
+    def _week_range(self):
+        sg = self.api.sg
+        bounds = []
+        for kind in ("min", "max"):
+            s = sg.summarize("PersonWorkload", [], [{"field": "week", "type": kind}])
+            bounds.append(s["summaries"].get("week"))
+        if not all(bounds):
+            today = dt.date.today()
+            return today, today + dt.timedelta(weeks=52)
+        return dt.date.fromisoformat(bounds[0]), dt.date.fromisoformat(bounds[1])
+
+    # --- operations: return "conflict" for an edit lock held by someone else
+
+    def init_load(self):
+        self.api.init_load(self.home, [], (self.window.isoformat(), self.window.isoformat()), self.user_id)
+
+    def project_page(self):
+        sp = self.home if self.rnd.random() < 0.75 else self.rnd.choice(self.subproject_ids)
+        page = self.api.fetch_project_page(sp)
+        if sp == self.home:
+            self.workload_ids = [w["id"] for w in page.get("personworkloads") or []]
+
+    def assignment(self):
+        start = self.window
+        end = start + dt.timedelta(weeks=self.WINDOW_WEEKS, days=-1)
+        self.api.fetch_assignment_tasks(start.isoformat(), end.isoformat())
+        self.api.fetch_assignment_workloads(start.isoformat(), end.isoformat())
+        self.window = start + dt.timedelta(weeks=self.WINDOW_WEEKS)
+        if self.window > self.last_week:
+            self.window = self.first_week
+
+    def update(self):
+        if not self.workload_ids:
+            self.project_page()
+        if not self.workload_ids:
+            return None
+        result = self.api.update_entity(self.rnd.choice(self.workload_ids), {
+            "type": "PersonWorkload", "man_week": round(self.rnd.uniform(0.1, 1.0), 1)})
+        if isinstance(result, dict) and result.get("error"):
+            raise RuntimeError(result.get("message") or "update failed")
+
+    def edit_lock(self):
+        if self.holds_lock:
+            result = self.api.heartbeat_edit_lock(self.home, self.user_id)
+        else:
+            result = self.api.acquire_edit_lock(self.home, self.user_id)
+        self.holds_lock = bool(result.get("success"))
+        return None if self.holds_lock else "conflict"
+
+    def release(self):
+        if self.holds_lock:
+            self.api.release_edit_lock(self.home, self.user_id)
+            self.holds_lock = False
+
+
+def _run_client(args):
+    index, backend_url, mix, think_ms, start_at, duration, seed = args
+    if backend_url:
+        os.environ["DUMMY_SHOTGUN_URL"] = backend_url
+    sys.path.insert(0, DESKTOP_DIR)
+    import api_client
+    import entity_store
+
+    entity_store.configure(":memory:")
+    stats = {op: {"latencies": [], "errors": 0, "db_locked": 0, "conflicts": 0, "last_error": None} for op in mix}
+    try:
+        client = VirtualClient(api_client, index, seed)
+    except Exception as e:
+        return {"index": index, "setup_error": "".join(traceback.format_exception_only(type(e), e)).strip(), "stats": stats}
+
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    time.sleep(max(0.0, start_at - time.time()))
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        op = client.rnd.choices(names, weights)[0]
+        st = stats[op]
+        t0 = time.perf_counter()
+        try:
+            outcome = getattr(client, op)()
+            st["latencies"].append(time.perf_counter() - t0)
+            if outcome == "conflict":
+                st["conflicts"] += 1
+        except Exception as e:
+            st["errors"] += 1
+            st["last_error"] = str(e)[:200]
+            if any(m in str(e).lower() for m in _DB_LOCKED):
+                st["db_locked"] += 1
+        if think_ms > 0:
+            time.sleep(min(client.rnd.expovariate(1000.0 / think_ms), max(0.0, end - time.perf_counter())))
+    try:
+        client.release()
+    except Exception:
+        pass
+    return {"index": index, "stats": stats}
+
+
+def summarize_results(results, duration: float) -> dict:
+    ops = {}
+    for op in OPERATIONS:
+        per_client = [r["stats"][op] for r in results if op in r["stats"]]
+        if not per_client:
+            continue
+        lat = [x for s in per_client for x in s["latencies"]]
+        calls = len(lat) + sum(s["errors"] for s in per_client)
+        ms = lambda v: None if v is None else round(v * 1000.0, 2)  # noqa: E731
+        ops[op] = {
+            "calls": calls,
+            "per_s": round(calls / duration, 2),
+            "p50_ms": ms(_percentile(lat, 0.50)),
+            "p95_ms": ms(_percentile(lat, 0.95)),
+            "p99_ms": ms(_percentile(lat, 0.99)),
+            "max_ms": ms(max(lat) if lat else None),
+            "errors": sum(s["errors"] for s in per_client),
+            "error_rate": round(sum(s["errors"] for s in per_client) / calls, 4) if calls else 0.0,
+            "db_locked": sum(s["db_locked"] for s in per_client),
+            "conflicts": sum(s["conflicts"] for s in per_client),
+            "conflict_rate": round(sum(s["conflicts"] for s in per_client) / calls, 4) if calls else 0.0,
+            "last_error": next((s["last_error"] for s in per_client if s["last_error"]), None),
+        }
+    return ops
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load per client")
+    parser.add_argument("--think-ms", type=float, default=500.0, help="mean think time between operations (0: none)")
+    parser.add_argument("--ramp", type=float, default=0.0, help="seconds over which the clients start")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation=weight,... (default: %(default)s)")
+    parser.add_argument("--url", default=os.environ.get("DUMMY_SHOTGUN_URL"),
+                        help="dummy server URL (default: in-process Django backend)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="write the result as JSON")
+    args = parser.parse_args()
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    backend = args.url or "in-process ({})".format(os.environ.get("DUMMY_DB_PROFILE", "default"))
+    print(f"{args.clients} clients, {args.duration:.0f}s, think {args.think_ms:.0f} ms, backend {backend}")
+    # Leave time for every client to import the backend and load its start-up data
+    start_at = time.time() + 5.0 + 0.5 * args.clients
+    jobs = [
+        (i, args.url, mix, args.think_ms, start_at + (args.ramp * i / max(1, args.clients)), args.duration, args.seed)
+        for i in range(args.clients)
+    ]
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(args.clients) as pool:
+        results = pool.map(_run_client, jobs)
+
+    for r in results:
+        if r.get("setup_error"):
+            print(f"  client {r['index']} failed to start: {r['setup_error']}")
+    window = args.duration + args.ramp
+    ops = summarize_results(results, window)
+    print(f"{'operation':13s} {'calls':>7s} {'/s':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} "
+          f"{'errors':>7s} {'locked':>7s} {'conflict':>8s}")
+    fmt = lambda v: "-" if v is None else f"{v:.1f}"  # noqa: E731
+    for op, s in ops.items():
+        print(f"{op:13s} {s['calls']:7d} {s['per_s']:7.2f} {fmt(s['p50_ms']):>8s} {fmt(s['p95_ms']):>8s} "
+              f"{fmt(s['p99_ms']):>8s} {s['error_rate']:6.1%} {s['db_locked']:7d} {s['conflict_rate']:7.1%}")
+    for op, s in ops.items():
+        if s["last_error"]:
+            print(f"  {op}: {s['last_error']}")
+
+    if args.output:
+        report = {
+            "created": dt.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": backend,
+            "db_profile": os.environ.get("DUMMY_DB_PROFILE", "default"),
+            "clients": args.clients,
+            "duration": args.duration,
+            "think_ms": args.think_ms,
+            "ramp": args.ramp,
+            "mix": mix,
+            "failed_clients": sum(1 for r in results if r.get("setup_error")),
+            "operations": ops,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
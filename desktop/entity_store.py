@@ -0,0 +1,256 @@
+"""Persistent local mirror of backend entities (SQLite).
+
+Page results (``init_load``, ``fetch_project_page`` ...) are saved as
+*snapshots* in ``entities.sqlite3`` next to ``cache.json``: their rows go to
+the entity table and the snapshot only references them.  Plain reads through
+:mod:`api_client` are not mirrored; its writes (create / update / delete)
+upsert or drop the rows they touch, so an edit is reflected the next time a
+snapshot holding that row is loaded.
+
+The bridge uses the snapshots to answer ``initLoad``/``fetchProjectPage``
+immediately on start-up and to keep the app browsable (read-only) while the
+backend cannot be reached.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import cache
+
+
+STORE_FILE = os.path.join(cache.APPDATA_DIR, "entities.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    type TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (type, id)
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    saved_at REAL NOT NULL
+);
+"""
+
+# SQLite の変数上限(古いビルドは999)を超えないように IN 句を分割する
+_CHUNK = 500
+
+_lock = threading.RLock()
+_conn: Optional[sqlite3.Connection] = None
+_path = STORE_FILE
+
+
+def configure(path: str) -> None:
+    """Point the store at another database file (``":memory:"`` for tests)."""
+    global _conn, _path
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
+        _path = path
+
+
+def _connect() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        # Background refreshes run on worker threads; all access goes through _lock.
+        _conn = sqlite3.connect(_path, check_same_thread=False, isolation_level=None)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+        _conn.executescript(_SCHEMA)
+    return _conn
+
+
+def _is_entity(value: Any) -> bool:
+    return isinstance(value, dict) and bool(value.get("type")) and value.get("id") is not None
+
+
+def _is_entity_list(value: Any) -> bool:
+    return isinstance(value, list) and all(_is_entity(v) for v in value)
+
+
+def upsert_entities(items: Iterable[dict]) -> None:
+    """Insert or replace entity rows keyed by (type, id)."""
+    now = time.time()
+    rows = [
+        (it["type"], it["id"], json.dumps(it, ensure_ascii=False), now)
+        for it in items or []
+        if _is_entity(it)
+    ]
+    if not rows:
+        return
+    with _lock:
+        conn = _connect()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO entities (type, id, data, fetched_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+
+def upsert_entity(item: dict) -> None:
+    upsert_entities([item])
+
+
+def delete_entity(entity_type: str, entity_id: int) -> None:
+    with _lock:
+        _connect().execute("DELETE FROM entities WHERE type = ? AND id = ?", (entity_type, entity_id))
+
+
+def delete_entities(refs: Iterable[Tuple[str, int]]) -> None:
+    """Remove the rows of many ``(type, id)`` pairs (e.g. after a cascading delete)."""
+    by_type: Dict[str, List[int]] = {}
+    for entity_type, entity_id in refs:
+        by_type.setdefault(entity_type, []).append(entity_id)
+    if not by_type:
+        return
+    with _lock:
+        conn = _connect()
+        with conn:
+            conn.execute("BEGIN")
+            for entity_type, ids in by_type.items():
+                for i in range(0, len(ids), _CHUNK):
+                    chunk = ids[i:i + _CHUNK]
+                    placeholders = ",".join("?" * len(chunk))
+                    conn.execute(f"DELETE FROM entities WHERE type = ? AND id IN ({placeholders})",
+                                 (entity_type, *chunk))
+
+
+def get_entity(entity_type: str, entity_id: int) -> Optional[dict]:
+    with _lock:
+        row = _connect().execute(
+            "SELECT data FROM entities WHERE type = ? AND id = ?", (entity_type, entity_id)
+        ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def _load_rows(refs: Iterable[Tuple[str, int]]) -> Dict[Tuple[str, int], dict]:
+    by_type: Dict[str, List[int]] = {}
+    for entity_type, entity_id in refs:
+        by_type.setdefault(entity_type, []).append(entity_id)
+    found: Dict[Tuple[str, int], dict] = {}
+    with _lock:
+        conn = _connect()
+        for entity_type, ids in by_type.items():
+            for i in range(0, len(ids), _CHUNK):
+                chunk = ids[i:i + _CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                cur = conn.execute(
+                    f"SELECT id, data FROM entities WHERE type = ? AND id IN ({placeholders})",
+                    (entity_type, *chunk),
+                )
+                for entity_id, data in cur:
+                    found[(entity_type, entity_id)] = json.loads(data)
+    return found
+
+
+def save_snapshot(key: str, result: dict) -> None:
+    """Store a page result as references into the entity table.
+
+    Lists of entities and single entity values are stored as ``(type, id)``
+    references (the rows themselves are upserted); anything else is stored
+    verbatim.
+    """
+    layout: Dict[str, Any] = {}
+    entities: List[dict] = []
+    for k, v in (result or {}).items():
+        if v and _is_entity_list(v):
+            layout[k] = {"refs": [[it["type"], it["id"]] for it in v]}
+            entities.extend(v)
+        elif _is_entity(v):
+            layout[k] = {"ref": [v["type"], v["id"]]}
+            entities.append(v)
+        else:
+            layout[k] = {"value": v}
+    upsert_entities(entities)
+    with _lock:
+        _connect().execute(
+            "INSERT OR REPLACE INTO snapshots (key, data, saved_at) VALUES (?, ?, ?)",
+            (key, json.dumps(layout, ensure_ascii=False), time.time()),
+        )
+
+
+def load_snapshot(key: str) -> Optional[dict]:
+    """Rebuild a page result saved by :func:`save_snapshot`.
+
+    Returns ``None`` when no snapshot exists.  References to entities deleted
+    since the snapshot was taken are dropped.
+    """
+    with _lock:
+        row = _connect().execute("SELECT data FROM snapshots WHERE key = ?", (key,)).fetchone()
+    if not row:
+        return None
+    layout = json.loads(row[0])
+    refs: List[Tuple[str, int]] = []
+    for spec in layout.values():
+        if "refs" in spec:
+            refs.extend((t, i) for t, i in spec["refs"])
+        elif "ref" in spec:
+            refs.append(tuple(spec["ref"]))
+    rows = _load_rows(refs)
+    result: Dict[str, Any] = {}
+    for k, spec in layout.items():
+        if "refs" in spec:
+            result[k] = [rows[(t, i)] for t, i in spec["refs"] if (t, i) in rows]
+        elif "ref" in spec:
+            result[k] = rows.get(tuple(spec["ref"]))
+        else:
+            result[k] = spec.get("value")
+    return result
+
+
+def _entities_of(result: Optional[dict]) -> Dict[Tuple[str, int], dict]:
+    found: Dict[Tuple[str, int], dict] = {}
+    for v in (result or {}).values():
+        items = v if isinstance(v, list) else [v]
+        for it in items:
+            if _is_entity(it):
+                found[(it["type"], it["id"])] = it
+    return found
+
+
+def diff_results(old: Optional[dict], new: dict) -> List[dict]:
+    """Change events between two results of the same page.
+
+    Events have the shape ``{"op", "type", "id", "fields", "data"}`` used by
+    the bridge ``entitiesChanged`` signal.
+    """
+    before = _entities_of(old)
+    after = _entities_of(new)
+    events: List[dict] = []
+    for (entity_type, entity_id), item in after.items():
+        prev = before.get((entity_type, entity_id))
+        if prev is None:
+            events.append({"op": "create", "type": entity_type, "id": entity_id,
+                           "fields": list(item.keys()), "data": item})
+            continue
+        fields = [k for k, v in item.items() if prev.get(k) != v]
+        if fields:
+            events.append({"op": "update", "type": entity_type, "id": entity_id,
+                           "fields": fields, "data": item})
+    for entity_type, entity_id in before.keys() - after.keys():
+        events.append({"op": "delete", "type": entity_type, "id": entity_id, "fields": [], "data": None})
+    return events
+
+
+def delete_snapshots(page: str, keep: Optional[str] = None) -> None:
+    """Remove the snapshots of *page* (key ``page`` or ``page:...``) other than *keep*."""
+    with _lock:
+        _connect().execute(
+            "DELETE FROM snapshots WHERE (key = ? OR substr(key, 1, ?) = ?) AND key IS NOT ?",
+            (page, len(page) + 1, page + ":", keep),
+        )
+
+
+def snapshot_saved_at(key: str) -> Optional[float]:
+    with _lock:
+        row = _connect().execute("SELECT saved_at FROM snapshots WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
@@ -0,0 +1,129 @@
+"""Background export jobs with progress reporting and cancellation.
+
+Exporters take a ``progress(stage, done, total)`` callback.  Inside a job
+that callback forwards (throttled) progress to the job's listener and raises
+:class:`ExportCancelled` once :func:`cancel` was called, so an exporter stops
+at its next progress report and cleans up its partial output.
+
+Jobs run on a small thread pool: openpyxl objects are not picklable, and the
+bridge only has to stay responsive, not gain parallelism.
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+ProgressCallback = Callable[[str, int, int], None]
+
+# Minimum seconds between two forwarded progress reports of the same stage
+PROGRESS_INTERVAL = 0.1
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="export")
+_jobs: Dict[str, "ExportJob"] = {}
+_lock = threading.Lock()
+_ids = itertools.count(1)
+
+
+class ExportCancelled(Exception):
+    """Raised from a progress callback after the job was cancelled."""
+
+
+class ExportJob:
+    def __init__(self, job_id: str, kind: str,
+                 on_progress: Optional[Callable[[str, dict], None]] = None) -> None:
+        self.id = job_id
+        self.kind = kind
+        self.status = "queued"
+        self.result: Optional[dict] = None
+        self._cancel = threading.Event()
+        self._on_progress = on_progress
+        self._last_stage: Optional[str] = None
+        self._last_report = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def progress(self, stage: str, done: int = 0, total: int = 0) -> None:
+        """Progress callback handed to the exporter."""
+        if self._cancel.is_set():
+            raise ExportCancelled(self.id)
+        if self._on_progress is None:
+            return
+        now = time.monotonic()
+        # Always report stage changes and completion; throttle the rest
+        if stage == self._last_stage and done < total and now - self._last_report < PROGRESS_INTERVAL:
+            return
+        self._last_stage = stage
+        self._last_report = now
+        try:
+            self._on_progress(self.id, {"kind": self.kind, "stage": stage, "done": done, "total": total})
+        except Exception as e:
+            print(f"[export_jobs] progress listener failed: {e}")
+
+
+def submit(kind: str, fn: Callable[[ProgressCallback], dict],
+           on_progress: Optional[Callable[[str, dict], None]] = None,
+           on_finished: Optional[Callable[[str, dict], None]] = None) -> str:
+    """Run ``fn(progress)`` on the export pool and return the job id.
+
+    *on_progress(job_id, info)* and *on_finished(job_id, result)* are called
+    on the worker thread.  A cancelled job finishes with
+    ``{"success": False, "error": "canceled", "cancelled": True}``.
+    """
+    job_id = f"{kind}-{next(_ids)}"
+    job = ExportJob(job_id, kind, on_progress)
+    with _lock:
+        _jobs[job_id] = job
+
+    def run() -> None:
+        job.status = "running"
+        try:
+            if job.cancelled:
+                raise ExportCancelled(job_id)
+            result = fn(job.progress)
+            job.status = "finished"
+        except ExportCancelled:
+            result = {"success": False, "error": "canceled", "cancelled": True}
+            job.status = "cancelled"
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            result = {"success": False, "error": str(e)}
+            job.status = "failed"
+        job.result = result
+        with _lock:
+            _jobs.pop(job_id, None)
+        if on_finished is not None:
+            try:
+                on_finished(job_id, result)
+            except Exception as e:
+                print(f"[export_jobs] finish listener failed: {e}")
+
+    _executor.submit(run)
+    return job_id
+
+
+def cancel(job_id: str) -> bool:
+    """Request cancellation; returns False when the job is unknown or already done."""
+    with _lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        return False
+    job.cancel()
+    return True
+
+
+def get_job(job_id: str) -> Optional[ExportJob]:
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def active_jobs() -> Dict[str, Any]:
+    with _lock:
+        return {job_id: {"kind": job.kind, "status": job.status} for job_id, job in _jobs.items()}
@@ -0,0 +1,252 @@
+"""Hot-path instrumentation for bridge slots and backend calls.
+
+Wrap a function with :func:`instrument` (or every public method of a class
+with :func:`instrument_class`) to record per-call latency, payload size, row
+count and, while the Django backend is active, SQL query count/time.
+
+Recording is off unless ``SCHEDULE_TOOL_PERF=1`` is set or :func:`enable` is
+called; a disabled wrapper only adds a flag check and one extra call.  Set
+``SCHEDULE_TOOL_PERF_LOG=<path>`` to also append one JSON line per call.
+"""
+
+import bisect
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Latency histogram bucket upper bounds (ms); the last bucket is open-ended.
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_enabled = os.environ.get("SCHEDULE_TOOL_PERF") == "1"
+_log_path: Optional[str] = os.environ.get("SCHEDULE_TOOL_PERF_LOG") or None
+_log_file = None
+_lock = threading.Lock()
+
+
+class _Stat:
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "buckets",
+                 "args_bytes", "result_bytes", "rows", "sql_queries", "sql_ms")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.args_bytes = 0
+        self.result_bytes = 0
+        self.rows = 0
+        self.sql_queries = 0
+        self.sql_ms = 0.0
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th percentile."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def as_dict(self) -> Dict[str, Any]:
+        labels = [f"<={b}" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "histogram_ms": {label: n for label, n in zip(labels, self.buckets) if n},
+            "args_bytes": self.args_bytes,
+            "result_bytes": self.result_bytes,
+            "rows": self.rows,
+            "sql_queries": self.sql_queries,
+            "sql_ms": round(self.sql_ms, 3),
+        }
+
+
+_stats: Dict[str, _Stat] = {}
+
+
+def enable(log_path: Optional[str] = None) -> None:
+    global _enabled, _log_path
+    _enabled = True
+    if log_path:
+        _log_path = log_path
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+
+
+def get_stats() -> Dict[str, Any]:
+    with _lock:
+        return {
+            "enabled": _enabled,
+            "calls": {name: stat.as_dict() for name, stat in sorted(_stats.items())},
+        }
+
+
+# ----------------------
+# measurement helpers
+# ----------------------
+def _payload_size(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str))
+    except Exception:
+        return 0
+
+
+def _row_count(value: Any) -> int:
+    if isinstance(value, list):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(v) for v in value.values() if isinstance(v, list))
+    return 0
+
+
+class _SqlCounter:
+    """Count queries on the current thread's Django connection, if Django is set up."""
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.ms = 0.0
+        self._cm = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.ms += (time.perf_counter() - start) * 1000.0
+
+    def __enter__(self) -> "_SqlCounter":
+        if "django" in sys.modules:
+            from django.apps import apps
+            if apps.ready:
+                from django.db import connection
+                self._cm = connection.execute_wrapper(self)
+                self._cm.__enter__()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._cm is not None:
+            self._cm.__exit__(*exc)
+
+
+def _write_log(entry: Dict[str, Any]) -> None:
+    global _log_file
+    try:
+        with _lock:
+            if _log_file is None:
+                _log_file = open(_log_path, "a", encoding="utf-8")
+            _log_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            _log_file.flush()
+    except Exception as e:
+        print(f"[perf] log write failed: {e}")
+
+
+def _record(name: str, fn: Callable, args: tuple, kwargs: dict) -> Any:
+    error = False
+    result = None
+    with _SqlCounter() as sql:
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+            return result
+        except Exception:
+            error = True
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            # Measure after the clock stops so payload sizing is not counted as latency
+            args_bytes = sum(_payload_size(a) for a in args if isinstance(a, (str, bytes, list, dict)))
+            result_bytes = _payload_size(result)
+            rows = _row_count(result)
+            with _lock:
+                stat = _stats.get(name)
+                if stat is None:
+                    stat = _stats[name] = _Stat()
+                stat.count += 1
+                stat.errors += int(error or (isinstance(result, dict) and bool(result.get("error"))))
+                stat.total_ms += elapsed_ms
+                stat.max_ms = max(stat.max_ms, elapsed_ms)
+                stat.buckets[bisect.bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+                stat.args_bytes += args_bytes
+                stat.result_bytes += result_bytes
+                stat.rows += rows
+                stat.sql_queries += sql.queries
+                stat.sql_ms += sql.ms
+            if _log_path:
+                _write_log({
+                    "ts": time.time(),
+                    "name": name,
+                    "ms": round(elapsed_ms, 3),
+                    "args_bytes": args_bytes,
+                    "result_bytes": result_bytes,
+                    "rows": rows,
+                    "sql_queries": sql.queries,
+                    "sql_ms": round(sql.ms, 3),
+                    "error": error,
+                })
+
+
+def instrument(fn: Optional[Callable] = None, *, name: Optional[str] = None):
+    """Decorator recording calls under *name* (default: the function's qualname).
+
+    For Qt slots apply it below ``@Slot`` so the slot metadata wraps the
+    instrumented function.
+    """
+    def decorate(func: Callable) -> Callable:
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            return _record(label, func, args, kwargs)
+
+        return wrapper
+
+    if fn is not None:
+        return decorate(fn)
+    return decorate
+
+
+def instrument_class(cls: type, methods: Optional[List[str]] = None) -> type:
+    """Wrap every public method of *cls* in place (e.g. ``ShotgunClient``)."""
+    names = methods or [
+        n for n, v in vars(cls).items()
+        if callable(v) and not n.startswith("_")
+    ]
+    for n in names:
+        func = vars(cls).get(n)
+        if func is None or getattr(func, "__wrapped__", None) is not None:
+            continue
+        setattr(cls, n, instrument(func, name=f"{cls.__name__}.{n}"))
+    return cls
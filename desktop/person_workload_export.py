@@ -0,0 +1,204 @@
+"""Export PersonWorkload totals as a person x week table (Assignment page).
+
+The input is the output of ``api_client.fetch_person_workload_export_source``:
+man_week totals already grouped by the backend per person (optionally per
+task or subproject) and week, so the export only lays them out.  Columns are
+every Monday of the requested range, rows one person (or person + task /
+subproject), followed by a Total column.
+
+XLSX is written with openpyxl's write-only workbook and CSV with
+``csv.writer``; both stream row by row, so a studio-wide export for a year
+does not build a worksheet in memory.
+
+Requirements: openpyxl (XLSX only)
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Tuple
+import csv
+import datetime as dt
+import os
+import re
+import tempfile
+
+from export_jobs import ExportCancelled, ProgressCallback
+
+GROUP_LABELS = {None: None, "task": "Task", "subproject": "Subproject"}
+
+
+def _no_progress(stage: str, done: int = 0, total: int = 0) -> None:
+    pass
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _week_columns(start_iso: str, end_iso: str) -> List[dt.date]:
+    """Mondays from the week of *start_iso* up to *end_iso*."""
+    start = dt.date.fromisoformat(start_iso)
+    end = dt.date.fromisoformat(end_iso)
+    monday = start - dt.timedelta(days=start.weekday())
+    weeks = []
+    while monday <= end:
+        weeks.append(monday)
+        monday += dt.timedelta(days=7)
+    return weeks
+
+
+def build_table(source: dict) -> Tuple[List[dt.date], List[Tuple[str, str | None, List[float]]]]:
+    """(week columns, rows) where a row is ``(person, group name, values per week)``.
+
+    Persons are ordered by name, groups by name within a person.  Persons of
+    the source without any workload get one empty row so the table lists
+    everyone who was asked for.
+    """
+    start_iso, end_iso = source["range"]
+    weeks = _week_columns(start_iso, end_iso)
+    col = {w.isoformat(): j for j, w in enumerate(weeks)}
+    names = {p["id"]: p.get("name") or f"Person {p['id']}" for p in source.get("persons") or []}
+
+    cells: Dict[Tuple[Any, Any], List[float]] = {}
+    group_names: Dict[Any, str] = {}
+    for person_id, group_id, group_name, week, total in source.get("rows") or []:
+        j = col.get(week)
+        if j is None:
+            continue
+        values = cells.get((person_id, group_id))
+        if values is None:
+            values = cells[(person_id, group_id)] = [0.0] * len(weeks)
+        values[j] += float(total or 0)
+        if group_id is not None:
+            group_names[group_id] = group_name or ""
+    with_rows = {person_id for person_id, _ in cells}
+    for person_id in names:
+        if person_id not in with_rows:
+            cells[(person_id, None)] = [0.0] * len(weeks)
+
+    def _key(item):
+        (person_id, group_id), _ = item
+        return (names.get(person_id) or "", person_id or 0, group_names.get(group_id, ""), group_id or 0)
+
+    rows = [
+        (names.get(person_id) or f"Person {person_id}", group_names.get(group_id) if group_id is not None else None, values)
+        for (person_id, group_id), values in sorted(cells.items(), key=_key)
+    ]
+    return weeks, rows
+
+
+def _header(source: dict, weeks: List[dt.date]) -> List[Any]:
+    group_label = GROUP_LABELS.get(source.get("group_by"))
+    return ["Person", *([group_label] if group_label else []), *weeks, "Total"]
+
+
+def _table_rows(source: dict, rows, progress: ProgressCallback) -> Iterator[List[Any]]:
+    grouped = bool(GROUP_LABELS.get(source.get("group_by")))
+    total = len(rows)
+    progress("rows", 0, total)
+    for i, (person, group, values) in enumerate(rows):
+        # Empty cells instead of 0 keep the sheet readable
+        yield [person, *([group] if grouped else []), *(round(v, 6) or None for v in values), round(sum(values), 6)]
+        if (i + 1) % 500 == 0:
+            progress("rows", i + 1, total)
+    progress("rows", total, total)
+
+
+def export_person_workloads_to_csv(source: dict, save_path: str,
+                                   progress: ProgressCallback | None = None) -> Dict[str, Any]:
+    """Write the person x week table as CSV (UTF-8 with BOM, like the PMM CSV)."""
+    progress = progress or _no_progress
+    try:
+        progress("aggregate", 0, len(source.get("rows") or []))
+        weeks, rows = build_table(source)
+        os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+        try:
+            with open(save_path, "w", newline="", encoding="utf-8-sig") as f:
+                writer = csv.writer(f)
+                writer.writerow([h.isoformat() if isinstance(h, dt.date) else h for h in _header(source, weeks)])
+                for vals in _table_rows(source, rows, progress):
+                    writer.writerow(["" if v is None else v for v in vals])
+        except PermissionError:
+            return {
+                "success": False,
+                "error": "The file is currently open and cannot be written. Please close the file and try again.",
+            }
+        except ExportCancelled:
+            _remove_quietly(save_path)
+            raise
+        return {"success": True, "path": save_path, "rows": len(rows), "weeks": len(weeks)}
+    except ExportCancelled:
+        raise
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def export_person_workloads_to_xlsx(source: dict, save_path: str,
+                                    progress: ProgressCallback | None = None) -> Dict[str, Any]:
+    """Write the person x week table with a write-only (streaming) openpyxl workbook."""
+    progress = progress or _no_progress
+    try:
+        try:
+            import openpyxl  # type: ignore
+            from openpyxl.cell import WriteOnlyCell  # type: ignore
+            from openpyxl.styles import Font  # type: ignore
+            from openpyxl.utils import get_column_letter  # type: ignore
+        except Exception as e:
+            return {"success": False, "error": f"openpyxl is required: {e}"}
+
+        progress("aggregate", 0, len(source.get("rows") or []))
+        weeks, rows = build_table(source)
+
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Person Workload")
+        label_cols = 2 if GROUP_LABELS.get(source.get("group_by")) else 1
+        ws.freeze_panes = f"{get_column_letter(label_cols + 1)}2"
+        for c in range(1, label_cols + 1):
+            ws.column_dimensions[get_column_letter(c)].width = 24
+        for c in range(label_cols + 1, label_cols + len(weeks) + 2):
+            ws.column_dimensions[get_column_letter(c)].width = 11
+
+        bold = Font(bold=True)
+        header = []
+        for h in _header(source, weeks):
+            cell = WriteOnlyCell(ws, value=h)
+            cell.font = bold
+            if isinstance(h, dt.date):
+                cell.number_format = "yyyy-mm-dd"
+            header.append(cell)
+        ws.append(header)
+        for vals in _table_rows(source, rows, progress):
+            ws.append(vals)
+
+        os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+        progress("save", 0, 0)
+        # Save next to the target and swap it in, so a failed save leaves no partial file
+        fd, part_path = tempfile.mkstemp(suffix=".xlsx.part", dir=os.path.dirname(save_path) or ".")
+        os.close(fd)
+        try:
+            wb.save(part_path)
+            os.replace(part_path, save_path)
+        except PermissionError:
+            return {
+                "success": False,
+                "error": "The file is currently open and cannot be written. Please close the file and try again.",
+            }
+        finally:
+            _remove_quietly(part_path)
+        return {"success": True, "path": save_path, "rows": len(rows), "weeks": len(weeks)}
+    except ExportCancelled:
+        raise
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def suggest_filename(source: dict, ext: str) -> str:
+    """Default file name: PersonWorkload[_Task|_Subproject]_<start>_<end>.<ext>."""
+    start_iso, end_iso = source.get("range") or ("", "")
+    group_label = GROUP_LABELS.get(source.get("group_by"))
+    stem = "PersonWorkload" + (f"_{group_label}" if group_label else "")
+    name = f"{stem}_{start_iso}_{end_iso}" if start_iso and end_iso else stem
+    return re.sub(r"[^\w\-_. ]", "_", name) + f".{ext}"
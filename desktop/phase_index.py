@@ -0,0 +1,87 @@
+"""Date → phase lookup shared by the exporters.
+
+Non-milestone phases are ordered by ``end_date`` and each phase covers the
+window ``(previous end_date, end_date]``; the first phase is open towards the
+past.  Dates after the last phase's end belong to no phase.
+
+:class:`PhaseWindowIndex` answers "which phase is this date in" with a
+bisect over the sorted end dates, and memoises the per-week labels
+(year, month, ISO week number, phase) used by the raw-record sheets, so a
+week is labelled once no matter how many records fall into it.
+"""
+
+import bisect
+import datetime as dt
+from typing import Dict, Iterable, List, Optional, Tuple
+
+WeekLabel = Tuple[Optional[int], Optional[int], Optional[int], Optional[str]]
+
+_EMPTY_LABEL: WeekLabel = (None, None, None, None)
+
+
+class PhaseWindowIndex:
+    def __init__(self, windows: Iterable[Tuple[dt.date, str]] = ()) -> None:
+        """*windows* are ``(end_date, name)`` pairs in any order."""
+        ordered = sorted(windows, key=lambda w: w[0])
+        self._ends: List[dt.date] = [end for end, _ in ordered]
+        self._names: List[str] = [name for _, name in ordered]
+        self._week_labels: Dict[str, WeekLabel] = {}
+
+    @classmethod
+    def from_phases(cls, phases: Optional[Iterable[dict]]) -> "PhaseWindowIndex":
+        """Build from Phase dicts (``name``, ``end_date`` ISO string, ``milestone``).
+
+        Milestones and phases without a name or a valid end date are ignored.
+        """
+        windows: List[Tuple[dt.date, str]] = []
+        for p in phases or []:
+            if bool(p.get("milestone")):
+                continue
+            end_iso = p.get("end_date")
+            name = p.get("name")
+            if not end_iso or not name:
+                continue
+            try:
+                end_dt = dt.date.fromisoformat(end_iso)
+            except Exception:
+                continue
+            windows.append((end_dt, str(name)))
+        return cls(windows)
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def windows(self) -> List[Tuple[dt.date, dt.date, str]]:
+        """``(start, end, name)`` per phase; the first start is ``date.min``."""
+        result = []
+        prev_end: Optional[dt.date] = None
+        for end_dt, name in zip(self._ends, self._names):
+            start_dt = (prev_end + dt.timedelta(days=1)) if prev_end else dt.date.min
+            result.append((start_dt, end_dt, name))
+            prev_end = end_dt
+        return result
+
+    def phase_at(self, day: dt.date) -> Optional[str]:
+        """Name of the phase containing *day*, or ``None`` after the last phase."""
+        # First phase whose end_date >= day (ties resolve to the earlier phase)
+        i = bisect.bisect_left(self._ends, day)
+        return self._names[i] if i < len(self._names) else None
+
+    def week_label(self, week_iso: Optional[str]) -> WeekLabel:
+        """(year, month, ISO week number, phase) for an ISO date string, memoised.
+
+        Invalid or empty strings give ``(None, None, None, None)``.
+        """
+        if not week_iso:
+            return _EMPTY_LABEL
+        label = self._week_labels.get(week_iso)
+        if label is None:
+            try:
+                day = dt.date.fromisoformat(week_iso)
+            except Exception:
+                label = _EMPTY_LABEL
+            else:
+                # ISO week number (equivalent to Excel WEEKNUM with return_type=21)
+                label = (day.year, day.month, day.isocalendar()[1], self.phase_at(day))
+            self._week_labels[week_iso] = label
+        return label
@@ -4,15 +4,38 @@ This module copies or loads the provided template (pmm_sample.xlsx), sets B2 to
 earliest week date, and writes man_week values into the matrix where rows are work
 categories (column A) and columns step by 7 days from B2 across ~3 years.
 
-Requirements: openpyxl
+Requirements: openpyxl.  NumPy is an optional extra that no requirements file
+pulls in: when it is installed (``pip install numpy``) :func:`build_pivot`
+aggregates with it, otherwise it uses the pure-Python pivot, which gives the
+same result.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, Tuple, List
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from copy import copy
+from typing import Any, Callable, Dict, Iterable, Iterator, Tuple, List
+from xml.sax.saxutils import escape as xml_escape
+import xml.etree.ElementTree as ET
 import datetime as dt
+import hashlib
+import json
+import multiprocessing
 import os
+import re
 import csv
+import tempfile
+import time
+import zipfile
+
+import cache
+from export_jobs import ExportCancelled, ProgressCallback
+from phase_index import PhaseWindowIndex
+
+try:
+    import numpy as _np  # type: ignore
+except Exception:  # NumPy is optional; fall back to the pure-Python pivot
+    _np = None
 
 
 def _to_date(iso: str) -> dt.date:
@@ -29,34 +52,171 @@ def _to_monday(d: dt.date) -> dt.date:
     return d - dt.timedelta(days=d.weekday())
 
 
-def _aggregate(records: Iterable[dict], phases: Iterable[dict] | None = None) -> Tuple[Dict[Tuple[str, str], float], dt.date]:
-    """Aggregate man_week by (category_name, week) and return earliest week (Monday).
+def _wc_name(rec: dict) -> str:
+    wc = rec.get("work_category") or {}
+    name = wc.get("name") if isinstance(wc, dict) else wc
+    return name or "Unassigned"
 
-    earliest is the minimum of:
-      - PMM workload weeks (already Mondays)
-      - Phase end_date normalized to Monday
 
-    Returns:
-        (agg, earliest_date)
+def _to_float(val: Any) -> float:
+    try:
+        return float(val or 0)
+    except Exception:
+        return 0.0
+
+
+class PivotMatrix:
+    """man_week totals per (work category, week).
+
+    ``categories`` are sorted by name and ``weeks`` are the distinct ISO week
+    strings in date order.  ``values[i][j]`` is the total for
+    ``(categories[i], weeks[j])`` and ``counts[i][j]`` the number of records
+    that contributed to it, so cells that only received zero values are still
+    told apart from empty cells.  Both are NumPy arrays when NumPy is
+    available and nested lists otherwise.
     """
-    earliest: dt.date | None = None
-    agg: Dict[Tuple[str, str], float] = {}
+
+    __slots__ = ("categories", "weeks", "values", "counts")
+
+    def __init__(self, categories: List[str], weeks: List[str], values: Any, counts: Any) -> None:
+        self.categories = categories
+        self.weeks = weeks
+        self.values = values
+        self.counts = counts
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Iterable[Any]]) -> "PivotMatrix":
+        """Build from pre-aggregated ``(category, week_iso, total, count)`` rows.
+
+        Used when the backend already grouped the workloads (see
+        ``api_client.fetch_pmm_export_source``); duplicate keys are summed.
+        """
+        totals: Dict[Tuple[str, str], float] = {}
+        counts: Dict[Tuple[str, str], int] = {}
+        for category, week, total, count in rows:
+            if not week:
+                continue
+            key = (category or "Unassigned", week)
+            totals[key] = totals.get(key, 0.0) + _to_float(total)
+            counts[key] = counts.get(key, 0) + int(count or 0)
+        categories = sorted({k[0] for k in totals})
+        weeks = sorted({k[1] for k in totals}, key=_to_date)
+        cat_idx = {c: i for i, c in enumerate(categories)}
+        week_idx = {w: j for j, w in enumerate(weeks)}
+        values = [[0.0] * len(weeks) for _ in categories]
+        cell_counts = [[0] * len(weeks) for _ in categories]
+        for key, total in totals.items():
+            i, j = cat_idx[key[0]], week_idx[key[1]]
+            values[i][j] = total
+            cell_counts[i][j] = counts[key]
+        return cls(categories, weeks, values, cell_counts)
+
+    def week_dates(self) -> List[dt.date]:
+        return [_to_date(w) for w in self.weeks]
+
+    def cells(self) -> Iterator[Tuple[int, int, float]]:
+        """Yield (category index, week index, total) for every non-empty cell."""
+        if _np is not None and hasattr(self.counts, "nonzero"):
+            rows, cols = self.counts.nonzero()
+            yield from zip(rows.tolist(), cols.tolist(), self.values[rows, cols].tolist())
+            return
+        for i, row in enumerate(self.counts):
+            for j, n in enumerate(row):
+                if n:
+                    yield i, j, self.values[i][j]
+
+    def row(self, index: int) -> List[float]:
+        values = self.values[index]
+        return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+def _pivot_python(records: Iterable[dict]) -> PivotMatrix:
+    totals: Dict[Tuple[str, str], float] = {}
+    counts: Dict[Tuple[str, str], int] = {}
     for r in records:
         week = r.get("week")
         if not week:
             continue
-        week_date = _to_date(week)
-        if earliest is None or week_date < earliest:
-            earliest = week_date
-        wc = r.get("work_category") or {}
-        name = wc.get("name") or "Unassigned"
-        val = r.get("man_week") or 0
-        try:
-            fval = float(val)
-        except Exception:
-            fval = 0.0
-        key = (name, week)
-        agg[key] = agg.get(key, 0.0) + fval
+        key = (_wc_name(r), week)
+        totals[key] = totals.get(key, 0.0) + _to_float(r.get("man_week"))
+        counts[key] = counts.get(key, 0) + 1
+    categories = sorted({k[0] for k in totals})
+    weeks = sorted({k[1] for k in totals}, key=_to_date)
+    cat_idx = {c: i for i, c in enumerate(categories)}
+    week_idx = {w: j for j, w in enumerate(weeks)}
+    values = [[0.0] * len(weeks) for _ in categories]
+    cell_counts = [[0] * len(weeks) for _ in categories]
+    for (cat, week), total in totals.items():
+        i, j = cat_idx[cat], week_idx[week]
+        values[i][j] = total
+        cell_counts[i][j] = counts[(cat, week)]
+    return PivotMatrix(categories, weeks, values, cell_counts)
+
+
+def _pivot_numpy(records: Iterable[dict]) -> PivotMatrix:
+    # Python only factorizes week/category into integer codes (one dict
+    # lookup each, no date parsing or float() per record); summing happens in
+    # np.bincount and ISO strings are parsed once per distinct week.
+    records = [r for r in records if r.get("week")]
+    n = len(records)
+    if not n:
+        return PivotMatrix([], [], _np.zeros((0, 0)), _np.zeros((0, 0), dtype=_np.int64))
+    week_codes: Dict[str, int] = {}
+    cat_codes: Dict[str, int] = {}
+    week_idx = _np.fromiter((week_codes.setdefault(r["week"], len(week_codes)) for r in records),
+                            dtype=_np.int64, count=n)
+    cat_idx = _np.fromiter((cat_codes.setdefault(_wc_name(r), len(cat_codes)) for r in records),
+                           dtype=_np.int64, count=n)
+    raw = [r.get("man_week") or 0.0 for r in records]
+    try:
+        mw = _np.array(raw, dtype=_np.float64)
+    except (TypeError, ValueError):
+        mw = _np.fromiter((_to_float(v) for v in raw), dtype=_np.float64, count=n)
+
+    shape = (len(cat_codes), len(week_codes))
+    flat = cat_idx * shape[1] + week_idx
+    size = shape[0] * shape[1]
+    values = _np.bincount(flat, weights=mw, minlength=size).reshape(shape)
+    counts = _np.bincount(flat, minlength=size).reshape(shape)
+
+    # Codes are in order of first appearance: sort categories by name, weeks by date
+    categories = list(cat_codes)
+    weeks = list(week_codes)
+    cat_order = sorted(range(len(categories)), key=categories.__getitem__)
+    week_order = sorted(range(len(weeks)), key=lambda j: _to_date(weeks[j]))
+    grid = _np.ix_(cat_order, week_order)
+    return PivotMatrix([categories[i] for i in cat_order], [weeks[j] for j in week_order],
+                       values[grid], counts[grid])
+
+
+def build_pivot(records: Iterable[dict], use_numpy: bool | None = None) -> PivotMatrix:
+    """Aggregate man_week by (work category, week); records without a week are skipped.
+
+    *use_numpy* None picks NumPy when it is importable (optional extra).
+    """
+    if use_numpy is None:
+        use_numpy = _np is not None
+    if use_numpy and _np is not None:
+        return _pivot_numpy(records)
+    return _pivot_python(records)
+
+
+def _payload_pivot(payload: dict) -> PivotMatrix:
+    """Pivot of a payload: backend-grouped ``pivot_rows`` if present, else built from records."""
+    rows = (payload or {}).get("pivot_rows")
+    if rows is not None:
+        return PivotMatrix.from_rows(rows)
+    return build_pivot((payload or {}).get("records") or [])
+
+
+def _earliest_week(pivot: PivotMatrix, phases: Iterable[dict] | None = None) -> dt.date:
+    """Earliest week (Monday) of the export.
+
+    earliest is the minimum of:
+      - PMM workload weeks (already Mondays)
+      - Phase end_date normalized to Monday
+    """
+    earliest: dt.date | None = _to_date(pivot.weeks[0]) if pivot.weeks else None
 
     # Consider phases' end_date as well
     if phases:
@@ -75,21 +235,480 @@ def _aggregate(records: Iterable[dict], phases: Iterable[dict] | None = None) ->
         # Default to today Monday if no records
         today = dt.date.today()
         earliest = today - dt.timedelta(days=today.weekday())
-    return agg, earliest
+    return earliest
+
+
+LIST_SHEET_NAME = "4QV2"
+LIST_COLUMNS = 7  # A..G: name, work category, man_week, year, month, weeknum, phase
+LIST_STYLE_PREFIX = "PMM 4QV2 "
+
+ENGINE_STREAM = "stream"
+ENGINE_OPENPYXL = "openpyxl"
+
+
+def _open_manpower_sheet(wb):
+    # Prefer an existing sheet named "Manpower Sheet"; otherwise rename active
+    desired_sheet_name = "Manpower Sheet"
+    if desired_sheet_name in wb.sheetnames:
+        return wb[desired_sheet_name]
+    ws = wb.active
+    try:
+        ws.title = desired_sheet_name
+    except Exception:
+        # If renaming fails, continue using active sheet
+        pass
+    return ws
+
+
+def _scan_category_rows(ws) -> Dict[str, int]:
+    """Map category names in column A to their row (first 2000 rows)."""
+    name_to_row: Dict[str, int] = {}
+    for r in range(1, 2000):
+        v = ws.cell(row=r, column=1).value
+        if isinstance(v, str) and v.strip():
+            name_to_row[v.strip()] = r
+    return name_to_row
+
+
+def _manpower_cells(pivot: PivotMatrix, earliest: dt.date, phases: List[dict],
+                    name_to_row: Dict[str, int]) -> Dict[Tuple[int, int], Any]:
+    """Values of the Manpower sheet keyed by (row, column), in write order."""
+    # Set B2 to earliest date (as a date cell). Excel will propagate via formulas.
+    cells: Dict[Tuple[int, int], Any] = {(2, 2): earliest}
+
+    # Aggregated values; columns are resolved once per week, rows once per category
+    week_cols = [2 + _week_diff(earliest, d) for d in pivot.week_dates()]  # B=2
+    cat_rows = [name_to_row.get(name) for name in pivot.categories]
+    for i, j, value in pivot.cells():
+        row = cat_rows[i]
+        if row is None:
+            # If category not present in template, skip (or append). For now, skip.
+            continue
+        cells[(row, week_cols[j])] = float(value)
+
+    # Phases go into rows 3 (milestone=True) and 4 (milestone=False)
+    for p in phases or []:
+        name = p.get("name")
+        end_iso = p.get("end_date")
+        if not name or not end_iso:
+            continue
+        try:
+            end_date = dt.date.fromisoformat(end_iso)
+        except Exception:
+            continue
+        col = 2 + _week_diff(earliest, _to_monday(end_date))  # B=2
+        row = 3 if bool(p.get("milestone")) else 4
+        cells[(row, col)] = str(name)
+    return cells
+
+
+def _write_manpower(ws, cells: Dict[Tuple[int, int], Any]) -> None:
+    for (row, col), value in cells.items():
+        ws.cell(row=row, column=col).value = value
+
+
+def _rec_wc_name(rec: dict) -> str:
+    wc = rec.get("work_category")
+    if wc is None:
+        # Fallback for potential key typo
+        wc = rec.get("work_cotegory")
+    if isinstance(wc, dict):
+        return wc.get("name") or "Unassigned"
+    return wc or "Unassigned"
+
+
+def _sorted_list_records(records: List[dict], name_to_row: Dict[str, int]) -> List[dict]:
+    """Sort by Manpower Sheet category order, then week, then category name."""
+    week_dates: Dict[str, dt.date] = {}
+
+    def _rec_week_date(rec: dict) -> dt.date:
+        w = rec.get("week")
+        if not w:
+            return dt.date.max
+        d = week_dates.get(w)
+        if d is None:
+            try:
+                d = _to_date(w)
+            except Exception:
+                d = dt.date.max
+            week_dates[w] = d
+        return d
+
+    def _rec_wc_row(rec: dict) -> int:
+        # Place unknown categories at the end
+        return name_to_row.get(_rec_wc_name(rec), 10**9)
+
+    return sorted(records, key=lambda rec: (_rec_wc_row(rec), _rec_week_date(rec), _rec_wc_name(rec)))
+
+
+def _list_rows(records: List[dict], phases: List[dict] | None,
+               name_to_row: Dict[str, int]) -> Iterator[List[Any]]:
+    """Yield the 4QV2 values [name, category, man_week, year, month, weeknum, phase]."""
+    index = PhaseWindowIndex.from_phases(phases)
+    for r in _sorted_list_records(records, name_to_row):
+        wc = r.get("work_category")
+        if wc is None:
+            wc = r.get("work_cotegory")
+        wc_name = wc.get("name") if isinstance(wc, dict) else wc
+        try:
+            mw = float(r.get("man_week") or 0)
+        except Exception:
+            mw = 0.0
+        year_val, month_val, weeknum_val, phase_name = index.week_label(r.get("week"))
+        yield [r.get("name"), wc_name, mw, year_val, month_val, weeknum_val, phase_name]
+
+
+def _capture_proto_styles(ws_list) -> List[Tuple[Any, Any, Any, Any, Any, Any]]:
+    """Styles of the header or first data row, one tuple per 4QV2 column."""
+    proto_row_idx = 2 if ws_list.max_row and ws_list.max_row >= 2 else 1
+    proto_styles = []
+    for c_idx in range(1, LIST_COLUMNS + 1):
+        cell = ws_list.cell(row=proto_row_idx, column=c_idx)
+        # StyleProxy objects cannot be assigned to other cells; copy them
+        proto_styles.append((copy(cell.font), copy(cell.fill), copy(cell.border), copy(cell.alignment),
+                             cell.number_format, copy(cell.protection)))
+    return proto_styles
+
+
+def _write_list_sheet_openpyxl(ws_list, rows: Iterable[List[Any]], proto_styles) -> None:
+    """In-memory engine: write each cell and copy the prototype style onto it."""
+    # Clear only values in data rows (keep styles)
+    if ws_list.max_row and ws_list.max_row >= 2:
+        for r_idx in range(2, ws_list.max_row + 1):
+            for c_idx in range(1, LIST_COLUMNS + 1):
+                ws_list.cell(row=r_idx, column=c_idx).value = None
+    row_idx = 2
+    for vals in rows:
+        for c_idx, val in enumerate(vals, start=1):
+            cell = ws_list.cell(row=row_idx, column=c_idx)
+            cell.value = val
+            font, fill, border, alignment, number_format, protection = proto_styles[c_idx - 1]
+            if font is not None:
+                cell.font = font
+            if fill is not None:
+                cell.fill = fill
+            if border is not None:
+                cell.border = border
+            if alignment is not None:
+                cell.alignment = alignment
+            if number_format is not None:
+                cell.number_format = number_format
+            if protection is not None:
+                cell.protection = protection
+        row_idx += 1
+
+
+def _register_list_styles(wb, ws_list, proto_styles) -> List[int]:
+    """Register one named style per 4QV2 column and return their cell-xf ids.
+
+    The data rows of the template sheet are dropped; the streamed rows
+    reference the returned ids through the ``s`` attribute.
+    """
+    from openpyxl.styles import NamedStyle  # type: ignore
+
+    if ws_list.max_row and ws_list.max_row >= 2:
+        ws_list.delete_rows(2, ws_list.max_row - 1)
+    existing = {getattr(s, "name", s) for s in wb.named_styles}
+    style_ids: List[int] = []
+    for c_idx, (font, fill, border, alignment, number_format, protection) in enumerate(proto_styles, start=1):
+        name = f"{LIST_STYLE_PREFIX}{c_idx}"
+        if name not in existing:
+            wb.add_named_style(NamedStyle(
+                name=name, font=font, fill=fill, border=border,
+                alignment=alignment, number_format=number_format, protection=protection,
+            ))
+        # Apply to a scratch cell to obtain the xf index, then drop the cell again
+        scratch = ws_list.cell(row=2, column=c_idx)
+        scratch.style = name
+        style_ids.append(scratch.style_id)
+        del ws_list._cells[(2, c_idx)]
+    return style_ids
+
+
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_LIST_COL_LETTERS = "ABCDEFG"
+
+
+def _cell_xml(ref: str, style_id: int, val: Any) -> str:
+    if val is None:
+        return f'<c r="{ref}" s="{style_id}"/>'
+    if isinstance(val, bool):
+        return f'<c r="{ref}" s="{style_id}" t="b"><v>{int(val)}</v></c>'
+    if isinstance(val, (int, float)):
+        # Same number formatting as openpyxl ("%.16g"; NaN/inf become empty)
+        if val != val or val in (float("inf"), float("-inf")):
+            return f'<c r="{ref}" s="{style_id}"/>'
+        return f'<c r="{ref}" s="{style_id}"><v>{"%.16g" % val}</v></c>'
+    text = xml_escape(_ILLEGAL_XML.sub("", str(val)))
+    return f'<c r="{ref}" s="{style_id}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _sheet_part(zf: zipfile.ZipFile, sheet_name: str) -> str | None:
+    """Resolve the zip member holding *sheet_name* via workbook.xml and its rels."""
+    ns_main = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+    ns_rel = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    rid = None
+    for sheet in workbook.iter(f"{ns_main}sheet"):
+        if sheet.get("name") == sheet_name:
+            rid = sheet.get(f"{ns_rel}id")
+            break
+    if rid is None:
+        return None
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels:
+        if rel.get("Id") == rid:
+            target = rel.get("Target") or ""
+            return target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+    return None
+
+
+def _stream_list_sheet(src_path: str, save_path: str, sheet_name: str,
+                       rows: Iterable[List[Any]], row_count: int, style_ids: List[int],
+                       flush_rows: int = 2000) -> int:
+    """Copy *src_path* to *save_path*, streaming the data rows of *sheet_name*.
+
+    Every other part of the package (formatted sheets, styles, ...) is copied
+    unchanged.  *row_count* is only used for the sheet dimension.  Returns the
+    number of data rows written.
+    """
+    with zipfile.ZipFile(src_path) as src:
+        part = _sheet_part(src, sheet_name)
+        if part is None:
+            raise RuntimeError(f"Sheet '{sheet_name}' not found in workbook package")
+        sheet_xml = src.read(part).decode("utf-8")
+        m = re.search(r"<sheetData\s*/>|<sheetData>(.*?)</sheetData>", sheet_xml, re.S)
+        if m is None:
+            raise RuntimeError(f"Unexpected sheet XML for '{sheet_name}'")
+        head, header_rows, tail = sheet_xml[:m.start()], m.group(1) or "", sheet_xml[m.end():]
+        last_ref = f"{_LIST_COL_LETTERS[LIST_COLUMNS - 1]}{row_count + 1}"
+        head = re.sub(r'<dimension ref="[^"]*"\s*/>', f'<dimension ref="A1:{last_ref}"/>', head, count=1)
+
+        with zipfile.ZipFile(save_path, "w", zipfile.ZIP_DEFLATED) as dst:
+            for item in src.infolist():
+                if item.filename != part:
+                    dst.writestr(item, src.read(item.filename))
+            with dst.open(part, "w", force_zip64=True) as out:
+                out.write(f"{head}<sheetData>{header_rows}".encode("utf-8"))
+                buf: List[str] = []
+                row_idx = 1
+                for vals in rows:
+                    row_idx += 1
+                    cells = "".join(
+                        _cell_xml(f"{_LIST_COL_LETTERS[i]}{row_idx}", style_ids[i], v)
+                        for i, v in enumerate(vals[:LIST_COLUMNS])
+                    )
+                    buf.append(f'<row r="{row_idx}">{cells}</row>')
+                    if len(buf) >= flush_rows:
+                        out.write("".join(buf).encode("utf-8"))
+                        buf.clear()
+                buf.append(f"</sheetData>{tail}")
+                out.write("".join(buf).encode("utf-8"))
+    return row_idx - 1
+
+
+def _save_workbook(wb, save_path: str) -> Dict[str, Any] | None:
+    """Save and close *wb*; return an error payload on failure."""
+    try:
+        wb.save(save_path)
+    except PermissionError:
+        # Common on Windows if the file is open in Excel
+        return {
+            "success": False,
+            "error": "The file is currently open and cannot be written. Please close the file and try again.",
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    finally:
+        # Explicitly close workbook to release file handle
+        try:
+            wb.close()
+        except Exception:
+            pass
+    return None
+
+
+# ----------------------
+# parsed template cache
+# ----------------------
+TEMPLATE_CACHE_DIR = os.path.join(cache.APPDATA_DIR, "pmm_templates")
+_TEMPLATE_CACHE_VERSION = 1
+# Entries beyond the most recently used ones, or unused for longer, are removed
+TEMPLATE_CACHE_MAX_ENTRIES = 16
+TEMPLATE_CACHE_MAX_AGE = 30 * 24 * 3600  # seconds
+
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _template_cache_paths(template_path: str) -> Tuple[str, str]:
+    key = hashlib.sha1(os.path.normcase(os.path.abspath(template_path)).encode("utf-8")).hexdigest()[:16]
+    base = os.path.join(TEMPLATE_CACHE_DIR, key)
+    return base + ".json", base + ".xlsx"
+
+
+def _build_template_descriptor(template_path: str, prepared_path: str) -> Dict[str, Any]:
+    """Parse the template once and save a prepared copy for the stream engine.
+
+    The prepared copy already has the Manpower sheet renamed, the 4QV2 data
+    rows removed and the per-column named styles registered.
+    """
+    import openpyxl  # type: ignore
+
+    wb = openpyxl.load_workbook(template_path)
+    try:
+        ws = _open_manpower_sheet(wb)
+        descriptor: Dict[str, Any] = {
+            "version": _TEMPLATE_CACHE_VERSION,
+            "sheetnames": list(wb.sheetnames),
+            "manpower_sheet": ws.title,
+            "name_to_row": _scan_category_rows(ws),
+            "list_style_ids": None,
+            "prepared_path": prepared_path,
+        }
+        if LIST_SHEET_NAME in wb.sheetnames:
+            ws_list = wb[LIST_SHEET_NAME]
+            descriptor["list_style_ids"] = _register_list_styles(wb, ws_list, _capture_proto_styles(ws_list))
+        # Write-then-rename so a concurrent export never loads a half-written copy
+        tmp_path = prepared_path + f".{os.getpid()}.tmp"
+        wb.save(tmp_path)
+        os.replace(tmp_path, prepared_path)
+    finally:
+        wb.close()
+    return descriptor
+
+
+def _prune_template_cache(keep: str) -> None:
+    """Apply TEMPLATE_CACHE_MAX_ENTRIES / TEMPLATE_CACHE_MAX_AGE; *keep* is the entry just written."""
+    try:
+        names = [n for n in os.listdir(TEMPLATE_CACHE_DIR) if n.endswith(".json")]
+    except OSError:
+        return
+    entries = []
+    for name in names:
+        path = os.path.join(TEMPLATE_CACHE_DIR, name)
+        if path == keep:
+            continue
+        try:
+            entries.append((os.path.getmtime(path), path))
+        except OSError:
+            pass
+    entries.sort(reverse=True)
+    cutoff = time.time() - TEMPLATE_CACHE_MAX_AGE
+    for i, (mtime, path) in enumerate(entries):
+        if i >= TEMPLATE_CACHE_MAX_ENTRIES - 1 or mtime < cutoff:
+            _remove_quietly(path[:-len(".json")] + ".xlsx")
+            _remove_quietly(path)
+
+
+def load_template_descriptor(template_path: str) -> Dict[str, Any]:
+    """Parsed layout of *template_path*, cached on disk under TEMPLATE_CACHE_DIR.
+
+    The cache entry is reused while the template's mtime and size are
+    unchanged; when they differ the content hash decides whether the template
+    really changed (e.g. a copy that only touched the mtime).  Writing a new
+    entry prunes the least recently used ones (see TEMPLATE_CACHE_MAX_ENTRIES).
+    """
+    st = os.stat(template_path)
+    json_path, prepared_path = _template_cache_paths(template_path)
+    descriptor: Dict[str, Any] | None = None
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            descriptor = json.load(f)
+    except (OSError, ValueError):
+        descriptor = None
+
+    digest = None
+    if descriptor and descriptor.get("version") == _TEMPLATE_CACHE_VERSION and os.path.exists(prepared_path):
+        if descriptor.get("mtime_ns") == st.st_mtime_ns and descriptor.get("size") == st.st_size:
+            try:
+                os.utime(json_path)  # marks the entry as recently used for the pruning
+            except OSError:
+                pass
+            return descriptor
+        digest = _file_sha256(template_path)
+        if descriptor.get("sha256") != digest:
+            descriptor = None
+    else:
+        descriptor = None
+
+    built = descriptor is None
+    if built:
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+        descriptor = _build_template_descriptor(template_path, prepared_path)
+        descriptor["sha256"] = digest or _file_sha256(template_path)
+    descriptor["mtime_ns"] = st.st_mtime_ns
+    descriptor["size"] = st.st_size
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(descriptor, f, ensure_ascii=False, indent=2)
+    if built:
+        _prune_template_cache(json_path)
+    return descriptor
+
+
+def _no_progress(stage: str, done: int = 0, total: int = 0) -> None:
+    pass
+
+
+def _report_rows(rows: Iterable[List[Any]], progress: ProgressCallback, total: int,
+                 every: int = 2000) -> Iterator[List[Any]]:
+    done = 0
+    progress("rows", 0, total)
+    for vals in rows:
+        yield vals
+        done += 1
+        if done % every == 0:
+            progress("rows", done, total)
+    progress("rows", done, total)
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
 
 
 def export_pmm_workloads_to_xlsx(
     payload: dict,
     template_path: str,
     save_path: str,
+    engine: str = ENGINE_STREAM,
+    use_template_cache: bool = True,
+    progress: ProgressCallback | None = None,
+    incremental: bool = False,
 ) -> Dict[str, Any]:
     """Write PMM workloads into an Excel file based on a template.
 
     Args:
-        payload: { subproject: {...}, records: IPMMWorkload[] }
+        payload: { subproject: {...}, records: IPMMWorkload[], phases?: IPhase[],
+            pivot_rows?: [category, week, total, count][] } -- when ``pivot_rows``
+            is given (backend-grouped totals) the Manpower matrix is taken from
+            it and ``records`` only feed the 4QV2 sheet.
         template_path: path to pmm_sample.xlsx
         save_path: where to save the populated xlsx
+        engine: "stream" writes the 4QV2 raw-record rows straight into the saved
+            package with one registered named style per column (time and memory
+            linear in the record count); "openpyxl" is the original in-memory
+            cell-by-cell path.
+        use_template_cache: reuse the parsed template from
+            :func:`load_template_descriptor` instead of scanning it again.
+        progress: ``progress(stage, done, total)`` called per stage
+            ("aggregate", "template", "manpower", "rows", "save"; an incremental
+            re-export reports "rewrite" for the 4QV2 rows it re-serialises); it may raise
+            :class:`export_jobs.ExportCancelled`, which is propagated after the
+            partial output has been removed.
+        incremental: (stream engine) keep ``<save_path>.pmm-state.json`` and,
+            when *save_path* is unchanged since the last incremental export of
+            the same template, rewrite only the changed cells and 4QV2 rows
+            (see :mod:`pmm_incremental`); otherwise a full export is done.
     """
+    progress = progress or _no_progress
     try:
         try:
             import openpyxl  # type: ignore
@@ -101,232 +720,271 @@ def export_pmm_workloads_to_xlsx(
 
         records = (payload or {}).get("records") or []
         phases: List[dict] = (payload or {}).get("phases") or []
-        agg, earliest = _aggregate(records, phases)
-
-        # Load template and save to new path after modifications
-        wb = openpyxl.load_workbook(template_path)
-        # Prefer an existing sheet named "Manpower Sheet"; otherwise rename active
-        desired_sheet_name = "Manpower Sheet"
-        if desired_sheet_name in wb.sheetnames:
-            ws = wb[desired_sheet_name]
-        else:
-            ws = wb.active
+        progress("aggregate", 0, len(records))
+        pivot = _payload_pivot(payload)
+        earliest = _earliest_week(pivot, phases)
+
+        progress("template", 0, 0)
+        descriptor = None
+        if use_template_cache:
             try:
-                ws.title = desired_sheet_name
-            except Exception:
-                # If renaming fails, continue using active sheet
-                pass
+                descriptor = load_template_descriptor(template_path)
+            except Exception as e:
+                # Cache directory not writable etc.: parse the template directly
+                print(f"[pmm_export] template cache unavailable: {e}")
 
-        # Set B2 to earliest date (as a date cell). Excel will propagate via formulas.
-        ws.cell(row=2, column=2).value = earliest
-
-        # Build a lookup for category names in column A (search a reasonable range)
-        name_to_row: Dict[str, int] = {}
-        # Assume categories start at row 3; scan first 1000 rows
-        for r in range(1, 2000):
-            v = ws.cell(row=r, column=1).value
-            if isinstance(v, str) and v.strip():
-                name_to_row[v.strip()] = r
-
-        # Write aggregated values
-        for (cat_name, week_iso), value in agg.items():
-            row = name_to_row.get(cat_name)
-            if row is None:
-                # If category not present in template, skip (or append). For now, skip.
-                # Could be enhanced to append at the end: row = max(name_to_row.values(), default=2) + 1
-                continue
-            week_date = _to_date(week_iso)
-            col_offset = _week_diff(earliest, week_date)
-            col = 2 + col_offset  # B=2
-            # Write number into the target cell
-            ws.cell(row=row, column=col).value = float(value)
-
-        # Write phases into rows 3 (milestone=True) and 4 (milestone=False)
-        if phases:
-            for p in phases:
-                name = p.get("name")
-                end_iso = p.get("end_date")
-                if not name or not end_iso:
-                    continue
-                try:
-                    end_date = dt.date.fromisoformat(end_iso)
-                except Exception:
-                    continue
-                col_offset = _week_diff(earliest, _to_monday(end_date))
-                col = 2 + col_offset  # B=2
-                row = 3 if bool(p.get("milestone")) else 4
-                ws.cell(row=row, column=col).value = str(name)
-
-        
-        # Create or reuse a sheet named "4QV2" to tabulate raw records
+        incremental = incremental and descriptor is not None and engine == ENGINE_STREAM
+        if incremental:
+            import pmm_incremental
+            cells = _manpower_cells(pivot, earliest, phases, descriptor["name_to_row"])
+            result = pmm_incremental.reexport(
+                save_path, descriptor, cells, _list_rows(records, phases, descriptor["name_to_row"]), progress,
+                total=len(records))
+            if result is not None:
+                return result
+
+        style_ids: List[int] | None = None
+        if descriptor is not None and engine == ENGINE_STREAM:
+            # Prepared copy: sheet already renamed, 4QV2 styles already registered
+            wb = openpyxl.load_workbook(descriptor["prepared_path"])
+            ws = wb[descriptor["manpower_sheet"]]
+            name_to_row = descriptor["name_to_row"]
+            style_ids = descriptor["list_style_ids"]
+            ws_list = wb[LIST_SHEET_NAME] if style_ids is not None else None
+        else:
+            # Load template and save to new path after modifications
+            wb = openpyxl.load_workbook(template_path)
+            ws = _open_manpower_sheet(wb)
+            name_to_row = descriptor["name_to_row"] if descriptor is not None else _scan_category_rows(ws)
+            # The raw-record sheet must exist in the template to preserve formatting
+            ws_list = wb[LIST_SHEET_NAME] if LIST_SHEET_NAME in wb.sheetnames else None
+        progress("manpower", 0, 0)
+        cells = _manpower_cells(pivot, earliest, phases, name_to_row)
+        _write_manpower(ws, cells)
+        rows = _report_rows(_list_rows(records, phases, name_to_row), progress, len(records))
+        if incremental:
+            rows = hasher = pmm_incremental.RowHasher(rows)
+
+        # Ensure directory exists
+        os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+
+        if ws_list is None or engine == ENGINE_OPENPYXL:
+            if ws_list is not None:
+                _write_list_sheet_openpyxl(ws_list, rows, _capture_proto_styles(ws_list))
+            progress("save", 0, 0)
+            error = _save_workbook(wb, save_path)
+            return error or {"success": True, "path": save_path}
+
+        if style_ids is None:
+            style_ids = _register_list_styles(wb, ws_list, _capture_proto_styles(ws_list))
+        fd, tmp_path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        # Stream next to the target and swap it in at the end, so a cancelled
+        # or failed export never leaves a truncated workbook behind
+        fd, part_path = tempfile.mkstemp(suffix=".xlsx.part", dir=os.path.dirname(save_path) or ".")
+        os.close(fd)
         try:
-            ws_list_name = "4QV2"
-            if ws_list_name in wb.sheetnames:
-                ws_list = wb[ws_list_name]
+            error = _save_workbook(wb, tmp_path)
+            if error:
+                return error
+            try:
+                _stream_list_sheet(tmp_path, part_path, LIST_SHEET_NAME, rows, len(records), style_ids)
+                progress("save", 0, 0)
+                os.replace(part_path, save_path)
+            except PermissionError:
+                return {
+                    "success": False,
+                    "error": "The file is currently open and cannot be written. Please close the file and try again.",
+                }
+        finally:
+            _remove_quietly(tmp_path)
+            _remove_quietly(part_path)
+
+        if incremental:
+            try:
+                pmm_incremental.save_state(save_path, descriptor, cells, hasher.hashes)
+            except Exception as e:
+                print(f"[pmm_export] could not save incremental state: {e}")
+            return {"success": True, "path": save_path, "incremental": False}
+        return {"success": True, "path": save_path}
+    except ExportCancelled:
+        raise
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+# ----------------------
+# bulk export
+# ----------------------
+def _render_xlsx_worker(payload: dict, template_path: str, save_path: str) -> Dict[str, Any]:
+    """Process-pool entry point: render one workbook and time it."""
+    start = time.perf_counter()
+    result = export_pmm_workloads_to_xlsx(payload, template_path, save_path)
+    result["render_ms"] = round((time.perf_counter() - start) * 1000.0, 1)
+    result["records"] = len((payload or {}).get("records") or [])
+    return result
+
+
+def _unique_name(name: str, used: set) -> str:
+    stem, ext = os.path.splitext(name)
+    candidate, n = name, 2
+    while candidate.lower() in used:
+        candidate = f"{stem}_{n}{ext}"
+        n += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def export_pmm_workloads_bulk(
+    subproject_ids: Iterable[int],
+    template_path: str,
+    target: str,
+    fetch_payload: Callable[[int], dict | None],
+    as_zip: bool = False,
+    max_workers: int | None = None,
+    progress: ProgressCallback | None = None,
+) -> Dict[str, Any]:
+    """Export one workbook per subproject, rendered in a process pool.
+
+    Args:
+        subproject_ids: subprojects to export.
+        template_path: path to pmm_sample.xlsx
+        target: output folder, or the zip file path when *as_zip* is set.
+        fetch_payload: ``fetch_payload(subproject_id)`` returning the export
+            payload (e.g. ``api_client.fetch_pmm_export_source``); called in
+            this process while earlier workbooks are already rendering.
+        as_zip: bundle all workbooks into a single zip at *target*.
+        max_workers: process count (default: CPU count, at most one per subproject).
+        progress: ``progress(stage, done, total)`` for "fetch" and "render".
+
+    Returns:
+        ``{"success", "path", "files", "errors", "timing"}``; a subproject
+        that fails is listed in ``errors`` and does not stop the others.
+    """
+    progress = progress or _no_progress
+    ids = list(dict.fromkeys(subproject_ids))
+    if not ids:
+        return {"success": False, "error": "No subprojects"}
+    if not os.path.exists(template_path):
+        return {"success": False, "error": f"Template not found: {template_path}"}
+
+    started = time.perf_counter()
+    try:
+        # Build the template cache once so the workers only read it
+        load_template_descriptor(template_path)
+    except Exception as e:
+        print(f"[pmm_export] template cache unavailable: {e}")
+
+    out_dir = tempfile.mkdtemp(prefix="pmm_bulk_") if as_zip else target
+    os.makedirs(out_dir, exist_ok=True)
+    files: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    fetch_ms = 0.0
+    used_names: set = set()
+    pending: Dict[Any, Dict[str, Any]] = {}
+    workers = max_workers or min(len(ids), os.cpu_count() or 1)
+
+    def _collect(futures) -> None:
+        for fut in futures:
+            entry = pending.pop(fut)
+            try:
+                result = fut.result()
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+            if result.get("success"):
+                entry.update(render_ms=result.get("render_ms"), records=result.get("records"))
+                files.append(entry)
             else:
-                # To preserve formatting, require a preformatted sheet in the template
-                raise RuntimeError("Template sheet '4QV2' not found. Please add it to the template to preserve formatting.")
-
-            # Capture prototype styles from header or first data row to replicate formatting
-            proto_row_idx = 2 if ws_list.max_row and ws_list.max_row >= 2 else 1
-            proto_styles: List[Tuple[Any, Any, Any, Any, Any, Any]] = []
-            for c_idx in range(1, 8):
-                cell = ws_list.cell(row=proto_row_idx, column=c_idx)
-                proto_styles.append((cell.font, cell.fill, cell.border, cell.alignment, cell.number_format, cell.protection))
-
-            # Clear only values in data rows (keep styles)
-            if ws_list.max_row and ws_list.max_row >= 2:
-                for r_idx in range(2, ws_list.max_row + 1):
-                    for c_idx in range(1, 8):  # A..G
-                        ws_list.cell(row=r_idx, column=c_idx).value = None
-
-            # Pre-compute phase windows based on end_date order
-            phase_windows: List[Tuple[dt.date, dt.date, str]] = []
+                errors.append({"subprojectId": entry["subprojectId"], "error": result.get("error")})
+            progress("render", len(files) + len(errors), len(ids))
+
+    # spawn: the app process runs Qt and Django threads, which a forked child must not inherit
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        for i, sid in enumerate(ids):
+            progress("fetch", i, len(ids))
+            t0 = time.perf_counter()
             try:
-                # collect phases with valid end_date
-                _phs = []
-                for p in phases or []:
-                    # Exclude milestones from phase windows
-                    if bool(p.get("milestone")):
-                        continue
-                    end_iso = p.get("end_date")
-                    name = p.get("name")
-                    if not end_iso or not name:
-                        continue
-                    try:
-                        end_dt = dt.date.fromisoformat(end_iso)
-                    except Exception:
-                        continue
-                    _phs.append((end_dt, str(name)))
-                # sort by end_date asc
-                _phs.sort(key=lambda x: x[0])
-                # build windows [prev_end+1, end]
-                prev_end: dt.date | None = None
-                for end_dt, nm in _phs:
-                    start_dt = (prev_end + dt.timedelta(days=1)) if prev_end else dt.date.min
-                    phase_windows.append((start_dt, end_dt, nm))
-                    prev_end = end_dt
-            except Exception:
-                phase_windows = []
-
-            # Sort records by work_category using Manpower Sheet order (name_to_row), then by week (ascending)
-            def _rec_wc_name(rec: dict) -> str:
-                wc = rec.get("work_category")
-                if wc is None:
-                    wc = rec.get("work_cotegory")
-                if isinstance(wc, dict):
-                    return wc.get("name") or "Unassigned"
-                return wc or "Unassigned"
-
-            def _rec_week_date(rec: dict) -> dt.date:
-                w = rec.get("week")
-                if not w:
-                    return dt.date.max
-                try:
-                    return _to_date(w)
-                except Exception:
-                    return dt.date.max
-
-            def _rec_wc_row(rec: dict) -> int:
-                nm = _rec_wc_name(rec)
-                # Place unknown categories at the end
-                return name_to_row.get(nm, 10**9)
-
-            sorted_records = sorted(records, key=lambda rec: (_rec_wc_row(rec), _rec_week_date(rec), _rec_wc_name(rec)))
-
-            row_idx = 2
-            for r in sorted_records:
-                name = r.get("name")
-                wc = r.get("work_category")
-                # Fallback for potential key typo
-                if wc is None:
-                    wc = r.get("work_cotegory")
-                if isinstance(wc, dict):
-                    wc_name = wc.get("name")
-                else:
-                    wc_name = wc
-                try:
-                    mw = float(r.get("man_week") or 0)
-                except Exception:
-                    mw = 0.0
-                week_iso = r.get("week")
-                year_val = None
-                month_val = None
-                weeknum_val = None
-                phase_name = None
-                if week_iso:
-                    try:
-                        wdate = _to_date(week_iso)
-                        year_val = wdate.year
-                        month_val = wdate.month
-                        # Use ISO week number (equivalent to Excel WEEKNUM with return_type=21)
-                        try:
-                            weeknum_val = wdate.isocalendar().week  # type: ignore[attr-defined]
-                        except Exception:
-                            weeknum_val = wdate.isocalendar()[1]
-                        # find matching phase window: start <= date <= end
-                        for (s_dt, e_dt, nm) in phase_windows:
-                            if s_dt <= wdate <= e_dt:
-                                phase_name = nm
-                                break
-                    except Exception:
-                        pass
-
-                # Write values
-                vals = [name, wc_name, mw, year_val, month_val, weeknum_val, phase_name]
-                for c_idx, val in enumerate(vals, start=1):
-                    cell = ws_list.cell(row=row_idx, column=c_idx)
-                    cell.value = val
-                    # Apply prototype formatting if available
-                    if 1 <= c_idx <= len(proto_styles):
-                        font, fill, border, alignment, number_format, protection = proto_styles[c_idx - 1]
-                        if font is not None:
-                            cell.font = font
-                        if fill is not None:
-                            cell.fill = fill
-                        if border is not None:
-                            cell.border = border
-                        if alignment is not None:
-                            cell.alignment = alignment
-                        if number_format is not None:
-                            cell.number_format = number_format
-                        if protection is not None:
-                            cell.protection = protection
-                row_idx += 1
-        except Exception:
-            pass
+                payload = fetch_payload(sid)
+            except ExportCancelled:
+                raise
+            except Exception as e:
+                payload = None
+                errors.append({"subprojectId": sid, "error": str(e)})
+            else:
+                if payload is None:
+                    errors.append({"subprojectId": sid, "error": "Subproject not found"})
+            fetch_ms += (time.perf_counter() - t0) * 1000.0
+            if payload is None:
+                continue
+            name = _unique_name(suggest_xlsx_filename(payload), used_names)
+            path = os.path.join(out_dir, name)
+            fut = executor.submit(_render_xlsx_worker, payload, template_path, path)
+            pending[fut] = {"subprojectId": sid, "name": name, "path": path}
+            # Harvest finished renders as we go so progress keeps moving
+            done = [f for f in pending if f.done()]
+            _collect(done)
+        progress("fetch", len(ids), len(ids))
+        while pending:
+            done, _ = wait(list(pending), timeout=0.5, return_when=FIRST_COMPLETED)
+            _collect(done)
+            # Report even without completions so a cancel request is noticed
+            progress("render", len(files) + len(errors), len(ids))
+    except ExportCancelled:
+        executor.shutdown(wait=True, cancel_futures=True)
+        # Renders still running at the cancel have finished by now: their files go too
+        for entry in files + list(pending.values()):
+            _remove_quietly(entry["path"])
+        if as_zip:
+            _remove_dir_quietly(out_dir)
+        raise
+    finally:
+        executor.shutdown(wait=True)
 
-        # Save as new file
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+    result_path = target
+    if as_zip:
+        progress("zip", 0, len(files))
         try:
-            wb.save(save_path)
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+            with zipfile.ZipFile(target, "w", zipfile.ZIP_STORED) as zf:
+                # xlsx parts are already deflated; storing avoids a second compression pass
+                for entry in files:
+                    zf.write(entry["path"], entry["name"])
+                    entry["path"] = f"{target}!{entry['name']}"
         except PermissionError:
-            # Common on Windows if the file is open in Excel
-            try:
-                wb.close()
-            except Exception:
-                pass
             return {
                 "success": False,
                 "error": "The file is currently open and cannot be written. Please close the file and try again.",
             }
-        except Exception as e:
-            # Ensure the workbook is closed before bubbling up
-            try:
-                wb.close()
-            except Exception:
-                pass
-            return {"success": False, "error": str(e)}
-        # Explicitly close workbook to release file handle on success
-        try:
-            wb.close()
-        except Exception:
-            pass
+        finally:
+            _remove_dir_quietly(out_dir)
+
+    total_ms = (time.perf_counter() - started) * 1000.0
+    render_ms = sum(e.get("render_ms") or 0 for e in files)
+    files.sort(key=lambda e: ids.index(e["subprojectId"]))
+    result: Dict[str, Any] = {
+        "success": bool(files),
+        "path": result_path,
+        "files": files,
+        "errors": errors,
+        "timing": {
+            "subprojects": len(ids),
+            "exported": len(files),
+            "workers": workers,
+            "total_ms": round(total_ms, 1),
+            "fetch_ms": round(fetch_ms, 1),
+            # Sum of per-workbook render times; compare with total_ms for the pool speed-up
+            "render_ms": round(render_ms, 1),
+        },
+    }
+    if not files:
+        result["error"] = "No workbook was exported"
+    return result
 
-        return {"success": True, "path": save_path}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+
+def _remove_dir_quietly(path: str) -> None:
+    import shutil
+    shutil.rmtree(path, ignore_errors=True)
 
 
 def _sanitize_filename(s: str) -> str:
@@ -334,52 +992,46 @@ def _sanitize_filename(s: str) -> str:
     return re.sub(r"[^\w\-_. ]", "_", s or "")
 
 
-def suggest_csv_filename(payload: dict) -> str:
-    """Suggest a default CSV filename using subproject name and week range."""
-    records = (payload or {}).get("records") or []
+def _suggest_filename(payload: dict, ext: str, week_range: Tuple[str, str] | None = None) -> str:
     sub = (payload or {}).get("subproject") or {}
     sp_name = _sanitize_filename(sub.get("name") or f"Subproject_{sub.get('id')}")
-    weeks = sorted({r.get("week") for r in records if r.get("week")})
+    if week_range and all(week_range):
+        return f"PMM_{sp_name}_{week_range[0]}_{week_range[1]}.{ext}"
+    records = (payload or {}).get("records") or []
+    weeks = {r.get("week") for r in records if r.get("week")}
+    weeks.update(row[1] for row in (payload or {}).get("pivot_rows") or [] if row[1])
+    weeks = sorted(weeks)
     if weeks:
-        return f"PMM_{sp_name}_{weeks[0]}_{weeks[-1]}.csv"
-    return f"PMM_{sp_name}.csv"
+        return f"PMM_{sp_name}_{weeks[0]}_{weeks[-1]}.{ext}"
+    return f"PMM_{sp_name}.{ext}"
 
 
-def suggest_xlsx_filename(payload: dict) -> str:
+def suggest_csv_filename(payload: dict, week_range: Tuple[str, str] | None = None) -> str:
+    """Suggest a default CSV filename using subproject name and week range."""
+    return _suggest_filename(payload, "csv", week_range)
+
+
+def suggest_xlsx_filename(payload: dict, week_range: Tuple[str, str] | None = None) -> str:
     """Suggest a default XLSX filename using subproject name and week range."""
-    records = (payload or {}).get("records") or []
-    sub = (payload or {}).get("subproject") or {}
-    sp_name = _sanitize_filename(sub.get("name") or f"Subproject_{sub.get('id')}")
-    weeks = sorted({r.get("week") for r in records if r.get("week")})
-    if weeks:
-        return f"PMM_{sp_name}_{weeks[0]}_{weeks[-1]}.xlsx"
-    return f"PMM_{sp_name}.xlsx"
+    return _suggest_filename(payload, "xlsx", week_range)
+
 
+def export_pmm_workloads_to_csv(payload: dict, save_path: str,
+                                progress: ProgressCallback | None = None) -> Dict[str, Any]:
+    """Export PMM workloads as a pivot CSV (rows=Work Category, columns=Week).
 
-def export_pmm_workloads_to_csv(payload: dict, save_path: str) -> Dict[str, Any]:
-    """Export PMM workloads as a pivot CSV (rows=Work Category, columns=Week)."""
+    *progress* is called like in :func:`export_pmm_workloads_to_xlsx`
+    ("aggregate", then "rows" per category).
+    """
+    progress = progress or _no_progress
     try:
         records = (payload or {}).get("records") or []
-        if not records:
+        if not records and not (payload or {}).get("pivot_rows"):
             return {"success": False, "error": "No records"}
 
-        # Compute weeks and matrix
-        weeks = sorted({r.get("week") for r in records if r.get("week")})
-        from collections import defaultdict
-        matrix = defaultdict(lambda: {w: 0.0 for w in weeks})
-        for r in records:
-            week = r.get("week")
-            if not week:
-                continue
-            wc = r.get("work_category") or {}
-            name = wc.get("name") or "Unassigned"
-            try:
-                val = float(r.get("man_week") or 0)
-            except Exception:
-                val = 0.0
-            matrix[name][week] = matrix[name].get(week, 0.0) + val
-
-        category_names = sorted(matrix.keys(), key=lambda s: (s is None, str(s)))
+        progress("aggregate", 0, len(records))
+        pivot = _payload_pivot(payload)
+        weeks = pivot.weeks
 
         os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
         try:
@@ -387,15 +1039,20 @@ def export_pmm_workloads_to_csv(payload: dict, save_path: str) -> Dict[str, Any]
                 writer = csv.writer(f)
                 header = ["Work Category", *weeks]
                 writer.writerow(header)
-                for name in category_names:
-                    row = [name]
-                    row.extend([matrix[name].get(w, 0.0) for w in weeks])
-                    writer.writerow(row)
+                total = len(pivot.categories)
+                for i, name in enumerate(pivot.categories):
+                    writer.writerow([name, *pivot.row(i)])
+                    progress("rows", i + 1, total)
         except PermissionError:
             return {
                 "success": False,
                 "error": "The file is currently open and cannot be written. Please close the file and try again.",
             }
+        except ExportCancelled:
+            _remove_quietly(save_path)
+            raise
         return {"success": True, "path": save_path}
+    except ExportCancelled:
+        raise
     except Exception as e:
         return {"success": False, "error": str(e)}
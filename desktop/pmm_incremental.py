@@ -0,0 +1,312 @@
+"""Incremental re-export of a PMM workbook written by :mod:`pmm_export`.
+
+After a stream-engine export with ``incremental=True`` a sidecar file
+``<workbook>.pmm-state.json`` records a content hash per Manpower cell
+(row, column) and per 4QV2 data row, the template hash and the size/mtime
+of the written workbook.  The next incremental export of the same file:
+
+- returns without touching the workbook when nothing changed;
+- otherwise patches only the changed Manpower cells in the sheet XML and
+  re-serialises only the 4QV2 rows that are new or changed (unchanged rows
+  are copied from the previous file, renumbered when they only moved);
+- falls back to a full export (returns ``None``) when the template changed,
+  the workbook was modified or replaced since the last export, or the state
+  is missing/unreadable.
+"""
+
+import datetime as dt
+import hashlib
+import json
+import os
+import re
+import tempfile
+import zipfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pmm_export
+
+STATE_SUFFIX = ".pmm-state.json"
+_STATE_VERSION = 1
+# Rows between progress reports (a cancel request is noticed at each report)
+_PROGRESS_EVERY = 2000
+
+_ROW_RE = re.compile(r'<row r="(\d+)"[^>]*?(?:/>|>.*?</row>)', re.S)
+_ROW_START_RE = re.compile(r'<row r="(\d+)"')
+_CELL_RE = re.compile(r'<c r="([A-Z]+)(\d+)"([^>]*?)(?:/>|>.*?</c>)', re.S)
+_ATTR_S_RE = re.compile(r'\ss="(\d+)"')
+_EXCEL_EPOCH = dt.date(1899, 12, 30)
+
+
+def state_path(save_path: str) -> str:
+    return save_path + STATE_SUFFIX
+
+
+def value_hash(value: Any) -> str:
+    if isinstance(value, dt.date):
+        value = value.isoformat()
+    return hashlib.sha1(repr(value).encode("utf-8")).hexdigest()[:16]
+
+
+def _cell_key(row: int, col: int) -> str:
+    return f"{row},{col}"
+
+
+class RowHasher:
+    """Pass 4QV2 rows through while recording their hashes."""
+
+    def __init__(self, rows: Iterable[List[Any]]) -> None:
+        self._rows = rows
+        self.hashes: List[str] = []
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        for vals in self._rows:
+            self.hashes.append(value_hash(tuple(vals)))
+            yield vals
+
+
+def _file_stamp(path: str) -> Dict[str, int]:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def save_state(save_path: str, descriptor: Dict[str, Any], cells: Dict[Tuple[int, int], Any],
+               row_hashes: List[str]) -> None:
+    state = {
+        "version": _STATE_VERSION,
+        "template_sha256": descriptor.get("sha256"),
+        "manpower_sheet": descriptor.get("manpower_sheet"),
+        "list_style_ids": descriptor.get("list_style_ids"),
+        "output": _file_stamp(save_path),
+        "cells": {_cell_key(r, c): value_hash(v) for (r, c), v in cells.items()},
+        "rows": row_hashes,
+    }
+    with open(state_path(save_path), "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+
+def _load_state(save_path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(state_path(save_path), "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("version") == _STATE_VERSION else None
+
+
+# ----------------------
+# sheet XML patching
+# ----------------------
+def _col_letter(col: int) -> str:
+    letters = ""
+    while col:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _col_index(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - 64
+    return n
+
+
+def _manpower_cell_xml(ref: str, attrs: str, value: Any) -> str:
+    # Keep the cell's style, drop its previous type
+    m = _ATTR_S_RE.search(attrs or "")
+    style = f' s="{m.group(1)}"' if m else ""
+    if isinstance(value, dt.date):
+        value = float((value - _EXCEL_EPOCH).days)
+    if value is None:
+        return f'<c r="{ref}"{style}/>'
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c r="{ref}"{style}><v>{"%.16g" % value}</v></c>'
+    text = pmm_export.xml_escape(pmm_export._ILLEGAL_XML.sub("", str(value)))
+    return f'<c r="{ref}"{style} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _patch_row(row_xml: str, row: int, changes: Dict[int, Any]) -> str:
+    open_end = row_xml.find(">")
+    if row_xml[open_end - 1] == "/":
+        head, body, tail = row_xml[:open_end - 1] + ">", "", "</row>"
+    else:
+        head, body, tail = row_xml[:open_end + 1], row_xml[open_end + 1:-len("</row>")], "</row>"
+    cells: List[Tuple[int, str]] = []
+    for m in _CELL_RE.finditer(body):
+        col = _col_index(m.group(1))
+        if col in changes:
+            cells.append((col, _manpower_cell_xml(m.group(1) + m.group(2), m.group(3), changes.pop(col))))
+        else:
+            cells.append((col, m.group(0)))
+    for col, value in changes.items():
+        cells.append((col, _manpower_cell_xml(f"{_col_letter(col)}{row}", "", value)))
+    cells.sort(key=lambda c: c[0])
+    # Cell ranges in the row's spans attribute would be stale; Excel does not need them
+    head = re.sub(r'\sspans="[^"]*"', "", head)
+    return head + "".join(xml for _, xml in cells) + tail
+
+
+def _split_sheet_data(sheet_xml: str) -> Tuple[str, str, str]:
+    """(head, sheetData content, tail) without regex scanning the whole sheet."""
+    start = sheet_xml.find("<sheetData")
+    if start < 0:
+        raise RuntimeError("Unexpected sheet XML")
+    open_end = sheet_xml.index(">", start)
+    if sheet_xml[open_end - 1] == "/":
+        return sheet_xml[:start], "", sheet_xml[open_end + 1:]
+    end = sheet_xml.rindex("</sheetData>")
+    return sheet_xml[:start], sheet_xml[open_end + 1:end], sheet_xml[end + len("</sheetData>"):]
+
+
+def patch_sheet_cells(sheet_xml: str, changes: Dict[Tuple[int, int], Any]) -> str:
+    """Set the given (row, col) cells in a worksheet XML string."""
+    by_row: Dict[int, Dict[int, Any]] = {}
+    for (row, col), value in changes.items():
+        by_row.setdefault(row, {})[col] = value
+    head, data, tail = _split_sheet_data(sheet_xml)
+    rows: List[Tuple[int, str]] = []
+    for rm in _ROW_RE.finditer(data):
+        row = int(rm.group(1))
+        xml = rm.group(0)
+        if row in by_row:
+            xml = _patch_row(xml, row, by_row.pop(row))
+        rows.append((row, xml))
+    for row, cols in by_row.items():
+        rows.append((row, _patch_row(f'<row r="{row}"/>', row, cols)))
+    rows.sort(key=lambda r: r[0])
+    return f"{head}<sheetData>{''.join(x for _, x in rows)}</sheetData>{tail}"
+
+
+def _list_sheet_rows(data: str) -> Dict[int, str]:
+    """Row XML fragments of a sheetData body keyed by row number."""
+    starts = [(m.start(), int(m.group(1))) for m in _ROW_START_RE.finditer(data)]
+    rows: Dict[int, str] = {}
+    for k, (pos, row) in enumerate(starts):
+        end = starts[k + 1][0] if k + 1 < len(starts) else len(data)
+        rows[row] = data[pos:end]
+    return rows
+
+
+def _renumber_row(fragment: str, old_row: int, new_row: int) -> str:
+    return re.sub(r'(r="[A-Z]*)%d"' % old_row, r'\g<1>%d"' % new_row, fragment)
+
+
+def _rewrite_list_sheet(sheet_xml: str, rows: List[List[Any]], hashes: List[str], old_hashes: List[str],
+                        style_ids: List[int], progress=None) -> Tuple[str, int]:
+    """New 4QV2 XML; returns (xml, number of re-serialised or removed rows).
+
+    A row whose hash equals the old row at the same position is copied as
+    is; a row that only moved (records inserted/removed before it) is copied
+    and renumbered.
+    """
+    head, data, tail = _split_sheet_data(sheet_xml)
+    old_rows = _list_sheet_rows(data)
+    old_by_hash: Dict[str, int] = {}
+    for j, h in enumerate(old_hashes):
+        old_by_hash.setdefault(h, j)
+    parts = [old_rows.get(1, "")]
+    changed = 0
+    reused = set()
+    letters = pmm_export._LIST_COL_LETTERS
+    progress = progress or pmm_export._no_progress
+    total = len(hashes)
+    for i, (vals, h) in enumerate(zip(rows, hashes)):
+        if i % _PROGRESS_EVERY == 0:
+            # May raise ExportCancelled; nothing has been written yet
+            progress("rewrite", i, total)
+        row_idx = i + 2
+        fragment = None
+        if i < len(old_hashes) and old_hashes[i] == h:
+            fragment = old_rows.get(row_idx)
+            reused.add(i)
+        elif h in old_by_hash and (old_by_hash[h] + 2) in old_rows:
+            j = old_by_hash[h]
+            fragment = _renumber_row(old_rows[j + 2], j + 2, row_idx)
+            reused.add(j)
+        if fragment is None:
+            changed += 1
+            cells = "".join(
+                pmm_export._cell_xml(f"{letters[c]}{row_idx}", style_ids[c], v)
+                for c, v in enumerate(vals[:pmm_export.LIST_COLUMNS])
+            )
+            fragment = f'<row r="{row_idx}">{cells}</row>'
+        parts.append(fragment)
+    # A replaced row counts once; old rows not reused beyond that were removed
+    changed = max(changed, len(old_hashes) - len(reused))
+    last_ref = f"{letters[pmm_export.LIST_COLUMNS - 1]}{len(hashes) + 1}"
+    head = re.sub(r'<dimension ref="[^"]*"\s*/>', f'<dimension ref="A1:{last_ref}"/>', head, count=1)
+    progress("rewrite", total, total)
+    return f"{head}<sheetData>{''.join(parts)}</sheetData>{tail}", changed
+
+
+def reexport(save_path: str, descriptor: Dict[str, Any], cells: Dict[Tuple[int, int], Any],
+             rows: Iterable[List[Any]], progress=None, total: int = 0) -> Optional[Dict[str, Any]]:
+    """Update *save_path* in place from its sidecar state.
+
+    Returns the export result, or ``None`` when a full export is required
+    (*rows* is not consumed in that case).  *total* is the number of rows,
+    for the "rows" / "rewrite" progress reports.
+    """
+    progress = progress or pmm_export._no_progress
+    state = _load_state(save_path)
+    if state is None or not os.path.exists(save_path):
+        return None
+    if state.get("template_sha256") != descriptor.get("sha256") or state.get("output") != _file_stamp(save_path):
+        return None
+    style_ids = state.get("list_style_ids")
+
+    old_cells: Dict[str, str] = state.get("cells") or {}
+    new_cells = {_cell_key(r, c): value_hash(v) for (r, c), v in cells.items()}
+    changes: Dict[Tuple[int, int], Any] = {
+        (r, c): v for (r, c), v in cells.items() if old_cells.get(_cell_key(r, c)) != new_cells[_cell_key(r, c)]
+    }
+    for key in old_cells.keys() - new_cells.keys():
+        r, c = (int(x) for x in key.split(","))
+        changes[(r, c)] = None  # cleared since the last export
+
+    # Hashed as the rows stream in, reporting (and honouring a cancel) like a full export
+    hashed = [(vals, value_hash(tuple(vals))) for vals in pmm_export._report_rows(rows, progress, total)]
+    rows = [vals for vals, _ in hashed]
+    row_hashes = [h for _, h in hashed]
+    old_hashes: List[str] = state.get("rows") or []
+    if not changes and row_hashes == old_hashes:
+        return {"success": True, "path": save_path, "incremental": True, "changedCells": 0, "changedRows": 0}
+
+    with zipfile.ZipFile(save_path) as src:
+        manpower_part = pmm_export._sheet_part(src, state.get("manpower_sheet") or "")
+        list_part = pmm_export._sheet_part(src, pmm_export.LIST_SHEET_NAME) if style_ids is not None else None
+        if manpower_part is None or (style_ids is not None and list_part is None):
+            return None
+        replaced: Dict[str, bytes] = {}
+        if changes:
+            replaced[manpower_part] = patch_sheet_cells(src.read(manpower_part).decode("utf-8"), changes).encode("utf-8")
+        changed_rows = 0
+        if list_part is not None and row_hashes != old_hashes:
+            xml, changed_rows = _rewrite_list_sheet(
+                src.read(list_part).decode("utf-8"), rows, row_hashes, old_hashes, style_ids, progress)
+            replaced[list_part] = xml.encode("utf-8")
+
+        progress("save", 0, 0)
+        fd, part_path = tempfile.mkstemp(suffix=".xlsx.part", dir=os.path.dirname(save_path) or ".")
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(part_path, "w", zipfile.ZIP_DEFLATED) as dst:
+                for item in src.infolist():
+                    data = replaced.get(item.filename)
+                    dst.writestr(item, data if data is not None else src.read(item.filename))
+        except BaseException:
+            pmm_export._remove_quietly(part_path)
+            raise
+    try:
+        os.replace(part_path, save_path)
+    except PermissionError:
+        pmm_export._remove_quietly(part_path)
+        return {
+            "success": False,
+            "error": "The file is currently open and cannot be written. Please close the file and try again.",
+        }
+    save_state(save_path, {"sha256": state.get("template_sha256"),
+                           "manpower_sheet": state.get("manpower_sheet"),
+                           "list_style_ids": style_ids}, cells, row_hashes)
+    return {"success": True, "path": save_path, "incremental": True,
+            "changedCells": len(changes), "changedRows": changed_rows}
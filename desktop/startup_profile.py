@@ -0,0 +1,62 @@
+"""Startup timing marks printed with ``--profile-startup``.
+
+Marks are cheap and always recorded; the report is only printed when
+profiling has been enabled.  ``t0`` is taken when this module is first
+imported, which ``app_window`` does before anything else.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+REPORT_MARKS = ("import", "django_setup", "first_query", "first_paint")
+
+_t0 = time.perf_counter()
+_enabled = False
+_reported = False
+_lock = threading.Lock()
+# name -> (seconds since t0, duration or None)
+_marks: Dict[str, Tuple[float, Optional[float]]] = {}
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def mark(name: str, duration: Optional[float] = None) -> None:
+    """Record *name* once; later calls with the same name are ignored."""
+    if name in _marks:
+        return
+    with _lock:
+        if name in _marks:
+            return
+        _marks[name] = (time.perf_counter() - _t0, duration)
+    if all(m in _marks for m in REPORT_MARKS):
+        report()
+
+
+@contextmanager
+def measure(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        mark(name, time.perf_counter() - start)
+
+
+def report(force: bool = False) -> None:
+    global _reported
+    if not _enabled or (_reported and not force):
+        return
+    _reported = True
+    lines = ["[startup] timing (seconds since launch)"]
+    for name in REPORT_MARKS:
+        if name not in _marks:
+            lines.append(f"  {name:<13}       -")
+            continue
+        at, duration = _marks[name]
+        extra = f"  (took {duration:.3f})" if duration is not None else ""
+        lines.append(f"  {name:<13} {at:8.3f}{extra}")
+    print("\n".join(lines))
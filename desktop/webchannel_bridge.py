@@ -1,16 +1,79 @@
 """Bridge definitions for Qt WebChannel communication."""
 
-from typing import Any, Tuple
-from PySide6.QtCore import QObject, Slot, QStandardPaths
+from typing import Any, Callable, Optional, Tuple
+from PySide6.QtCore import QObject, Signal, Slot, QStandardPaths
 from PySide6.QtWidgets import QFileDialog, QApplication
 
 import api_client
 import cache  # 追加
+import entity_store
+import export_jobs
+import hashlib
 import json
+import perf
+import threading
+
+
+# Slots callable through callBatch; exports are excluded because they open dialogs.
+_BATCH_READ_METHODS = {
+    "initLoad", "fetchDistributePage", "fetchProjectPage", "fetchAssignmentPage",
+    "fetchSteps", "fetchAssignmentTasks", "fetchAssignmentWorkloads", "fetchOverAllocations", "previewDelete",
+    "getPerfStats",
+}
+_BATCH_WRITE_METHODS = {
+    "createEntity", "updateEntity", "deleteEntity", "deleteEntityCascade",
+    "acquireEditLock", "heartbeatEditLock", "releaseEditLock", "saveFilterConfig",
+}
+
+
+def _write_failure(method: str, res: Any) -> Optional[str]:
+    """Why the result of write slot *method* is a failure, or None when it succeeded.
+
+    A write fails with a dict carrying ``error`` / ``success: False`` or with a
+    falsy result (``deleteEntity`` returns False, ``updateEntity`` nothing for
+    a missing row).
+    """
+    if not res:
+        return f"{method} failed"
+    if isinstance(res, dict) and (res.get("error") or res.get("success") is False):
+        return str(res.get("message") or res.get("error") or f"{method} failed")
+    return None
+
+
+class _BatchAborted(Exception):
+    def __init__(self, index: int, message: str) -> None:
+        super().__init__(message)
+        self.index = index
 
 
 class DataBridge(QObject):
+    # (snapshot key, refreshed result) emitted after a background refresh
+    pageRefreshed = Signal(str, "QVariant")
+    # list of {"op", "type", "id", "fields", "data"} for every backend change
+    entitiesChanged = Signal("QVariant")
+    # (job id, {"kind", "stage", "done", "total"}) while a background export runs
+    exportProgress = Signal(str, "QVariant")
+    # (job id, exporter result) once a background export has finished
+    exportFinished = Signal(str, "QVariant")
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._refreshing: set = set()
+        self._refresh_lock = threading.Lock()
+        # change events held back until a callBatch transaction commits
+        self._batch_events: Optional[list] = None
+        self._batch_thread: Optional[int] = None
+        api_client.add_change_listener(self._on_entities_changed)
+
+    def _on_entities_changed(self, events: list) -> None:
+        if self._batch_events is not None and threading.get_ident() == self._batch_thread:
+            self._batch_events.extend(events)
+            return
+        # May be called from a worker thread; Qt queues the emission.
+        self.entitiesChanged.emit(events)
+
     @Slot(int, result="QVariant")
+    @perf.instrument
     def openFlowPtUrl(self, asset_id: int) -> Any:
         import webbrowser
         url = f"https://flow-pt.example.com/assets/{asset_id}"
@@ -27,78 +90,201 @@ class DataBridge(QObject):
         end = start + _dt.timedelta(weeks=8) - _dt.timedelta(days=1)
         return (start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
 
+    # ----- local snapshot (entity_store) -----
+    def _snapshot_first(self, key: str, loader: Callable[[], Any], extra: Optional[dict] = None) -> Any:
+        """Return the last stored result for *key* and refresh it in the background.
+
+        Without a snapshot the loader runs synchronously; its result is stored
+        in the background so the caller does not wait for the store write.
+        *extra* (per-call UI fields, never stored) is added to the returned
+        result and to the ``pageRefreshed`` payload.
+        """
+        extra = extra or {}
+        snapshot = entity_store.load_snapshot(key)
+        if snapshot is None:
+            result = loader()
+            # The store thread gets its own copy: the caller may change the result
+            threading.Thread(target=api_client._mirror, args=(entity_store.save_snapshot, key, dict(result)),
+                             daemon=True).start()
+            return {**result, **extra}
+        with self._refresh_lock:
+            start = key not in self._refreshing
+            self._refreshing.add(key)
+        if start:
+            threading.Thread(target=self._refresh_snapshot, args=(key, loader, extra), daemon=True).start()
+        return {**snapshot, "stale": True, **extra}
+
+    def _refresh_snapshot(self, key: str, loader: Callable[[], Any], extra: Optional[dict] = None) -> None:
+        try:
+            previous = entity_store.load_snapshot(key)
+            result = loader()
+            api_client._mirror(entity_store.save_snapshot, key, result)
+            self._on_entities_changed(entity_store.diff_results(previous, result))
+            result = {**result, **(extra or {})}
+        except Exception as e:
+            # Backend unreachable: keep serving the snapshot read-only
+            result = {"offline": True, "message": str(e)}
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+        self.pageRefreshed.emit(key, result)
+
+    @staticmethod
+    def _init_load_key(project_id: Any, person_list: Any, date_range: Tuple[str, str], current_user: Any) -> str:
+        """Snapshot key of initLoad: one per combination of the loader's parameters."""
+        persons = hashlib.sha1(json.dumps(person_list, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        return f"init_load:{project_id}:{persons}:{date_range[0]}:{date_range[1]}:{current_user}"
+
     # Init loader: steps + three pages worth of data
     @Slot(result="QVariant")
+    @perf.instrument
     def initLoad(self) -> Any:
         project_id, person_list, current_user = cache.get_project_id_and_person_list()
         # project_id= cache.get("project_id")
         if current_user is None:
             current_user = 386
         start, end = self._default_assignment_range()
-        result = api_client.init_load(project_id, person_list, (start, end), current_user)
-        result["filters"] = cache.load_cache().get("filters", {})  # キャッシュからフィルター情報を追加
-        return result
+        key = self._init_load_key(project_id, person_list, (start, end), current_user)
+        # Snapshots taken with other parameters are never served again
+        api_client._mirror(entity_store.delete_snapshots, "init_load", key)
+        extra = {
+            "selectedSubprojectId": project_id,
+            "selectedPersonList": person_list,
+            "filters": cache.load_cache().get("filters", {}),  # キャッシュからフィルター情報を追加
+        }
+        try:
+            return self._snapshot_first(
+                key,
+                lambda: api_client.init_load(project_id, person_list, (start, end), current_user),
+                extra,
+            )
+        except Exception as e:
+            return {"error": True, "message": str(e)}
 
     # Page-specific fetchers
     @Slot(result="QVariant")
+    @perf.instrument
     def fetchDistributePage(self) -> Any:
         return api_client.fetch_distribute_page()
 
     @Slot(int, result="QVariant")
+    @perf.instrument
     def fetchProjectPage(self, subproject_id: int) -> Any:
-        result = api_client.fetch_project_page(subproject_id)
+        try:
+            result = self._snapshot_first(
+                f"project_page:{subproject_id}",
+                lambda: api_client.fetch_project_page(subproject_id),
+            )
+        except Exception as e:
+            return {"error": True, "message": str(e)}
         cache.set_cache_value("project_id", subproject_id)  # キャッシュを保存
         return result
 
     @Slot(str, str, result="QVariant")
+    @perf.instrument
     def fetchAssignmentPage(self, start: str, end: str) -> Any:
         return api_client.fetch_assignment_page(start, end)
 
     @Slot(result="QVariant")
+    @perf.instrument
     def fetchSteps(self) -> Any:
         return api_client.fetch_steps()
 
     @Slot(str, str, result="QVariant")
+    @perf.instrument
     def fetchAssignmentTasks(self, start: str, end: str) -> Any:
         return api_client.fetch_assignment_tasks(start, end)
 
     @Slot(str, str, result="QVariant")
+    @perf.instrument
     def fetchAssignmentWorkloads(self, start: str, end: str) -> Any:
         return api_client.fetch_assignment_workloads(start, end)
+
+    @Slot(str, result="QVariant")
+    @perf.instrument
+    def fetchOverAllocations(self, data: str) -> Any:
+        """Per-person weekly totals above a threshold (over-allocation), computed by the backend.
+
+        data: JSON ``{"startIso", "endIso", "threshold"?: 1.0, "personIds"?: [...],
+        "departmentIds"?: [...]}``.
+        """
+        try:
+            params = json.loads(data) if data else {}
+            start_iso = params.get("startIso")
+            end_iso = params.get("endIso")
+            if not start_iso or not end_iso:
+                return {"error": True, "message": "startIso and endIso are required"}
+            threshold = params.get("threshold")
+            return api_client.fetch_over_allocations(
+                start_iso, end_iso,
+                1.0 if threshold is None else float(threshold),
+                [int(i) for i in params.get("personIds") or []],
+                [int(i) for i in params.get("departmentIds") or []],
+            )
+        except Exception as e:
+            return {"error": True, "message": str(e)}
     
     @Slot(str, result="QVariant")
+    @perf.instrument
     def createEntity(self, data: str) -> Any:
         data_dict = json.loads(data)
         result = api_client.create_entity(data_dict)
         return result
 
     @Slot(int, str, result="QVariant")
+    @perf.instrument
     def updateEntity(self, id: int, data: str) -> Any:
         data_dict = json.loads(data)
         result = api_client.update_entity(id, data_dict)
         return result
     
     @Slot(str, int, result="QVariant")
+    @perf.instrument
     def deleteEntity(self, type: str, id: int) -> Any:
         result = api_client.delete_entity(type, id)
         return result
     
+    @Slot(result="QVariant")
+    @perf.instrument
+    def supportsCascadeDelete(self) -> Any:
+        """Whether previewDelete / deleteEntityCascade are available; the UI offers them only then."""
+        try:
+            return {"success": True, "supported": api_client.supports_cascade_delete()}
+        except Exception as e:
+            return {"success": False, "supported": False, "error": str(e)}
+
+    @Slot(str, int, result="QVariant")
+    @perf.instrument
+    def previewDelete(self, type: str, id: int) -> Any:
+        """Rows deleteEntityCascade would remove / unlink, per entity type."""
+        return api_client.preview_delete(type, id)
+
+    @Slot(str, int, result="QVariant")
+    @perf.instrument
+    def deleteEntityCascade(self, type: str, id: int) -> Any:
+        """Delete an entity and its dependents in one backend transaction; returns the counts removed."""
+        return api_client.delete_entity_cascade(type, id)
+
     @Slot(int, int, result="QVariant")
+    @perf.instrument
     def acquireEditLock(self, subproject_id: int, user_id: int) -> Any:
         result = api_client.acquire_edit_lock(subproject_id, user_id)
         return result
     
     @Slot(int, int, result="QVariant")
+    @perf.instrument
     def heartbeatEditLock(self, subproject_id: int, user_id: int) -> Any:
         result = api_client.heartbeat_edit_lock(subproject_id, user_id)
         return result
     
     @Slot(int, int, result="QVariant")
+    @perf.instrument
     def releaseEditLock(self, subproject_id: int, user_id: int) -> Any:
         result = api_client.release_edit_lock(subproject_id, user_id)
         return result
     
     @Slot(str, result="QVariant")
+    @perf.instrument
     def saveFilterConfig(self, data: str) -> Any:
         try:
             payload = json.loads(data)
@@ -111,11 +297,138 @@ class DataBridge(QObject):
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    # ----- batching -----
+    def _run_batch_call(self, call: dict) -> Any:
+        method = call.get("method")
+        if method not in _BATCH_READ_METHODS and method not in _BATCH_WRITE_METHODS:
+            raise ValueError(f"Method not allowed in batch: {method}")
+        # JSON-string parameters may be sent as objects inside a batch
+        args = [json.dumps(a) if isinstance(a, (dict, list)) else a for a in call.get("args") or []]
+        return getattr(self, method)(*args)
+
+    @Slot(str, result="QVariant")
+    @perf.instrument
+    def callBatch(self, data: str) -> Any:
+        """Run an ordered list of {method, args} calls and return all results at once.
+
+        When the batch contains writes and the backend supports transactions the
+        whole batch runs atomically: the first failing write rolls back every
+        write before it and the remaining calls are skipped.
+        """
+        try:
+            calls = json.loads(data)
+            if not isinstance(calls, list):
+                raise ValueError("callBatch expects a JSON array")
+        except Exception as e:
+            return {"success": False, "error": str(e), "results": []}
+
+        results: list = []
+        atomic = (any(c.get("method") in _BATCH_WRITE_METHODS for c in calls)
+                  and api_client.supports_transactions())
+        if not atomic:
+            for call in calls:
+                try:
+                    res = self._run_batch_call(call)
+                except Exception as e:
+                    results.append({"ok": False, "error": str(e)})
+                    continue
+                error = _write_failure(call["method"], res) if call["method"] in _BATCH_WRITE_METHODS else None
+                results.append({"ok": False, "error": error, "result": res} if error else {"ok": True, "result": res})
+            return {"success": all(r["ok"] for r in results), "results": results}
+
+        self._batch_events, self._batch_thread = [], threading.get_ident()
+        try:
+            with api_client.transaction():
+                for i, call in enumerate(calls):
+                    try:
+                        res = self._run_batch_call(call)
+                    except Exception as e:
+                        raise _BatchAborted(i, str(e))
+                    if call["method"] in _BATCH_WRITE_METHODS:
+                        error = _write_failure(call["method"], res)
+                        if error:
+                            raise _BatchAborted(i, error)
+                    results.append({"ok": True, "result": res})
+        except _BatchAborted as e:
+            events = self._batch_events
+            self._batch_events, self._batch_thread = None, None
+            self._restore_mirror(events)
+            results = [{"ok": False, "error": "rolled back"} for _ in results]
+            results.append({"ok": False, "error": str(e)})
+            results.extend({"ok": False, "error": "skipped"} for _ in calls[e.index + 1:])
+            return {"success": False, "error": str(e), "failedIndex": e.index, "results": results}
+        events = self._batch_events
+        self._batch_events, self._batch_thread = None, None
+        if events:
+            self.entitiesChanged.emit(events)
+        return {"success": True, "results": results}
+
+    def _restore_mirror(self, events: list) -> None:
+        """Re-sync entity_store rows touched by a rolled-back batch."""
+        for ev in events:
+            if ev["op"] == "create":
+                api_client._mirror(entity_store.delete_entity, ev["type"], ev["id"])
+            else:
+                try:
+                    row = api_client.get_entity(ev["type"], ev["id"])
+                except Exception as e:
+                    print(f"[callBatch] mirror restore failed: {e}")
+                    continue
+                if row:
+                    api_client._mirror(entity_store.upsert_entity, row)
+                else:
+                    api_client._mirror(entity_store.delete_entity, ev["type"], ev["id"])
+
+    # ----- perf controls -----
+    # Not instrumented on purpose: reading, toggling or resetting the stats
+    # must not add samples of its own to them.
+    @Slot(result="QVariant")
+    def getPerfStats(self) -> Any:
+        """Per-slot / per-backend-call latency histograms and payload stats."""
+        return perf.get_stats()
+
+    @Slot(bool, result="QVariant")
+    def setPerfEnabled(self, enabled: bool) -> Any:
+        if enabled:
+            perf.enable()
+        else:
+            perf.disable()
+        return {"success": True, "enabled": perf.is_enabled()}
+
+    @Slot(result="QVariant")
+    def resetPerfStats(self) -> Any:
+        perf.reset()
+        return {"success": True}
+
     # @Slot(int, result="QVariant")
     # def getSubproject(self, subproject_id: int) -> Any:  # noqa: N802
     #     return api_client.get_subproject(subproject_id)
 
+    # ----- background exports -----
+    def _start_export(self, kind: str, path: str, run: Callable[[Any], dict]) -> dict:
+        """Submit an export job; the slot returns at once with its job id."""
+        job_id = export_jobs.submit(
+            kind, run,
+            on_progress=lambda job_id, info: self.exportProgress.emit(job_id, info),
+            on_finished=lambda job_id, result: self.exportFinished.emit(job_id, result),
+        )
+        return {"success": True, "jobId": job_id, "path": path}
+
+    def _pmm_template_path(self) -> str:
+        import os
+        # Determine template path from repo root: ../pmm_sample.xlsx relative to this file
+        here = os.path.dirname(os.path.abspath(__file__))
+        return os.path.join(os.path.dirname(here), "pmm_sample.xlsx")
+
+    @Slot(str, result="QVariant")
+    @perf.instrument
+    def cancelExport(self, job_id: str) -> Any:
+        if not export_jobs.cancel(job_id):
+            return {"success": False, "error": f"No running export: {job_id}"}
+        return {"success": True}
+
     @Slot(str, result="QVariant")
+    @perf.instrument
     def exportPMMWorkloadsCSV(self, data: str) -> Any:
         """Export PMMWorkload records to a pivoted CSV via pmm_export module."""
         try:
@@ -139,15 +452,18 @@ class DataBridge(QObject):
             if not path:
                 return {"success": False, "error": "canceled"}
 
-            # Delegate writing
-            result = _pmm_export.export_pmm_workloads_to_csv(payload, path)
-            return result
+            # Delegate writing to a background job; completion arrives via exportFinished
+            return self._start_export(
+                "pmm_csv", path,
+                lambda progress: _pmm_export.export_pmm_workloads_to_csv(payload, path, progress=progress),
+            )
         except Exception as e:
             import traceback
             traceback.print_exc()
             return {"success": False, "error": str(e)}
 
     @Slot(str, result="QVariant")
+    @perf.instrument
     def exportPMMWorkloadsXlsx(self, data: str) -> Any:
         """Export PMM Workloads into a copied Excel template via pmm_export module."""
         try:
@@ -156,10 +472,8 @@ class DataBridge(QObject):
             if not payload or not (payload.get("records") or payload.get("phases")):
                 return {"success": False, "error": "No records or phases"}
 
-            # Determine template path from repo root: ../pmm_sample.xlsx relative to this file
             import os
-            here = os.path.dirname(os.path.abspath(__file__))
-            template_path = os.path.join(os.path.dirname(here), "pmm_sample.xlsx")
+            template_path = self._pmm_template_path()
 
             # Ask where to save
             import pmm_export as _pmm_export
@@ -175,9 +489,170 @@ class DataBridge(QObject):
             if not save_path:
                 return {"success": False, "error": "canceled"}
 
-            # Call exporter
-            result = _pmm_export.export_pmm_workloads_to_xlsx(payload, template_path, save_path)
-            return result
+            # Patch an earlier export in place only when asked (writes a sidecar state file)
+            incremental = bool(payload.get("incremental"))
+            # Call exporter on a background job; completion arrives via exportFinished
+            return self._start_export(
+                "pmm_xlsx", save_path,
+                lambda progress: _pmm_export.export_pmm_workloads_to_xlsx(
+                    payload, template_path, save_path, progress=progress, incremental=incremental),
+            )
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            return {"success": False, "error": str(e)}
+
+    def _ask_export_path(self, title: str, suggested: str, file_filter: str) -> str:
+        import os
+        # Default to user's Downloads folder with suggested file name
+        parent = QApplication.activeWindow()
+        downloads = QStandardPaths.writableLocation(QStandardPaths.DownloadLocation) or os.path.expanduser("~/Downloads")
+        initial = os.path.join(downloads, suggested) if downloads else suggested
+        path, _ = QFileDialog.getSaveFileName(parent, title, initial, file_filter, options=QFileDialog.Options())
+        return path
+
+    @Slot(int, str, str, bool, result="QVariant")
+    @perf.instrument
+    def exportSubprojectPMMXlsx(self, subproject_id: int, start_iso: str, end_iso: str,
+                                incremental: bool = False) -> Any:
+        """Excel export of one subproject read from the backend (no records from the frontend).
+
+        start_iso / end_iso optionally limit the exported weeks ("" = unbounded).
+        incremental: keep a ``.pmm-state.json`` next to the workbook and patch
+        an unchanged earlier export in place (off unless the user asks for it).
+        """
+        try:
+            import pmm_export as _pmm_export
+            subproject = api_client.get_entity("Subproject", subproject_id)
+            if not subproject:
+                return {"success": False, "error": f"Subproject not found: {subproject_id}"}
+            template_path = self._pmm_template_path()
+            suggested = _pmm_export.suggest_xlsx_filename({"subproject": subproject}, (start_iso, end_iso))
+            save_path = self._ask_export_path("Save Excel", suggested, "Excel Files (*.xlsx)")
+            if not save_path:
+                return {"success": False, "error": "canceled"}
+
+            def run(progress):
+                progress("fetch", 0, 0)
+                payload = api_client.fetch_pmm_export_source(subproject_id, start_iso or None, end_iso or None)
+                if payload is None:
+                    return {"success": False, "error": f"Subproject not found: {subproject_id}"}
+                return _pmm_export.export_pmm_workloads_to_xlsx(
+                    payload, template_path, save_path, progress=progress, incremental=incremental)
+
+            return self._start_export("pmm_xlsx", save_path, run)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            return {"success": False, "error": str(e)}
+
+    @Slot(int, str, str, result="QVariant")
+    @perf.instrument
+    def exportSubprojectPMMCSV(self, subproject_id: int, start_iso: str, end_iso: str) -> Any:
+        """CSV pivot of one subproject from grouped backend totals (no raw records needed)."""
+        try:
+            import pmm_export as _pmm_export
+            subproject = api_client.get_entity("Subproject", subproject_id)
+            if not subproject:
+                return {"success": False, "error": f"Subproject not found: {subproject_id}"}
+            suggested = _pmm_export.suggest_csv_filename({"subproject": subproject}, (start_iso, end_iso))
+            path = self._ask_export_path("Save CSV", suggested, "CSV Files (*.csv)")
+            if not path:
+                return {"success": False, "error": "canceled"}
+
+            def run(progress):
+                progress("fetch", 0, 0)
+                payload = api_client.fetch_pmm_export_source(
+                    subproject_id, start_iso or None, end_iso or None, include_records=False)
+                if payload is None:
+                    return {"success": False, "error": f"Subproject not found: {subproject_id}"}
+                return _pmm_export.export_pmm_workloads_to_csv(payload, path, progress=progress)
+
+            return self._start_export("pmm_csv", path, run)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            return {"success": False, "error": str(e)}
+
+    @Slot(str, result="QVariant")
+    @perf.instrument
+    def exportPMMWorkloadsBulk(self, data: str) -> Any:
+        """Export one PMM workbook per subproject into a folder or a single zip.
+
+        data: JSON ``{"subprojectIds": [...], "zip": bool}``.  Grouped totals,
+        records and phases are fetched from the backend, so the frontend only
+        sends the ids.
+        """
+        try:
+            payload = json.loads(data) if data else {}
+            ids = [int(i) for i in payload.get("subprojectIds") or []]
+            if not ids:
+                return {"success": False, "error": "No subprojects"}
+            as_zip = bool(payload.get("zip"))
+
+            import os
+            import datetime as _dt
+            import pmm_export as _pmm_export
+            template_path = self._pmm_template_path()
+            parent = QApplication.activeWindow()
+            downloads = QStandardPaths.writableLocation(QStandardPaths.DownloadLocation) or os.path.expanduser("~/Downloads")
+            if as_zip:
+                suggested = f"PMM_{_dt.date.today().isoformat()}.zip"
+                initial = os.path.join(downloads, suggested) if downloads else suggested
+                target, _ = QFileDialog.getSaveFileName(parent, "Save Zip", initial, "Zip Files (*.zip)",
+                                                        options=QFileDialog.Options())
+            else:
+                target = QFileDialog.getExistingDirectory(parent, "Export Folder", downloads or "")
+            if not target:
+                return {"success": False, "error": "canceled"}
+
+            return self._start_export(
+                "pmm_bulk", target,
+                lambda progress: _pmm_export.export_pmm_workloads_bulk(
+                    ids, template_path, target, api_client.fetch_pmm_export_source,
+                    as_zip=as_zip, progress=progress),
+            )
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            return {"success": False, "error": str(e)}
+
+    @Slot(str, result="QVariant")
+    @perf.instrument
+    def exportPersonWorkloads(self, data: str) -> Any:
+        """Person x week workload table of the Assignment page (Excel or CSV).
+
+        data: JSON ``{"startIso", "endIso", "personIds"?: [...], "groupBy"?: "task" | "subproject",
+        "format"?: "xlsx" | "csv"}``.  Totals are grouped by the backend; the
+        file is written by a background job (see ``exportFinished``).
+        """
+        try:
+            params = json.loads(data) if data else {}
+            start_iso = params.get("startIso")
+            end_iso = params.get("endIso")
+            if not start_iso or not end_iso:
+                return {"success": False, "error": "startIso and endIso are required"}
+            person_ids = [int(i) for i in params.get("personIds") or []]
+            group_by = params.get("groupBy") or None
+            fmt = "csv" if params.get("format") == "csv" else "xlsx"
+
+            import person_workload_export as _pw_export
+            suggested = _pw_export.suggest_filename({"range": [start_iso, end_iso], "group_by": group_by}, fmt)
+            if fmt == "csv":
+                path = self._ask_export_path("Save CSV", suggested, "CSV Files (*.csv)")
+                write = _pw_export.export_person_workloads_to_csv
+            else:
+                path = self._ask_export_path("Save Excel", suggested, "Excel Files (*.xlsx)")
+                write = _pw_export.export_person_workloads_to_xlsx
+            if not path:
+                return {"success": False, "error": "canceled"}
+
+            def run(progress):
+                progress("fetch", 0, 0)
+                source = api_client.fetch_person_workload_export_source(start_iso, end_iso, person_ids, group_by)
+                return write(source, path, progress=progress)
+
+            return self._start_export(f"person_{fmt}", path, run)
         except Exception as e:
             import traceback
             traceback.print_exc()
@@ -13,6 +13,9 @@ from .models import (
     PersonWorkload,
     PMMWorkload,
     WorkCategory,
+    PersonWeekRollup,
+    PMMWeekRollup,
+    SubprojectWeekRollup,
 )
 
 
@@ -26,4 +29,6 @@ admin.site.register(Task)
 admin.site.register(PersonWorkload)
 admin.site.register(PMMWorkload)
 admin.site.register(WorkCategory)
-
+admin.site.register(PersonWeekRollup)
+admin.site.register(PMMWeekRollup)
+admin.site.register(SubprojectWeekRollup)
@@ -0,0 +1,231 @@
+"""Set-based cascading deletes with an impact preview.
+
+``Model.delete()`` lets Django's collector load every dependent row into
+memory and delete (and signal) them one at a time, which takes seconds for
+a large Subproject.  :func:`plan` walks the relations of the models
+instead and describes every dependent table as one queryset selecting its
+rows through nested subqueries on the level above, so
+
+- :func:`impact` counts what a delete would remove (one COUNT per table)
+  and what it would unlink (one COUNT per SET_NULL and M2M relation), and
+- :func:`delete` removes it with one ``UPDATE ... SET fk = NULL`` per
+  SET_NULL relation and one ``DELETE ... WHERE`` per table, leaves first,
+  in one transaction, and reports the ids it removed or changed.
+
+Rows removed this way send no signals: the rollups of the subprojects and
+persons involved are rebuilt and every touched collection gets a new
+CollectionVersion afterwards.
+
+The counts name entity types only: the rollup rows going with a delete are
+not listed, and removed M2M link rows are counted as ``updated`` on the
+model declaring the relation (e.g. ``"Task.assignees"``: tasks losing an
+assignee).
+"""
+
+from functools import reduce
+from operator import or_
+
+from django.db import models, transaction
+from django.db.models import Q
+
+from . import rollups
+from .models import CollectionVersion
+
+# Guards against a CASCADE loop in the schema
+MAX_DEPTH = 16
+
+# Maintained by api.rollups, never shown as entities
+_INTERNAL = {Rollup for targets in rollups.ROLLUPS.values() for Rollup, _ in targets}
+
+
+class Plan:
+    """Rows reached from a set of root rows, per model."""
+
+    def __init__(self) -> None:
+        self._deletes = {}  # model -> [queryset]; insertion order is re-sorted on every visit
+        self.set_null = []  # (model, field, queryset)
+
+    def add_delete(self, model, queryset) -> None:
+        # Moved to the end on every visit: a model always ends up after
+        # each of its parents, so reversed() deletes the leaves first
+        querysets = self._deletes.pop(model, [])
+        querysets.append(queryset)
+        self._deletes[model] = querysets
+
+    def deletes(self):
+        """[(model, queryset)] with parents before their children."""
+        result = []
+        for model, querysets in self._deletes.items():
+            if len(querysets) == 1:
+                qs = querysets[0]
+            else:
+                # Reached along several paths (e.g. PersonWorkload via Task and via Person)
+                qs = model._base_manager.filter(reduce(or_, [Q(pk__in=q.values("pk")) for q in querysets]))
+            result.append((model, qs))
+        return result
+
+
+def _reverse_relations(model):
+    # include_hidden: the FKs of auto-created M2M through tables are hidden
+    for rel in model._meta.get_fields(include_hidden=True):
+        if rel.auto_created and not rel.concrete and (rel.one_to_many or rel.one_to_one):
+            yield rel
+
+
+def plan(model, pks) -> Plan:
+    """The rows deleting *pks* of *model* deletes or unlinks.
+
+    Raises ``models.ProtectedError`` / ``models.RestrictedError`` when a
+    PROTECT / RESTRICT relation holds a row.
+    """
+    result = Plan()
+
+    def walk(model, qs, depth):
+        if depth > MAX_DEPTH:
+            raise ValueError(f"Relations below {model.__name__} are nested too deeply")
+        for rel in _reverse_relations(model):
+            child, field = rel.related_model, rel.field
+            child_qs = child._base_manager.filter(**{f"{field.name}__in": qs.values("pk")})
+            on_delete = field.remote_field.on_delete
+            if on_delete is models.CASCADE:
+                result.add_delete(child, child_qs)
+                walk(child, child_qs, depth + 1)
+            elif on_delete is models.SET_NULL:
+                result.set_null.append((child, field, child_qs))
+            elif on_delete in (models.PROTECT, models.RESTRICT):
+                blocking = list(child_qs[:1])
+                if blocking:
+                    error = models.ProtectedError if on_delete is models.PROTECT else models.RestrictedError
+                    raise error(f"{child.__name__}.{field.name} protects the {model.__name__} rows", set(blocking))
+            # DO_NOTHING / SET_DEFAULT / SET(): not used by this schema
+
+    root = model._base_manager.filter(pk__in=list(pks))
+    result.add_delete(model, root)
+    walk(model, root, 1)
+    return result
+
+
+def _public(model) -> bool:
+    return not model._meta.auto_created and model not in _INTERNAL
+
+
+def _link_updates(deletes):
+    """``{"Owner.field": rows}``: rows kept that lose M2M links with the through-table rows in *deletes*."""
+    deleted = dict(deletes)
+    updated = {}
+    for through, qs in deletes:
+        owner = through._meta.auto_created
+        if not owner:
+            continue
+        field = next(f for f in owner._meta.local_many_to_many if f.remote_field.through is through)
+        column = field.m2m_field_name()  # the FK of the through table to the owner
+        owners = qs.order_by().values_list(column, flat=True).distinct()
+        if owner in deleted:
+            owners = owners.exclude(**{f"{column}__in": deleted[owner].values("pk")})
+        n = owners.count()
+        if n:
+            updated[f"{owner.__name__}.{field.name}"] = n
+    return updated
+
+
+def _counts(the_plan):
+    deletes = the_plan.deletes()
+    deleted = {}
+    for model, qs in deletes:
+        if _public(model):
+            n = qs.count()
+            if n:
+                deleted[model.__name__] = n
+    updated = {}
+    for model, field, qs in the_plan.set_null:
+        n = qs.count()
+        if n:
+            updated[f"{model.__name__}.{field.name}"] = n
+    updated.update(_link_updates(deletes))
+    return {"deleted": deleted, "updated": updated}
+
+
+def impact(model, pks):
+    """``{"deleted": {type: rows}, "updated": {"Type.field": rows}}`` without writing anything.
+
+    ``updated`` counts the rows whose FK is set to NULL and, for an M2M field,
+    the rows kept that lose links.
+    """
+    return _counts(plan(model, pks))
+
+
+def _versioned(model):
+    # An M2M through table has no version of its own: its rows are part of both ends
+    if model._meta.auto_created:
+        return [f.related_model for f in model._meta.fields if f.is_relation]
+    return [model]
+
+
+def _affected_ids(the_plan, deletes):
+    """``({type: ids removed}, {type: ids kept but changed})`` before anything is written.
+
+    A kept row changes when its FK is set to NULL or when it loses M2M links
+    (rows of an auto-created through table).
+    """
+    deleted, changed = {}, {}
+    for child, qs in deletes:
+        if child._meta.auto_created:
+            for field in child._meta.fields:
+                if field.is_relation:
+                    changed.setdefault(field.related_model.__name__, set()).update(
+                        qs.order_by().values_list(field.attname, flat=True).distinct())
+        else:
+            deleted[child.__name__] = sorted(qs.order_by().values_list("pk", flat=True))
+    for child, _, qs in the_plan.set_null:
+        changed.setdefault(child.__name__, set()).update(qs.order_by().values_list("pk", flat=True))
+    changed = {
+        name: sorted(ids - set(deleted.get(name, ())))
+        for name, ids in changed.items()
+    }
+    return deleted, {name: ids for name, ids in changed.items() if ids}
+
+
+@transaction.atomic
+def delete(model, pks):
+    """Delete *pks* of *model* and every row depending on them.
+
+    Returns the counts actually removed / unlinked in the format of
+    :func:`impact`, plus ``"ids": {"deleted": {type: ids}, "changed":
+    {type: ids}}`` so callers holding copies of the rows can drop or re-read
+    them (one extra SELECT per table).
+    """
+    the_plan = plan(model, pks)
+    deletes = the_plan.deletes()
+    deleted_ids, changed_ids = _affected_ids(the_plan, deletes)
+    links = _link_updates(deletes)
+
+    # Rollup cells fed by rows about to disappear or lose their key
+    subproject_ids, person_ids, stale = set(), set(), set()
+    for source, field, qs in [(m, None, qs) for m, qs in deletes] + the_plan.set_null:
+        ids, fed = rollups.scope(source, qs, field and field.name)
+        subproject_ids |= ids["subproject_id"]
+        person_ids |= ids["person_id"]
+        stale |= fed
+
+    # Unlink first: every subquery still sees the rows of the levels above
+    updated = {}
+    touched = set()
+    for child, field, qs in the_plan.set_null:
+        n = qs.update(**{field.name: None})
+        if n:
+            updated[f"{child.__name__}.{field.name}"] = n
+            touched.add(child)
+    deleted = {}
+    for child, qs in reversed(deletes):
+        n = qs._raw_delete(qs.db)
+        if n:
+            if _public(child):
+                deleted[child.__name__] = n
+            touched.update(_versioned(child))
+    updated.update(links)
+
+    if subproject_ids or person_ids:
+        rollups.rebuild(subproject_ids=sorted(subproject_ids), person_ids=sorted(person_ids), only=stale)
+    for touched_model in touched:
+        CollectionVersion.bump(touched_model, recount=True)
+    return {"deleted": deleted, "updated": updated, "ids": {"deleted": deleted_ids, "changed": changed_ids}}
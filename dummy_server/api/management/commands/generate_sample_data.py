@@ -0,0 +1,332 @@
+"""Automotive design-themed sample data generator.
+
+    python manage.py generate_sample_data [--scale 1] [--seed 1] [--batch-size 5000]
+
+``--scale 1`` gives ~100 people and 25 subprojects; people and subprojects
+grow linearly with the scale (departments, steps and work categories stay
+fixed).  The same ``--seed`` and ``--start-date`` always produce the same
+rows.  Existing data is wiped first.
+
+Rows are generated subproject by subproject with explicit primary keys and
+written with ``bulk_create`` in batches (M2M through rows included), all in
+one transaction, so memory stays flat and the cost is a few INSERTs per
+batch instead of one per row.
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from api import signals
+from api.models import (
+    Asset,
+    Department,
+    MilestoneTask,
+    Person,
+    PersonWorkload,
+    Phase,
+    PMMWorkload,
+    Step,
+    Subproject,
+    Task,
+    WorkCategory,
+)
+
+DEPARTMENTS = [
+    ("Exterior Design", "外装デザイン"),
+    ("Interior Design", "内装デザイン"),
+    ("CMF", "カラー・素材・仕上げ"),
+    ("Engineering", "設計・エンジニアリング"),
+    ("Prototype", "試作・モックアップ"),
+]
+STEPS = [
+    ("Sketch", "255, 200, 0"),
+    ("Clay Modeling", "210, 105, 30"),
+    ("Digital Modeling", "70, 130, 180"),
+    ("Surfacing", "100, 149, 237"),
+    ("Prototyping", "46, 139, 87"),
+]
+WORK_CATEGORIES = [
+    ("Concept", "コンセプト立案"),
+    ("Exterior", "外装"),
+    ("Interior", "内装"),
+    ("CMF", "カラー素材"),
+    ("Aero", "空力"),
+    ("Ergonomics", "人間工学"),
+    ("HMI", "ヒューマンマシンインターフェース"),
+    ("Packaging", "車室パッケージ"),
+    ("Lighting", "照明設計"),
+    ("Acoustic", "音響"),
+]
+BASE_NAMES = [
+    "Aiko", "Daichi", "Haruto", "Yuna", "Sora", "Ren", "Mio", "Hinata", "Kaito", "Rin",
+    "Yuto", "Saki", "Koji", "Aya", "Tsubasa", "Mei", "Naoki", "Riku", "Sara", "Kei",
+] + [f"Designer{i:02d}" for i in range(21, 51)]
+VEHICLE_KINDS = ["Sedan", "SUV", "Coupe", "Hatchback", "EV Crossover", "Wagon", "Pickup"]
+PHASE_TYPES = ["DESIGN", "PRODT", "ENG"]
+PHASE_NAMES = ["Concept", "Design Development", "Final Design", "Milestone Review"]
+ASSET_NAMES = {
+    "Concept": [
+        "Exterior Theme A", "Exterior Theme B", "Interior Mood A", "Interior Mood B", "Color Board A",
+        "Proportion Study", "Sketch Board A", "Sketch Board B"
+    ],
+    "Design Development": [
+        "Front Fascia", "Rear Fascia", "Instrument Panel", "Seats", "Door Trim", "Console Module",
+        "Steering Wheel", "Roof Console"
+    ],
+    "Final Design": [
+        "Door Trim Final", "Center Console Final", "Headlamp Final", "Tail Lamp Final", "Grille Final",
+        "Wheel Design", "Mirror Housing", "Rear Spoiler"
+    ],
+}
+GENERIC_ASSET_NAMES = ["Generic Asset A", "Generic Asset B", "Generic Asset C", "Generic Asset D"]
+TASK_NAMES = ["Sketch refinement", "3D blockout", "Surface development", "Detailing", "Prototype fit check"]
+MILESTONE_TYPES = ["Date Receive", "Date Release", "Review", "DR"]
+
+PEOPLE_PER_SCALE = 100
+SUBPROJECTS_PER_SCALE = 25
+
+
+def monday_of(d: date) -> date:
+    return d - timedelta(days=d.weekday())
+
+
+class _BulkWriter:
+    """Buffers rows per model and writes them with bulk_create.
+
+    Models are flushed together in dependency order as soon as one buffer
+    is full, so parents are always inserted before their children.
+    """
+
+    def __init__(self, models, batch_size: int) -> None:
+        self.models = list(models)
+        self.batch_size = batch_size
+        self.buffers = {m: [] for m in self.models}
+        self.rows = {m: 0 for m in self.models}
+        self.seconds = {m: 0.0 for m in self.models}
+        self.next_id = {m: 1 for m in self.models}
+
+    def new_id(self, model) -> int:
+        pk = self.next_id[model]
+        self.next_id[model] = pk + 1
+        return pk
+
+    def add(self, obj) -> None:
+        buf = self.buffers[type(obj)]
+        buf.append(obj)
+        if len(buf) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        for model in self.models:
+            buf = self.buffers[model]
+            if not buf:
+                continue
+            start = time.perf_counter()
+            model.objects.bulk_create(buf, batch_size=self.batch_size)
+            self.seconds[model] += time.perf_counter() - start
+            self.rows[model] += len(buf)
+            buf.clear()
+
+
+class Command(BaseCommand):
+    help = "Wipe the api tables and generate deterministic sample data (bulk inserts)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=float, default=1.0,
+                            help="size factor: ~100 people and 25 subprojects per 1.0 (default 1)")
+        parser.add_argument("--seed", type=int, default=1, help="random seed (default 1)")
+        parser.add_argument("--start-date", default=None,
+                            help="YYYY-MM-DD the first subproject starts (default: today)")
+        parser.add_argument("--batch-size", type=int, default=5000, help="rows per INSERT batch (default 5000)")
+
+    def handle(self, *args, **options):
+        scale = options["scale"]
+        if scale <= 0:
+            raise CommandError("--scale must be positive")
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size must be positive")
+        try:
+            start = date.fromisoformat(options["start_date"]) if options["start_date"] else date.today()
+        except ValueError:
+            raise CommandError("--start-date must be YYYY-MM-DD")
+        rnd = random.Random(options["seed"])
+
+        writer = _BulkWriter(
+            [Department, Step, WorkCategory, Person, Subproject, Person.subproject.through, Phase, Asset,
+             Task, Task.assignees.through, MilestoneTask, PersonWorkload, PMMWorkload],
+            options["batch_size"],
+        )
+
+        started = time.perf_counter()
+        with signals.paused(), transaction.atomic():
+            self._wipe()
+            wiped = time.perf_counter()
+            self._generate(writer, rnd, scale, start)
+            writer.flush()
+            self._reset_sequences(writer.models)
+        finished = time.perf_counter()
+
+        total_rows = sum(writer.rows.values())
+        insert_seconds = finished - wiped
+        self.stdout.write(self.style.SUCCESS("Sample data inserted!"))
+        for model in writer.models:
+            rows = writer.rows[model]
+            if not rows:
+                continue
+            secs = writer.seconds[model]
+            rate = f"{rows / secs:12,.0f} rows/s" if secs > 0 else ""
+            self.stdout.write(f"  - {model.__name__:28s} {rows:10,d}  {rate}")
+        self.stdout.write(
+            f"Total: {total_rows:,d} rows in {insert_seconds:.2f}s "
+            f"({total_rows / max(insert_seconds, 1e-9):,.0f} rows/s incl. generation; "
+            f"wipe {wiped - started:.2f}s)"
+        )
+
+    def _wipe(self):
+        # Children first; without signal receivers Django deletes with plain DELETE statements
+        for model in (PersonWorkload, PMMWorkload, MilestoneTask, Task, Asset, Phase, Subproject,
+                      Person, Department, Step, WorkCategory):
+            model.objects.all().delete()
+
+    def _reset_sequences(self, models):
+        # Rows were inserted with explicit ids; let later creates continue after them
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def _generate(self, w: _BulkWriter, rnd: random.Random, scale: float, start: date) -> None:
+        departments = []
+        for name, desc in DEPARTMENTS:
+            obj = Department(id=w.new_id(Department), name=name, description=desc)
+            w.add(obj)
+            departments.append(obj.id)
+        steps = []
+        for name, color in STEPS:
+            obj = Step(id=w.new_id(Step), name=name, color=color)
+            w.add(obj)
+            steps.append(obj.id)
+        categories = {}
+        for name, desc in WORK_CATEGORIES:
+            obj = WorkCategory(id=w.new_id(WorkCategory), name=name, description=desc)
+            w.add(obj)
+            categories[obj.id] = name
+
+        # People (~100 per scale); about half report to another person
+        n_people = max(2, round(PEOPLE_PER_SCALE * scale))
+        people = list(range(1, n_people + 1))
+        for i in people:
+            name = f"{BASE_NAMES[(i - 1) % len(BASE_NAMES)]}-{i:03d}"
+            manager = None
+            if rnd.random() < 0.5:
+                manager = rnd.randrange(1, n_people)
+                if manager >= i:
+                    manager += 1
+            w.add(Person(id=w.new_id(Person), name=name, email=f"{name.lower()}@studio.example",
+                         department_id=rnd.choice(departments), manager_id=manager))
+
+        n_subprojects = max(1, round(SUBPROJECTS_PER_SCALE * scale))
+        for i in range(n_subprojects):
+            self._subproject(w, rnd, i, start, people, categories, steps)
+
+    def _subproject(self, w: _BulkWriter, rnd: random.Random, i: int, start: date,
+                    people, categories, steps) -> None:
+        PersonSubproject = Person.subproject.through
+        TaskAssignee = Task.assignees.through
+
+        category_ids = list(categories)
+        kind = rnd.choice(VEHICLE_KINDS)
+        year = 26 + (i % SUBPROJECTS_PER_SCALE) // 5
+        # Start dates cycle over a year so larger scales stay in a realistic window
+        sp_start = start + timedelta(days=(i % 52) * 7)
+        sp_end = sp_start + timedelta(days=120 + (i % 7) * 10)
+        sp_id = w.new_id(Subproject)
+        sp_name = f"{kind} MY{year} #{i + 1:02d}"
+        w.add(Subproject(id=sp_id, name=sp_name, start_date=sp_start, end_date=sp_end,
+                         editing_id=rnd.choice(people), pmm_status=rnd.choice(["planning", "approved"])))
+        for person_id in rnd.sample(people, k=min(len(people), rnd.randint(8, 15))):
+            w.add(PersonSubproject(person_id=person_id, subproject_id=sp_id))
+
+        # Phases (overlapping on purpose); at least one milestone per subproject
+        span = (sp_end - sp_start).days
+        chunk = max(20, span // len(PHASE_NAMES))
+        phases = []
+        for k, pname in enumerate(PHASE_NAMES):
+            ps = sp_start + timedelta(days=max(0, k * chunk - rnd.randint(0, 10)))
+            pe = sp_start + timedelta(days=(k + 1) * chunk - 1 + rnd.randint(0, 10))
+            if k == len(PHASE_NAMES) - 1:
+                pe = sp_end
+            milestone = pname == "Milestone Review" or (k == 0 and rnd.random() < 0.5)
+            phases.append(Phase(id=w.new_id(Phase), subproject_id=sp_id, name=pname, start_date=ps, end_date=pe,
+                                phase_type=rnd.choice(PHASE_TYPES), milestone=milestone))
+        if not any(p.milestone for p in phases):
+            phases[0].milestone = True
+        for phase in phases:
+            w.add(phase)
+
+        for phase in phases:
+            names = ASSET_NAMES.get(phase.name, GENERIC_ASSET_NAMES)
+            per_phase = rnd.randint(3, min(5, len(names)))
+            pspan = max(1, (phase.end_date - phase.start_date).days)
+            local = max(7, pspan // per_phase)
+            for asset_name in rnd.sample(names, k=per_phase):
+                offset = rnd.randint(0, max(0, pspan - local))
+                a_start = phase.start_date + timedelta(days=offset)
+                a_end = min(phase.end_date, a_start + timedelta(days=local))
+                asset_id = w.new_id(Asset)
+                w.add(Asset(id=asset_id, phase_id=phase.id, name=asset_name, start_date=a_start, end_date=a_end,
+                            asset_type=rnd.choice(["EXT", "INT", "Common"]),
+                            work_category_id=rnd.choice(category_ids), step_id=rnd.choice(steps)))
+                self._tasks(w, rnd, asset_id, asset_name, a_start, a_end, people, TaskAssignee)
+
+        # PMM workloads: 4 work categories per week of the subproject
+        week = monday_of(sp_start)
+        while week <= sp_end:
+            for wc in rnd.sample(category_ids, k=min(4, len(category_ids))):
+                w.add(PMMWorkload(id=w.new_id(PMMWorkload), subproject_id=sp_id, work_category_id=wc,
+                                  name=f"{sp_name} - {categories[wc]}", week=week,
+                                  man_week=round(rnd.uniform(1.0, 5.0), 1)))
+            week += timedelta(days=7)
+
+    def _tasks(self, w: _BulkWriter, rnd: random.Random, asset_id: int, asset_name: str,
+               a_start: date, a_end: date, people, TaskAssignee) -> None:
+        n = rnd.randint(2, 4)
+        aspan = max(1, (a_end - a_start).days)
+        tspan = max(3, aspan // n)
+        for k in range(n):
+            t_start = a_start + timedelta(days=min(k * tspan, max(0, aspan - 1)))
+            t_end = min(a_end, t_start + timedelta(days=tspan - 1))
+            task_id = w.new_id(Task)
+            task_name = f"{rnd.choice(TASK_NAMES)} {k + 1}"
+            w.add(Task(id=task_id, asset_id=asset_id, name=task_name, start_date=t_start, end_date=t_end,
+                       status=rnd.choice(["wtg", "ip", "fin"])))
+            assignees = rnd.sample(people, k=min(len(people), rnd.randint(1, 3)))
+            for person_id in assignees:
+                w.add(TaskAssignee(task_id=task_id, person_id=person_id))
+
+            # 1-2 person workloads on Mondays inside the task
+            weeks = []
+            cur = monday_of(t_start)
+            while cur <= t_end:
+                weeks.append(cur)
+                cur += timedelta(days=7)
+            if not weeks:
+                continue
+            for j in range(rnd.randint(1, min(2, len(weeks)))):
+                w.add(PersonWorkload(id=w.new_id(PersonWorkload), task_id=task_id,
+                                     person_id=rnd.choice(assignees), name=f"{task_name} - W{j + 1}",
+                                     week=rnd.choice(weeks), man_week=round(rnd.uniform(0.2, 1.0), 1)))
+
+        # 0-2 milestone tasks per asset
+        for j in range(rnd.randint(0, 2)):
+            if a_start > a_end:
+                continue
+            m_date = a_start + timedelta(days=rnd.randint(0, max(1, (a_end - a_start).days) - 1))
+            w.add(MilestoneTask(id=w.new_id(MilestoneTask), asset_id=asset_id, name=f"{asset_name} Milestone {j + 1}",
+                                start_date=m_date, end_date=m_date, milestone_type=rnd.choice(MILESTONE_TYPES)))
@@ -0,0 +1,26 @@
+"""``runserver`` with TCP_NODELAY on accepted connections.
+
+The development server writes the status line, headers and body of a
+response in separate small ``send`` calls.  On a kept-alive connection
+(``HttpShotgun`` reuses its connections) Nagle's algorithm then holds the
+body back until the client's delayed ACK, about 40 ms per request.
+"""
+
+import socket
+
+from django.contrib.staticfiles.management.commands.runserver import Command as StaticfilesRunserverCommand
+from django.core.servers.basehttp import WSGIServer
+
+
+class NoDelayWSGIServer(WSGIServer):
+    def get_request(self):
+        conn, addr = super().get_request()
+        try:
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+        return conn, addr
+
+
+class Command(StaticfilesRunserverCommand):
+    server_cls = NoDelayWSGIServer
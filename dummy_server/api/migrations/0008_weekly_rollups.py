@@ -0,0 +1,80 @@
+# Generated by Django 5.2.4 on 2026-10-19 09:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate(apps, schema_editor):
+    # Same grouping as api.rollups.rebuild, on the historical models
+    sources = [
+        ("PersonWorkload", "PersonWeekRollup", {"person_id": "person", "week": "week"}),
+        ("PersonWorkload", "SubprojectWeekRollup", {"subproject_id": "task__asset__phase__subproject", "week": "week"}),
+        ("PMMWorkload", "PMMWeekRollup", {"subproject_id": "subproject", "work_category_id": "work_category", "week": "week"}),
+    ]
+    for source_name, rollup_name, keys in sources:
+        Source = apps.get_model("api", source_name)
+        Rollup = apps.get_model("api", rollup_name)
+        cells = Source.objects.values(*keys.values()).order_by().annotate(_man_week=Sum("man_week"), _rows=Count("pk"))
+        Rollup.objects.bulk_create(
+            [
+                Rollup(**{field: cell[lookup] for field, lookup in keys.items()},
+                       man_week=cell["_man_week"] or 0, rows=cell["_rows"])
+                for cell in cells
+                if all(cell[lookup] is not None for field, lookup in keys.items() if field != "work_category_id")
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_collectionversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersonWeekRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.DateField()),
+                ('man_week', models.DecimalField(decimal_places=1, default=0, max_digits=10)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='week_rollups', to='api.person')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['week'], name='api_personw_week_3142f7_idx')],
+                'constraints': [models.UniqueConstraint(fields=('person', 'week'), name='person_week_rollup_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PMMWeekRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.DateField()),
+                ('man_week', models.DecimalField(decimal_places=1, default=0, max_digits=10)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('subproject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pmm_week_rollups', to='api.subproject')),
+                ('work_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pmm_week_rollups', to='api.workcategory')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('subproject', 'work_category', 'week'), name='pmm_week_rollup_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SubprojectWeekRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.DateField()),
+                ('man_week', models.DecimalField(decimal_places=1, default=0, max_digits=10)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('subproject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='week_rollups', to='api.subproject')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['week'], name='api_subproj_week_b2dd41_idx')],
+                'constraints': [models.UniqueConstraint(fields=('subproject', 'week'), name='subproject_week_rollup_key')],
+            },
+        ),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
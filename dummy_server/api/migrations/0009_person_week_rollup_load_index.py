@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-19 09:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_weekly_rollups'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='personweekrollup',
+            name='api_personw_week_3142f7_idx',
+        ),
+        migrations.AddIndex(
+            model_name='personweekrollup',
+            index=models.Index(fields=['week', 'man_week'], name='person_week_rollup_load'),
+        ),
+    ]
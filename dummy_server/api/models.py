@@ -2,6 +2,7 @@
 # Person, Subproject, Phase, Asset, Task, Workload, WorkCategoryなど
 
 from django.db import models
+from django.utils import timezone
 
 class Department(models.Model):
     name = models.CharField(max_length=128)
@@ -184,4 +185,88 @@ class WorkCategory(models.Model):
 
     @property
     def type(self):
-        return self.__class__.__name__
\ No newline at end of file
+        return self.__class__.__name__
+
+# コレクション(モデル)毎の更新バージョン: REST APIのETag/304判定に使用
+class CollectionVersion(models.Model):
+    name = models.CharField(max_length=64, unique=True)  # モデル名 (例: "Phase")
+    version = models.PositiveBigIntegerField(default=0)
+    count = models.BigIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} v{self.version} ({self.count})"
+
+    @classmethod
+    def bump(cls, model, delta: int = 0, recount: bool = False) -> None:
+        """Record a write to *model*'s table.
+
+        *delta* is the change of its row count; *recount* counts the rows
+        instead (after bulk writes that sent no signals).
+        """
+        name = model.__name__
+        count = model.objects.count() if recount else models.F("count") + delta
+        updated = cls.objects.filter(name=name).update(
+            version=models.F("version") + 1, count=count, updated=timezone.now())
+        if not updated:
+            # First write since the table was versioned: start from the real row count
+            cls.objects.get_or_create(name=name, defaults={"version": 1, "count": model.objects.count()})
+
+# 週次集計(ロールアップ): 工数の合計を事前計算して保持する
+# PersonWorkload / PMMWorkload の保存・削除時に api.rollups が差分で更新する
+class PersonWeekRollup(models.Model):
+    """Sum of PersonWorkload.man_week per person and week."""
+    person = models.ForeignKey(Person, on_delete=models.CASCADE, related_name='week_rollups')
+    week = models.DateField()
+    man_week = models.DecimalField(max_digits=10, decimal_places=1, default=0)
+    rows = models.PositiveIntegerField(default=0)  # 集計元の行数
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['person', 'week'], name='person_week_rollup_key')]
+        # 過負荷(週の合計 > しきい値)の検索: 週の範囲 + man_week をインデックスだけで絞り込む
+        indexes = [models.Index(fields=['week', 'man_week'], name='person_week_rollup_load')]
+
+    def __str__(self):
+        return f"{self.person.name} {self.week} {self.man_week}"
+
+    @property
+    def type(self):
+        return self.__class__.__name__
+
+class PMMWeekRollup(models.Model):
+    """Sum of PMMWorkload.man_week per subproject, work category and week."""
+    subproject = models.ForeignKey(Subproject, on_delete=models.CASCADE, related_name='pmm_week_rollups')
+    # work_category が NULL の行は一意制約が効かないため api.rollups 側で1行に保つ
+    work_category = models.ForeignKey('WorkCategory', on_delete=models.CASCADE, null=True, blank=True, related_name='pmm_week_rollups')
+    week = models.DateField()
+    man_week = models.DecimalField(max_digits=10, decimal_places=1, default=0)
+    rows = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['subproject', 'work_category', 'week'], name='pmm_week_rollup_key')]
+
+    def __str__(self):
+        wc = self.work_category.name if self.work_category else "(No Category)"
+        return f"{self.subproject.name} - {wc} {self.week} {self.man_week}"
+
+    @property
+    def type(self):
+        return self.__class__.__name__
+
+class SubprojectWeekRollup(models.Model):
+    """Sum of PersonWorkload.man_week per subproject (task.asset.phase.subproject) and week."""
+    subproject = models.ForeignKey(Subproject, on_delete=models.CASCADE, related_name='week_rollups')
+    week = models.DateField()
+    man_week = models.DecimalField(max_digits=10, decimal_places=1, default=0)
+    rows = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['subproject', 'week'], name='subproject_week_rollup_key')]
+        indexes = [models.Index(fields=['week'])]
+
+    def __str__(self):
+        return f"{self.subproject.name} {self.week} {self.man_week}"
+
+    @property
+    def type(self):
+        return self.__class__.__name__
@@ -0,0 +1,208 @@
+"""Incrementally maintained weekly man_week rollups.
+
+``PersonWeekRollup`` (person x week), ``SubprojectWeekRollup`` (subproject x
+week, from PersonWorkload through task.asset.phase) and ``PMMWeekRollup``
+(subproject x work category x week) hold the sum of ``man_week`` and the
+number of source rows, so workload views read one row per cell instead of
+aggregating the workload tables.
+
+A write to a source row moves its contribution: :func:`before_write`
+reads the current keys / man_week of the rows about to change,
+:func:`after_write` reads them again and applies the difference (one
+UPDATE per touched rollup row, INSERT for a new cell, DELETE when a cell
+loses its last row).  Moving a Task, Asset or Phase to another parent
+changes the subproject of every workload below it, and deleting a
+WorkCategory moves its PMM workloads to "no category"; the subprojects
+affected are recomputed with :func:`rebuild`.
+
+The model signals (``api.signals``) call the pair around save / delete;
+``FakeShotgun.update`` calls it around its ``QuerySet.update()``.  Bulk jobs
+running under ``signals.paused()`` get a full :func:`rebuild` afterwards.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from .models import (
+    Asset,
+    CollectionVersion,
+    Phase,
+    PMMWeekRollup,
+    PMMWorkload,
+    PersonWeekRollup,
+    PersonWorkload,
+    SubprojectWeekRollup,
+    Task,
+    WorkCategory,
+)
+
+# source model -> [(rollup model, {rollup field: source lookup})]
+ROLLUPS = {
+    PersonWorkload: [
+        (PersonWeekRollup, {"person_id": "person", "week": "week"}),
+        (SubprojectWeekRollup, {"subproject_id": "task__asset__phase__subproject", "week": "week"}),
+    ],
+    PMMWorkload: [
+        (PMMWeekRollup, {"subproject_id": "subproject", "work_category_id": "work_category", "week": "week"}),
+    ],
+}
+
+# Parents whose move changes the subproject of the PersonWorkload rows below them
+PARENT_SUBPROJECT = {
+    Task: "asset__phase__subproject",
+    Asset: "phase__subproject",
+    Phase: "subproject",
+}
+
+# Deleting a WorkCategory sets PMMWorkload.work_category to NULL with a plain
+# UPDATE (no signals): the subprojects using it are recomputed instead
+SET_NULL_PARENTS = {
+    WorkCategory: "pmm_workloads__subproject",
+}
+
+# Key fields that may be NULL (every other NULL key means the row is not rolled up)
+_NULLABLE_KEYS = {"work_category_id"}
+
+
+def _lookups(model):
+    return sorted({lookup for _, keys in ROLLUPS[model] for lookup in keys.values()})
+
+
+def _contributions(model, pks):
+    if not pks:
+        return []
+    return list(model.objects.filter(pk__in=pks).values("man_week", *_lookups(model)))
+
+
+def _subprojects(model, pks):
+    return dict(model.objects.filter(pk__in=pks).values_list("pk", PARENT_SUBPROJECT[model]))
+
+
+def before_write(model, pks):
+    """State of the rows *pks* of *model* before they are written (None: nothing to track)."""
+    if model in ROLLUPS:
+        return _contributions(model, pks)
+    if model in PARENT_SUBPROJECT:
+        return _subprojects(model, pks)
+    if model in SET_NULL_PARENTS:
+        lookup = SET_NULL_PARENTS[model]
+        return set(model.objects.filter(pk__in=pks, **{f"{lookup}__isnull": False})
+                   .values_list(lookup, flat=True).distinct())
+    return None
+
+
+def after_write(model, pks, state) -> None:
+    """Update the rollups for the write of rows *pks* since :func:`before_write` returned *state*."""
+    if state is None:
+        return
+    if model in ROLLUPS:
+        apply(model, state, _contributions(model, pks))
+    elif model in PARENT_SUBPROJECT:
+        now = _subprojects(model, pks)
+        moved = {sp for pk, old in state.items() if now.get(pk, old) != old for sp in (old, now.get(pk))}
+        moved.discard(None)
+        if moved:
+            rebuild(sorted(moved))
+    elif state:
+        rebuild(sorted(state))
+
+
+def _key(keys, row):
+    key = {field: row[lookup] for field, lookup in keys.items()}
+    if any(v is None for k, v in key.items() if k not in _NULLABLE_KEYS):
+        return None
+    return tuple(key.items())
+
+
+def _add(Rollup, key, man_week, rows) -> None:
+    # filter(work_category_id=None) matches the NULL cell (IS NULL)
+    cell = Rollup.objects.filter(**key)
+    if cell.update(man_week=F("man_week") + man_week, rows=F("rows") + rows):
+        if rows < 0:
+            cell.filter(rows__lte=0).delete()
+    elif rows > 0:
+        Rollup.objects.create(**key, man_week=man_week, rows=rows)
+
+
+def apply(model, before, after) -> None:
+    """Move the rollups of *model* from the *before* to the *after* contributions."""
+    with transaction.atomic():
+        for Rollup, keys in ROLLUPS[model]:
+            deltas = defaultdict(lambda: [Decimal(0), 0])
+            for sign, rows in ((-1, before), (1, after)):
+                for row in rows:
+                    key = _key(keys, row)
+                    if key is not None:
+                        delta = deltas[key]
+                        delta[0] += sign * (row["man_week"] or 0)
+                        delta[1] += sign
+            changed = False
+            for key, (man_week, rows) in deltas.items():
+                if man_week or rows:
+                    _add(Rollup, dict(key), man_week, rows)
+                    changed = True
+            if changed:
+                # F() updates send no post_save
+                CollectionVersion.bump(Rollup)
+
+
+def scope(model, queryset, field=None):
+    """Rollup cells fed by the *model* rows of *queryset*.
+
+    Returns ``({"subproject_id": ids, "person_id": ids}, rollup models)``;
+    with *field* only the rollups keyed on that source field count.
+    """
+    ids = {"subproject_id": set(), "person_id": set()}
+    fed = set()
+    for Rollup, keys in ROLLUPS.get(model, ()):
+        if field is not None and field not in keys.values():
+            continue
+        fed.add(Rollup)
+        for key in ids:
+            if key in keys:
+                ids[key].update(queryset.order_by().values_list(keys[key], flat=True).distinct())
+    for found in ids.values():
+        found.discard(None)
+    return ids, fed
+
+
+def rebuild(subproject_ids=None, person_ids=None, only=None) -> None:
+    """Recompute the rollups from the source rows.
+
+    With neither id argument every rollup is rebuilt; otherwise only the
+    cells of *subproject_ids* (SubprojectWeekRollup, PMMWeekRollup) and of
+    *person_ids* (PersonWeekRollup).  *only* limits it to those rollup models.
+    """
+    scopes = {"subproject_id": subproject_ids, "person_id": person_ids}
+    everything = subproject_ids is None and person_ids is None
+    with transaction.atomic():
+        for model, rollups in ROLLUPS.items():
+            for Rollup, keys in rollups:
+                if only is not None and Rollup not in only:
+                    continue
+                source = model.objects.all()
+                cells_qs = Rollup.objects.all()
+                if not everything:
+                    field = next((f for f, ids in scopes.items() if ids is not None and f in keys), None)
+                    if field is None:
+                        continue
+                    ids = list(scopes[field])
+                    cells_qs = cells_qs.filter(**{f"{field}__in": ids})
+                    source = source.filter(**{f"{keys[field]}__in": ids})
+                # One DELETE; the rollups have no dependents and are recounted below
+                cells_qs._raw_delete(cells_qs.db)
+                cells = (source.values(*keys.values()).order_by()
+                         .annotate(_man_week=Sum("man_week"), _rows=Count("pk")))
+                Rollup.objects.bulk_create(
+                    [
+                        Rollup(**dict(key), man_week=cell["_man_week"] or 0, rows=cell["_rows"])
+                        for cell in cells
+                        for key in [_key(keys, cell)]
+                        if key is not None
+                    ],
+                    batch_size=1000,
+                )
+                CollectionVersion.bump(Rollup, recount=True)
@@ -0,0 +1,203 @@
+"""ShotGrid-compatible JSON RPC endpoint (``POST /api3/json``).
+
+Serves :class:`FakeShotgun` over HTTP in the request format of the ShotGrid
+API (``shotgun_api3``), so the desktop app can use the dummy backend as a
+network service instead of importing Django in-process::
+
+    {"method_name": "read", "params": [{<auth, ignored>}, {<method params>}]}
+
+and answers ``{"results": ...}`` or, on failure,
+``{"exception": true, "message": "...", "error_code": ...}``.
+
+Methods:
+
+- ``read``: ``type``, ``filters``, ``return_fields``, ``sorts``,
+  ``paging`` (``current_page`` from 1, ``entities_per_page`` up to
+  ``ENTITIES_PER_PAGE``), ``return_paging_info``.  Returns
+  ``{"entities": [...], "paging_info": {"entity_count": n}}``; the count
+  is only computed when ``return_paging_info`` is set.
+- ``create``: ``type``, ``fields`` ([{field_name, value}]), ``return_fields``
+- ``update``: ``type``, ``id``, ``fields``
+- ``delete``: ``type``, ``id``
+- ``delete_impact`` / ``delete_cascade``: ``type``, ``id``; the rows a
+  cascading delete would remove / removes, per entity type (not part of
+  the ShotGrid API)
+- ``summarize``: ``type``, ``filters``, ``summaries``, ``grouping``
+- ``batch``: list of ``{"request_type": "create"|"update"|"delete", ...}``
+  with the parameters above, run in one transaction.
+
+Filters are accepted in the wire format of the ShotGrid API
+(``{"logical_operator": "and", "conditions": [{"path", "relation",
+"values"}]}``) or as the plain list :class:`FakeShotgun` takes.
+"""
+
+import json
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from fake_shotgun import FakeShotgun
+
+ENTITIES_PER_PAGE = 500
+
+# Relations whose "values" list is the value itself
+_LIST_RELATIONS = {"in", "not_in", "between", "range"}
+
+# Keys of method params / batch requests; an auth dict has none of them
+_PARAM_KEYS = {"type", "request_type"}
+
+# error_code in failure responses
+ERR_BAD_REQUEST = 100
+ERR_UNKNOWN_METHOD = 101
+ERR_NOT_FOUND = 102
+ERR_FAILED = 103
+
+_sg = FakeShotgun()
+
+
+class RpcError(Exception):
+    def __init__(self, message: str, code: int = ERR_FAILED) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+def _filters_from_wire(filters):
+    """(FakeShotgun filter list, filter_operator) from either filter format."""
+    if not filters:
+        return [], "all"
+    if isinstance(filters, list):
+        return filters, "all"
+    if not isinstance(filters, dict) or "conditions" not in filters:
+        raise RpcError("filters must be a list or {logical_operator, conditions}", ERR_BAD_REQUEST)
+
+    def _condition(cond):
+        if "conditions" in cond:
+            sub, op = _filters_from_wire(cond)
+            return {"filter_operator": op, "filters": sub}
+        values = cond.get("values")
+        relation = cond.get("relation") or "is"
+        if isinstance(values, list) and relation.lower() not in _LIST_RELATIONS:
+            value = values[0] if values else None
+        else:
+            value = values
+        return [cond["path"], relation, value]
+
+    operator = "any" if (filters.get("logical_operator") or "and").lower() == "or" else "all"
+    return [_condition(c) for c in filters["conditions"]], operator
+
+
+def _fields_from_wire(fields):
+    """{field_name: value} from [{"field_name", "value"}] (a plain dict is also accepted)."""
+    if isinstance(fields, dict):
+        return dict(fields)
+    return {f["field_name"]: f.get("value") for f in fields or []}
+
+
+def _read(params):
+    filters, operator = _filters_from_wire(params.get("filters"))
+    paging = params.get("paging") or {}
+    per_page = max(1, min(int(paging.get("entities_per_page") or ENTITIES_PER_PAGE), ENTITIES_PER_PAGE))
+    page = max(1, int(paging.get("current_page") or 1))
+    # Pages need a stable order; ShotGrid also falls back to id
+    sorts = params.get("sorts") or [{"field_name": "id", "direction": "asc"}]
+    entities = _sg.find(params["type"], filters, params.get("return_fields") or None, order=sorts,
+                        filter_operator=operator, limit=per_page, page=page)
+    result = {"entities": entities}
+    if params.get("return_paging_info"):
+        qs = _sg._apply_filters(_sg._model(params["type"]).objects.all(), filters, operator)
+        result["paging_info"] = {"entity_count": qs.count(), "current_page": page, "entities_per_page": per_page}
+    return result
+
+
+def _create(params):
+    return _sg.create(params["type"], _fields_from_wire(params.get("fields")), params.get("return_fields"))
+
+
+def _update(params):
+    return _sg.update(params["type"], params["id"], _fields_from_wire(params.get("fields")))
+
+
+def _delete(params):
+    return _sg.delete(params["type"], params["id"])
+
+
+def _delete_impact(params):
+    return _sg.delete_impact(params["type"], params["id"])
+
+
+def _delete_cascade(params):
+    return _sg.delete_cascade(params["type"], params["id"])
+
+
+def _summarize(params):
+    filters, operator = _filters_from_wire(params.get("filters"))
+    return _sg.summarize(params["type"], filters, params.get("summaries") or [],
+                         filter_operator=operator, grouping=params.get("grouping"))
+
+
+def _batch(requests):
+    if not isinstance(requests, list):
+        raise RpcError("batch expects a list of requests", ERR_BAD_REQUEST)
+    return _sg.batch([
+        {
+            "request_type": req.get("request_type"),
+            "entity_type": req.get("type") or req.get("entity_type"),
+            "entity_id": req.get("id") or req.get("entity_id"),
+            "data": _fields_from_wire(req.get("fields") or req.get("data")),
+            "return_fields": req.get("return_fields"),
+        }
+        for req in requests
+    ])
+
+
+METHODS = {
+    "read": _read,
+    "create": _create,
+    "update": _update,
+    "delete": _delete,
+    "delete_impact": _delete_impact,
+    "delete_cascade": _delete_cascade,
+    "summarize": _summarize,
+    "batch": _batch,
+}
+
+
+def _fault(message: str, code: int, status: int = 200) -> JsonResponse:
+    return JsonResponse({"exception": True, "message": message, "error_code": code}, status=status)
+
+
+@csrf_exempt
+@require_POST
+def json_rpc(request):
+    try:
+        payload = json.loads(request.body or b"{}")
+        method = payload["method_name"]
+        params = payload.get("params") or []
+    except (ValueError, KeyError, TypeError) as e:
+        return _fault(f"Malformed request: {e}", ERR_BAD_REQUEST, status=400)
+    handler = METHODS.get(method)
+    if handler is None:
+        return _fault(f"Unknown method: {method}", ERR_UNKNOWN_METHOD, status=400)
+    # params is [auth, method params] as sent by shotgun_api3; the auth part is ignored
+    if isinstance(params, list):
+        if len(params) == 2 and isinstance(params[0], dict) and not _PARAM_KEYS & params[0].keys():
+            params = params[1]
+        elif any(isinstance(p, dict) and _PARAM_KEYS & p.keys() for p in params):
+            return _fault("params is a bare list of requests; send [auth, [request, ...]]",
+                          ERR_BAD_REQUEST, status=400)
+        else:
+            return _fault("params must be [auth, params]", ERR_BAD_REQUEST, status=400)
+    elif not isinstance(params, dict):
+        return _fault("params must be [auth, params]", ERR_BAD_REQUEST, status=400)
+    try:
+        return JsonResponse({"results": handler(params)}, safe=False)
+    except RpcError as e:
+        return _fault(str(e), e.code)
+    except ObjectDoesNotExist as e:
+        return _fault(str(e), ERR_NOT_FOUND)
+    except (KeyError, TypeError) as e:
+        return _fault(f"Missing or invalid parameter: {e}", ERR_BAD_REQUEST)
+    except Exception as e:
+        return _fault(str(e), ERR_FAILED)
@@ -16,60 +16,84 @@ from .models import (
 )
 
 
-class DepartmentSerializer(serializers.ModelSerializer):
+class SparseFieldsModelSerializer(serializers.ModelSerializer):
+    """ModelSerializer honouring ``?fields=id,name,...`` of the request.
+
+    Unknown names are ignored; without the parameter all fields are returned.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = requested_fields(self.context.get("request"))
+        if wanted:
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
+
+
+def requested_fields(request):
+    """Field names of ``?fields=`` as a set, or None when not given."""
+    if request is None:
+        return None
+    raw = request.query_params.get("fields")
+    if not raw:
+        return None
+    return {name.strip() for name in raw.split(",") if name.strip()} or None
+
+
+class DepartmentSerializer(SparseFieldsModelSerializer):
     class Meta:
         model = Department
         fields = "__all__"
 
 
-class StepSerializer(serializers.ModelSerializer):
+class StepSerializer(SparseFieldsModelSerializer):
     class Meta:
         model = Step
         fields = "__all__"
 
 
-class PersonSerializer(serializers.ModelSerializer):
+class PersonSerializer(SparseFieldsModelSerializer):
     class Meta:
         model = Person
         fields = "__all__"
 
 
-class SubprojectSerializer(serializers.ModelSerializer):
+class SubprojectSerializer(SparseFieldsModelSerializer):
     class Meta:
         model = Subproject
         fields = "__all__"
 
 
-class PhaseSerializer(serializers.ModelSerializer):
+class PhaseSerializer(SparseFieldsModelSerializer):
     class Meta:
         model = Phase
         fields = "__all__"
 
 
-class AssetSerializer(serializers.ModelSerializer):
+class AssetSerializer(SparseFieldsModelSerializer):
     class Meta:
         model = Asset
         fields = "__all__"
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsModelSerializer):
     class Meta:
         model = Task
         fields = "__all__"
 
-class PersonWorkloadSerializer(serializers.ModelSerializer):
+class PersonWorkloadSerializer(SparseFieldsModelSerializer):
     class Meta:
         model = PersonWorkload
         fields = "__all__"
 
 
-class PMMWorkloadSerializer(serializers.ModelSerializer):
+class PMMWorkloadSerializer(SparseFieldsModelSerializer):
     class Meta:
         model = PMMWorkload
         fields = "__all__"
 
 
-class WorkCategorySerializer(serializers.ModelSerializer):
+class WorkCategorySerializer(SparseFieldsModelSerializer):
     class Meta:
         model = WorkCategory
         fields = "__all__"
@@ -0,0 +1,96 @@
+"""Keep CollectionVersion and the weekly rollups in step with writes to the api models.
+
+save / delete / M2M changes bump the version of the written model, and
+saves / deletes of workloads (or moves of their Task / Asset / Phase) update
+``api.rollups``.  ``QuerySet.update()`` and ``bulk_create()`` send no
+signals; callers using them bump the version and update the rollups
+themselves (see ``FakeShotgun.update``).  Bulk jobs can switch the handlers
+off with :func:`paused`, which also lets Django delete without loading
+every row.
+"""
+
+import contextlib
+
+from django.apps import apps
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+
+from . import rollups
+from .models import CollectionVersion
+
+
+def _versioned(model) -> bool:
+    return model._meta.app_label == "api" and model is not CollectionVersion
+
+
+def _on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:  # loaddata
+        return
+    CollectionVersion.bump(sender, 1 if created else 0)
+
+
+def _on_delete(sender, instance, **kwargs):
+    CollectionVersion.bump(sender, -1)
+
+
+def _on_m2m(sender, instance, action, model, **kwargs):
+    if not action.startswith("post_"):
+        return
+    # Both ends serialise the relation (ids on the owner, reverse lookups on the other)
+    CollectionVersion.bump(type(instance))
+    if model is not None and model is not type(instance) and _versioned(model):
+        CollectionVersion.bump(model)
+
+
+def _before_rollup_write(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None or instance._state.adding:
+        instance._rollup_state = [] if sender in rollups.ROLLUPS else None
+    else:
+        instance._rollup_state = rollups.before_write(sender, [instance.pk])
+
+
+def _after_rollup_write(sender, instance, raw=False, **kwargs):
+    state = instance.__dict__.pop("_rollup_state", None)
+    if not raw:
+        rollups.after_write(sender, [instance.pk], state)
+
+
+def _receivers():
+    for model in apps.get_app_config("api").get_models():
+        if not _versioned(model):
+            continue
+        yield post_save, _on_save, model, f"collection_version_save_{model.__name__}"
+        yield post_delete, _on_delete, model, f"collection_version_delete_{model.__name__}"
+        for field in model._meta.local_many_to_many:
+            yield (m2m_changed, _on_m2m, field.remote_field.through,
+                   f"collection_version_m2m_{model.__name__}_{field.name}")
+    for model in [*rollups.ROLLUPS, *rollups.PARENT_SUBPROJECT]:
+        yield pre_save, _before_rollup_write, model, f"rollup_pre_save_{model.__name__}"
+        yield post_save, _after_rollup_write, model, f"rollup_post_save_{model.__name__}"
+    # Deleted parents take their workloads with them (cascade), which are handled per row
+    for model in [*rollups.ROLLUPS, *rollups.SET_NULL_PARENTS]:
+        yield pre_delete, _before_rollup_write, model, f"rollup_pre_delete_{model.__name__}"
+        yield post_delete, _after_rollup_write, model, f"rollup_post_delete_{model.__name__}"
+
+
+def connect() -> None:
+    for signal, handler, sender, uid in _receivers():
+        signal.connect(handler, sender=sender, dispatch_uid=uid)
+
+
+def disconnect() -> None:
+    for signal, handler, sender, uid in _receivers():
+        signal.disconnect(handler, sender=sender, dispatch_uid=uid)
+
+
+@contextlib.contextmanager
+def paused():
+    """Run a bulk job without handlers; rollups are rebuilt and every collection recounted afterwards."""
+    disconnect()
+    try:
+        yield
+    finally:
+        rollups.rebuild()
+        connect()
+        for model in apps.get_app_config("api").get_models():
+            if _versioned(model):
+                CollectionVersion.bump(model, recount=True)
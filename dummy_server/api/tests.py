@@ -1,3 +1,778 @@
+"""Tests of the dummy backend and the ``api_client`` code running on it.
+
+- Query-count regression tests for the ``api_client`` page fetchers: every
+  fetcher runs against a small dataset, the dataset grows (more rows under
+  the same subproject and in new ones), and the fetcher runs again; the
+  number of SQL queries must not change.  A link serialized per row by
+  ``FakeShotgun`` (an N+1) makes the second count larger.
+- Rollup consistency: after every kind of write the weekly rollups equal a
+  fresh aggregate of their source rows.
+- ``api.cascade`` leaves the same rows and rollups as ``Model.delete()``.
+- The bridge's ``callBatch`` rolls back every write of a failing batch, on
+  the backend and in the local mirror; its slots report to ``perf``.
+- An incremental PMM re-export gives the same workbook as a full export,
+  and falls back to one without a usable sidecar state.
+- REST list endpoints: ETag / 304 revalidation, cursor pages and
+  ``?fields=``.
+- ``/api3/json`` accepts ``[auth, params]`` and rejects a bare batch list.
+
+    python manage.py test api
+"""
+
+import datetime
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+from unittest import mock
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Count, Sum
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from fake_shotgun import FakeShotgun
+
+from . import cascade, signals
+from .models import (
+    Asset,
+    CollectionVersion,
+    Department,
+    MilestoneTask,
+    Person,
+    PersonWeekRollup,
+    PersonWorkload,
+    Phase,
+    PMMWeekRollup,
+    PMMWorkload,
+    Step,
+    Subproject,
+    SubprojectWeekRollup,
+    Task,
+    WorkCategory,
+)
+from .rpc import ERR_BAD_REQUEST
+
+DESKTOP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "desktop")
+if DESKTOP_DIR not in sys.path:
+    sys.path.insert(0, DESKTOP_DIR)
+
+# The in-process backend: the queries run on the test database
+os.environ.pop("DUMMY_SHOTGUN_URL", None)
+os.environ["USE_DUMMY_SHOTGUN"] = "1"
+
+import api_client  # noqa: E402
+import entity_store  # noqa: E402
+import perf  # noqa: E402
+import pmm_export  # noqa: E402
+import pmm_incremental  # noqa: E402
+from export_jobs import ExportCancelled  # noqa: E402
+from webchannel_bridge import DataBridge  # noqa: E402
+
+FIRST_WEEK = datetime.date(2026, 1, 5)  # Monday
+WEEKS = 4
+RANGE = (FIRST_WEEK.isoformat(), (FIRST_WEEK + datetime.timedelta(weeks=WEEKS, days=-1)).isoformat())
+
+
+def seed(width, subproject=None):
+    """Add a tree *width* wide at every level under *subproject* (a new one if None)."""
+    department = Department.objects.create(name=f"Dept {Department.objects.count() + 1}")
+    step = Step.objects.create(name=f"Step {Step.objects.count() + 1}")
+    categories = [WorkCategory.objects.create(name=f"Category {WorkCategory.objects.count() + 1}")
+                  for _ in range(width)]
+    end = FIRST_WEEK + datetime.timedelta(weeks=WEEKS, days=-1)
+    if subproject is None:
+        subproject = Subproject.objects.create(name=f"Subproject {Subproject.objects.count() + 1}",
+                                               start_date=FIRST_WEEK, end_date=end, department=department)
+    persons = []
+    for i in range(width + 1):
+        n = Person.objects.count() + 1
+        person = Person.objects.create(name=f"Person {n}", email=f"person{n}@example.com", department=department,
+                                       manager=persons[0] if persons else None)
+        person.subproject.add(subproject)
+        persons.append(person)
+    for p in range(width):
+        phase = Phase.objects.create(subproject=subproject, name=f"Phase {p}", start_date=FIRST_WEEK, end_date=end)
+        for a in range(width):
+            asset = Asset.objects.create(phase=phase, name=f"Asset {p}-{a}", start_date=FIRST_WEEK, end_date=end,
+                                         work_category=categories[a], step=step)
+            MilestoneTask.objects.create(asset=asset, name=f"DR {p}-{a}", start_date=end, end_date=end)
+            for t in range(width):
+                task = Task.objects.create(asset=asset, name=f"Task {p}-{a}-{t}", start_date=FIRST_WEEK, end_date=end)
+                assignees = persons[t:t + 2]
+                task.assignees.set(assignees)
+                for person in assignees:
+                    for w in range(WEEKS):
+                        PersonWorkload.objects.create(task=task, person=person, name=task.name,
+                                                      week=FIRST_WEEK + datetime.timedelta(weeks=w), man_week="0.5")
+    for category in categories:
+        for w in range(WEEKS):
+            PMMWorkload.objects.create(subproject=subproject, work_category=category, name=category.name,
+                                       week=FIRST_WEEK + datetime.timedelta(weeks=w), man_week="1.0")
+    return subproject, persons
+
+
+class FetcherQueryCountTests(TestCase):
+    """The fetchers issue a fixed number of queries, whatever the row count."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Mirror into a throwaway store instead of the user's entities.sqlite3
+        entity_store.configure(":memory:")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.subproject, cls.persons = seed(2)
+
+    def count_queries(self, func, *args):
+        with CaptureQueriesContext(connection) as ctx:
+            result = func(*args)
+        self.assertFalse(isinstance(result, dict) and result.get("error"), result)
+        return len(ctx.captured_queries)
+
+    def grow(self):
+        """More than twice the rows under the subproject under test, plus another subproject."""
+        seed(3, self.subproject)
+        seed(2)
+
+    def assertConstantQueries(self, func, *args):
+        """Run *func* before and after :meth:`grow`; both runs must issue the same queries."""
+        # Warm up: first-use queries (e.g. a CollectionVersion row) are not per row
+        func(*args)
+        small = self.count_queries(func, *args)
+        self.grow()
+        large = self.count_queries(func, *args)
+        self.assertEqual(small, large, f"{func.__name__}: {small} queries before, {large} after the data grew")
+        return large
+
+    def test_fetch_project_page(self):
+        self.assertConstantQueries(api_client.fetch_project_page, self.subproject.id)
+        page = api_client.fetch_project_page(self.subproject.id)
+        self.assertEqual(len(page["tasks"]), Task.objects.filter(asset__phase__subproject=self.subproject).count())
+
+    def test_fetch_distribute_page(self):
+        self.assertConstantQueries(api_client.fetch_distribute_page)
+
+    def test_fetch_assignment_tasks(self):
+        self.assertConstantQueries(api_client.fetch_assignment_tasks, *RANGE)
+        self.assertEqual(len(api_client.fetch_assignment_tasks(*RANGE)["tasks"]), Task.objects.count())
+
+    def test_fetch_assignment_workloads(self):
+        self.assertConstantQueries(api_client.fetch_assignment_workloads, *RANGE)
+
+    def test_init_load(self):
+        self.assertConstantQueries(api_client.init_load, self.subproject.id, [], RANGE, self.persons[0].id)
+
+    def test_update_entity(self):
+        workload = PersonWorkload.objects.filter(task__asset__phase__subproject=self.subproject).first()
+        task = Task.objects.filter(asset__phase__subproject=self.subproject).first()
+        self.assertConstantQueries(lambda: api_client.update_entity(workload.id, {"type": "PersonWorkload", "man_week": 0.7}))
+        self.assertConstantQueries(lambda: api_client.update_entity(task.id, {"type": "Task", "status": "ip"}))
+
+    def test_edit_lock(self):
+        user_id = self.persons[0].id
+
+        def lock_cycle():
+            """acquire, heartbeat, release: every step takes its writing path."""
+            self.assertTrue(api_client.acquire_edit_lock(self.subproject.id, user_id)["success"])
+            self.assertTrue(api_client.heartbeat_edit_lock(self.subproject.id, user_id)["success"])
+            return api_client.release_edit_lock(self.subproject.id, user_id)
+
+        self.assertConstantQueries(lock_cycle)
+
+
+# rollup model, its key fields, source model, the source lookups of those keys
+ROLLUP_SOURCES = [
+    (PersonWeekRollup, ("person_id", "week"), PersonWorkload, ("person_id", "week")),
+    (SubprojectWeekRollup, ("subproject_id", "week"), PersonWorkload, ("task__asset__phase__subproject_id", "week")),
+    (PMMWeekRollup, ("subproject_id", "work_category_id", "week"), PMMWorkload,
+     ("subproject_id", "work_category_id", "week")),
+]
+
+
+class RollupTestMixin:
+    def rollup_cells(self):
+        """{rollup name: {key: (man_week, rows)}} as stored."""
+        cells = {}
+        for Rollup, keys, _, _ in ROLLUP_SOURCES:
+            rows = list(Rollup.objects.values_list(*keys, "man_week", "rows"))
+            found = {row[:-2]: row[-2:] for row in rows}
+            self.assertEqual(len(found), len(rows), f"{Rollup.__name__} holds a cell twice")
+            cells[Rollup.__name__] = found
+        return cells
+
+    def assertRollupsFresh(self):
+        """Every rollup equals ``Sum()`` / ``Count()`` over its source rows."""
+        stored = self.rollup_cells()
+        for Rollup, _, Source, lookups in ROLLUP_SOURCES:
+            fresh = {
+                tuple(row[lookup] for lookup in lookups): (row["total"], row["n"])
+                for row in Source.objects.values(*lookups).order_by().annotate(total=Sum("man_week"), n=Count("pk"))
+            }
+            self.assertEqual(stored[Rollup.__name__], fresh, f"{Rollup.__name__} differs from its source rows")
+
+
+class RollupConsistencyTests(RollupTestMixin, TestCase):
+    """Signals, ``FakeShotgun`` writes and the bulk paths keep every rollup equal to a fresh aggregate."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.subproject, cls.persons = seed(2)
+        cls.other, cls.other_persons = seed(2)
+
+    def setUp(self):
+        self.sg = FakeShotgun()
+
+    def workload(self, subproject=None):
+        return PersonWorkload.objects.filter(task__asset__phase__subproject=subproject or self.subproject).first()
+
+    def test_seeded(self):
+        self.assertTrue(PersonWeekRollup.objects.exists())
+        self.assertRollupsFresh()
+
+    def test_model_save_and_delete(self):
+        workload = self.workload()
+        workload.man_week = "2.5"
+        workload.save()
+        self.assertRollupsFresh()
+        workload.week += datetime.timedelta(weeks=WEEKS)  # into a week without a cell
+        workload.save()
+        self.assertRollupsFresh()
+        workload.person = self.other_persons[0]
+        workload.save()
+        self.assertRollupsFresh()
+        workload.delete()
+        self.assertRollupsFresh()
+        PersonWorkload.objects.create(task=Task.objects.first(), person=self.persons[0], name="new",
+                                      week=FIRST_WEEK, man_week="0.3")
+        self.assertRollupsFresh()
+
+        pmm = PMMWorkload.objects.filter(subproject=self.subproject).first()
+        pmm.work_category = None
+        pmm.man_week = "4.0"
+        pmm.save()
+        self.assertRollupsFresh()
+        pmm.delete()
+        self.assertRollupsFresh()
+
+    def test_parent_moves(self):
+        """Moving a Task / Asset / Phase changes the subproject of the workloads below it."""
+        other_phase = Phase.objects.filter(subproject=self.other).first()
+        other_asset = Asset.objects.filter(phase=other_phase).first()
+        task = Task.objects.filter(asset__phase__subproject=self.subproject).first()
+        task.asset = other_asset
+        task.save()
+        self.assertRollupsFresh()
+        asset = Asset.objects.filter(phase__subproject=self.subproject).first()
+        asset.phase = other_phase
+        asset.save()
+        self.assertRollupsFresh()
+        phase = Phase.objects.filter(subproject=self.subproject).first()
+        phase.subproject = self.other
+        phase.save()
+        self.assertRollupsFresh()
+
+    def test_fake_shotgun_update(self):
+        workload = self.workload()
+        self.sg.update("PersonWorkload", workload.id, {"man_week": 1.5})
+        self.assertRollupsFresh()
+        self.sg.update("PersonWorkload", workload.id, {"week": "2026-03-02"})
+        self.assertRollupsFresh()
+        self.sg.update("PersonWorkload", workload.id, {"person": {"type": "Person", "id": self.other_persons[1].id}})
+        self.assertRollupsFresh()
+        other_task = Task.objects.filter(asset__phase__subproject=self.other).first()
+        self.sg.update("PersonWorkload", workload.id, {"task": {"type": "Task", "id": other_task.id}})
+        self.assertRollupsFresh()
+
+        task = Task.objects.filter(asset__phase__subproject=self.subproject).first()
+        other_asset = Asset.objects.filter(phase__subproject=self.other).first()
+        self.sg.update("Task", task.id, {"asset": {"type": "Asset", "id": other_asset.id}})
+        self.assertRollupsFresh()
+        phase = Phase.objects.filter(subproject=self.subproject).first()
+        self.sg.update("Phase", phase.id, {"subproject": {"type": "Subproject", "id": self.other.id}})
+        self.assertRollupsFresh()
+
+        pmm = PMMWorkload.objects.filter(subproject=self.subproject).first()
+        self.sg.update("PMMWorkload", pmm.id, {"work_category": None, "man_week": 0.5})
+        self.assertRollupsFresh()
+        self.sg.update("PMMWorkload", pmm.id, {"subproject": {"type": "Subproject", "id": self.other.id}})
+        self.assertRollupsFresh()
+
+    def test_fake_shotgun_create_and_delete(self):
+        task = Task.objects.filter(asset__phase__subproject=self.subproject).first()
+        created = self.sg.create("PersonWorkload", {
+            "task": {"type": "Task", "id": task.id}, "person": {"type": "Person", "id": self.persons[0].id},
+            "name": "new", "week": "2026-01-12", "man_week": 0.2,
+        })
+        self.assertRollupsFresh()
+        self.assertTrue(self.sg.delete("PersonWorkload", created["id"]))
+        self.assertRollupsFresh()
+        # Django's collector: the workloads of the task go with it
+        self.assertTrue(self.sg.delete("Task", task.id))
+        self.assertRollupsFresh()
+        # SET_NULL: the PMM workloads of the category move to "no category"
+        self.assertTrue(self.sg.delete("WorkCategory", PMMWorkload.objects.first().work_category_id))
+        self.assertRollupsFresh()
+        self.assertTrue(self.sg.delete("Person", self.persons[1].id))
+        self.assertRollupsFresh()
+
+    def test_cascade_delete(self):
+        self.sg.delete_cascade("Person", self.other_persons[0].id)
+        self.assertRollupsFresh()
+        self.sg.delete_cascade("WorkCategory", PMMWorkload.objects.first().work_category_id)
+        self.assertRollupsFresh()
+        self.sg.delete_cascade("Subproject", self.subproject.id)
+        self.assertRollupsFresh()
+
+    def test_bulk_paths(self):
+        """Writes without signals are repaired by the rebuild at the end of ``signals.paused()``."""
+        with signals.paused():
+            PersonWorkload.objects.bulk_create([
+                PersonWorkload(task=task, person=self.persons[0], name=task.name,
+                               week=FIRST_WEEK + datetime.timedelta(weeks=WEEKS), man_week="1.0")
+                for task in Task.objects.all()
+            ])
+            PMMWorkload.objects.filter(subproject=self.other).update(man_week="3.0")
+            PersonWorkload.objects.filter(person=self.persons[1]).delete()
+        self.assertRollupsFresh()
+
+    def test_generate_sample_data(self):
+        call_command("generate_sample_data", scale=0.04, seed=1, start_date="2026-01-05", stdout=io.StringIO())
+        self.assertTrue(PersonWorkload.objects.exists())
+        self.assertRollupsFresh()
+
+
+class CascadeDeleteTests(RollupTestMixin, TestCase):
+    """``cascade.delete`` leaves the rows and rollups ``Model.delete()`` leaves, and ``impact`` predicts it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.subproject, cls.persons = seed(2)
+        cls.other, cls.other_persons = seed(3)
+        # Links the cascade has to clear: a person editing the subproject, a manager shared across subprojects
+        Subproject.objects.filter(pk=cls.subproject.pk).update(editing=cls.persons[1])
+        Person.objects.filter(pk=cls.other_persons[2].pk).update(manager=cls.persons[0])
+
+    def rows(self):
+        """Every row of the api tables (M2M through tables included), rollups without their ids."""
+        rollup_models = {Rollup for Rollup, _, _, _ in ROLLUP_SOURCES}
+        state = {}
+        for model in apps.get_app_config("api").get_models(include_auto_created=True):
+            if model is CollectionVersion or model in rollup_models:
+                continue
+            fields = [f.attname for f in model._meta.concrete_fields]
+            state[model._meta.db_table] = sorted(model.objects.values_list(*fields), key=repr)
+        state.update(self.rollup_cells())
+        return state
+
+    def assertMatchesDjangoDelete(self, model, pk):
+        sid = transaction.savepoint()
+        model.objects.get(pk=pk).delete()
+        expected = self.rows()
+        transaction.savepoint_rollback(sid)
+
+        preview = cascade.impact(model, [pk])
+        result = cascade.delete(model, [pk])
+        self.assertEqual(self.rows(), expected)
+        self.assertRollupsFresh()
+        self.assertEqual({k: result[k] for k in ("deleted", "updated")}, preview)
+        self.assertEqual(result["deleted"][model.__name__], 1)
+        return result
+
+    def test_subproject(self):
+        result = self.assertMatchesDjangoDelete(Subproject, self.subproject.pk)
+        self.assertIn("Person.subproject", result["updated"])
+
+    def test_person(self):
+        result = self.assertMatchesDjangoDelete(Person, self.persons[0].pk)
+        self.assertIn("Task.assignees", result["updated"])
+        self.assertIn("Person.manager", result["updated"])
+
+    def test_person_editing_a_subproject(self):
+        result = self.assertMatchesDjangoDelete(Person, self.persons[1].pk)
+        self.assertEqual(result["updated"].get("Subproject.editing"), 1)
+
+    def test_work_category(self):
+        category = PMMWorkload.objects.filter(subproject=self.subproject).first().work_category
+        result = self.assertMatchesDjangoDelete(WorkCategory, category.pk)
+        self.assertIn("PMMWorkload.work_category", result["updated"])
+
+    def test_phase(self):
+        self.assertMatchesDjangoDelete(Phase, Phase.objects.filter(subproject=self.other).first().pk)
+
+    def test_task(self):
+        self.assertMatchesDjangoDelete(Task, Task.objects.filter(asset__phase__subproject=self.other).first().pk)
+
+    def test_department(self):
+        result = self.assertMatchesDjangoDelete(Department, self.persons[0].department_id)
+        self.assertEqual(set(result["deleted"]), {"Department"})
+
+    def test_counts_name_entity_types_only(self):
+        preview = cascade.impact(Subproject, [self.subproject.pk])
+        internal = {Rollup.__name__ for Rollup, _, _, _ in ROLLUP_SOURCES}
+        self.assertFalse(internal & set(preview["deleted"]), preview)
+        self.assertFalse([name for name in preview["deleted"] if name.startswith("api_")], preview)
+
+
+class CallBatchRollbackTests(TestCase):
+    """A failing write rolls the whole batch back: backend rows, local mirror and change events."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        entity_store.configure(":memory:")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.subproject, cls.persons = seed(2)
+
+    def setUp(self):
+        self.bridge = DataBridge()
+        self.addCleanup(api_client.remove_change_listener, self.bridge._on_entities_changed)
+        self.events = []
+        self.bridge.entitiesChanged.connect(self.events.append)
+        self.phase = api_client.get_entity("Phase", Phase.objects.filter(subproject=self.subproject).first().id)
+        # As if a page snapshot had stored the row
+        entity_store.upsert_entity(self.phase)
+
+    def call_batch(self, *calls):
+        return self.bridge.callBatch(json.dumps([{"method": m, "args": list(a)} for m, *a in calls]))
+
+    def assertNotChanged(self, result, failed_index):
+        self.assertFalse(result["success"])
+        self.assertEqual(result["failedIndex"], failed_index)
+        self.assertEqual(Phase.objects.get(pk=self.phase["id"]).name, self.phase["name"])
+        self.assertEqual(entity_store.get_entity("Phase", self.phase["id"]), self.phase)
+        self.assertEqual(self.events, [])
+
+    def test_second_write_fails(self):
+        result = self.call_batch(
+            ("updateEntity", self.phase["id"], {"type": "Phase", "name": "Renamed"}),
+            ("updateEntity", self.phase["id"], {"type": "Phase", "no_such_field": 1}),
+        )
+        self.assertNotChanged(result, 1)
+        self.assertEqual([r["ok"] for r in result["results"]], [False, False])
+
+    def test_falsy_write_result_fails(self):
+        """deleteEntity reports a missing row with False, not an error dict."""
+        result = self.call_batch(
+            ("updateEntity", self.phase["id"], {"type": "Phase", "name": "Renamed"}),
+            ("deleteEntity", "Phase", 10 ** 9),
+            ("saveFilterConfig", {"pageKey": "batch-test", "filterConfig": {}}),
+        )
+        self.assertNotChanged(result, 1)
+        self.assertEqual(result["results"][2]["error"], "skipped")
+
+    def test_created_rows_are_removed(self):
+        phases = Phase.objects.count()
+        result = self.call_batch(
+            ("createEntity", {"type": "Phase", "name": "New", "subproject": {"type": "Subproject",
+                                                                           "id": self.subproject.id},
+                              "start_date": "2026-01-05", "end_date": "2026-01-11"}),
+            ("updateEntity", self.phase["id"], {"type": "Phase", "name": "Renamed"}),
+            ("deleteEntity", "Phase", 10 ** 9),
+        )
+        self.assertNotChanged(result, 2)
+        self.assertEqual(Phase.objects.count(), phases)
+        created = result["results"][0]
+        self.assertFalse(created["ok"])
+        with entity_store._lock:
+            mirrored = entity_store._connect().execute("SELECT COUNT(*) FROM entities WHERE type = 'Phase'").fetchone()
+        self.assertEqual(mirrored[0], 1)
+
+    def test_success_commits_and_announces(self):
+        result = self.call_batch(("updateEntity", self.phase["id"], {"type": "Phase", "name": "Renamed"}))
+        self.assertTrue(result["success"])
+        self.assertEqual(Phase.objects.get(pk=self.phase["id"]).name, "Renamed")
+        self.assertEqual(entity_store.get_entity("Phase", self.phase["id"])["name"], "Renamed")
+        self.assertEqual([(e["op"], e["id"]) for e in self.events[0]], [("update", self.phase["id"])])
+
+
+class DataBridgePerfTests(TestCase):
+    """Every bridge slot reports to ``perf``, except the perf controls themselves."""
+
+    def setUp(self):
+        self.bridge = DataBridge()
+        self.addCleanup(api_client.remove_change_listener, self.bridge._on_entities_changed)
+
+    def test_slots_are_instrumented(self):
+        was_enabled = perf.is_enabled()
+        perf.enable()
+        self.addCleanup(lambda: perf.enable() if was_enabled else perf.disable())
+        perf.reset()
+        self.bridge.supportsCascadeDelete()
+        self.bridge.cancelExport("no-such-job")
+        self.bridge.getPerfStats()
+        self.assertEqual(set(perf.get_stats()["calls"]),
+                         {"DataBridge.supportsCascadeDelete", "DataBridge.cancelExport"})
+
+
+class IncrementalPMMExportTests(TestCase):
+    """``export_pmm_workloads_to_xlsx(incremental=True)`` against a full export of the same data."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.subproject, _ = seed(2)
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix="pmm_incremental_test_")
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+        patcher = mock.patch.object(pmm_export, "TEMPLATE_CACHE_DIR", os.path.join(self.dir, "templates"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.template = os.path.join(self.dir, "template.xlsx")
+        self.make_template(self.template, WorkCategory.objects.order_by("name").values_list("name", flat=True))
+        self.path = os.path.join(self.dir, "incremental.xlsx")
+        self.sg = FakeShotgun()
+
+    @staticmethod
+    def make_template(path, categories):
+        import openpyxl
+
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "Manpower Sheet"
+        for i, name in enumerate(categories):
+            ws.cell(row=5 + i, column=1, value=name)
+        ws_list = wb.create_sheet(pmm_export.LIST_SHEET_NAME)
+        for col, header in enumerate(["Name", "Work Category", "Man Week", "Year", "Month", "Week", "Phase"], 1):
+            ws_list.cell(row=1, column=col, value=header)
+        wb.save(path)
+
+    def export(self, path, incremental=True, progress=None):
+        payload = api_client.fetch_pmm_export_source(self.subproject.id)
+        result = pmm_export.export_pmm_workloads_to_xlsx(payload, self.template, path, progress=progress,
+                                                         incremental=incremental)
+        self.assertTrue(result.get("success"), result)
+        return result
+
+    @staticmethod
+    def values(path):
+        import openpyxl
+
+        wb = openpyxl.load_workbook(path)
+        try:
+            return {ws.title: list(ws.iter_rows(values_only=True)) for ws in wb.worksheets}
+        finally:
+            wb.close()
+
+    def assertSameAsFullExport(self):
+        full = os.path.join(self.dir, "full.xlsx")
+        self.export(full, incremental=False)
+        self.assertEqual(self.values(self.path), self.values(full))
+
+    def change_one_workload(self):
+        workload = PMMWorkload.objects.filter(subproject=self.subproject).order_by("pk").first()
+        self.sg.update("PMMWorkload", workload.id, {"man_week": 3.5})
+
+    def test_reexport_rewrites_only_the_change(self):
+        first = self.export(self.path)
+        self.assertFalse(first["incremental"])
+        self.assertTrue(os.path.exists(pmm_incremental.state_path(self.path)))
+        unchanged = self.export(self.path)
+        self.assertEqual((unchanged["changedCells"], unchanged["changedRows"]), (0, 0))
+
+        self.change_one_workload()
+        result = self.export(self.path)
+        self.assertTrue(result["incremental"])
+        self.assertEqual((result["changedCells"], result["changedRows"]), (1, 1))
+        self.assertSameAsFullExport()
+
+    def test_missing_state_falls_back_to_a_full_export(self):
+        self.export(self.path)
+        os.remove(pmm_incremental.state_path(self.path))
+        self.change_one_workload()
+        self.assertFalse(self.export(self.path)["incremental"])
+        self.assertTrue(os.path.exists(pmm_incremental.state_path(self.path)))
+        self.assertSameAsFullExport()
+
+    def test_corrupt_state_falls_back_to_a_full_export(self):
+        self.export(self.path)
+        with open(pmm_incremental.state_path(self.path), "w", encoding="utf-8") as f:
+            f.write("{not json")
+        self.change_one_workload()
+        self.assertFalse(self.export(self.path)["incremental"])
+        self.assertSameAsFullExport()
+
+    def test_cancel_leaves_workbook_and_state(self):
+        self.export(self.path)
+        with open(self.path, "rb") as f:
+            workbook = f.read()
+        with open(pmm_incremental.state_path(self.path), "rb") as f:
+            state = f.read()
+        self.change_one_workload()
+
+        def cancel(stage, done=0, total=0):
+            if stage == "rows" and done:
+                raise ExportCancelled()
+
+        with self.assertRaises(ExportCancelled):
+            pmm_export.export_pmm_workloads_to_xlsx(api_client.fetch_pmm_export_source(self.subproject.id),
+                                                    self.template, self.path, progress=cancel, incremental=True)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), workbook)
+        with open(pmm_incremental.state_path(self.path), "rb") as f:
+            self.assertEqual(f.read(), state)
+        self.assertEqual(sorted(os.listdir(self.dir)), sorted(["templates", "template.xlsx", "incremental.xlsx",
+                                                               "incremental.xlsx" + pmm_incremental.STATE_SUFFIX]))
+        # The next export still applies the change incrementally
+        self.assertEqual(self.export(self.path)["changedRows"], 1)
+
+
+class RestListTests(TestCase):
+    """Conditional GET, cursor pagination and sparse fieldsets of the REST list endpoints."""
+
+    URL = "/api/personworkloads/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.subproject, cls.persons = seed(2)
+        cls.other, _ = seed(2)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.sg = FakeShotgun()
+
+    def get(self, url, etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get(url, **headers)
+
+    def etag(self, url):
+        response = self.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def assertNotModified(self, url, etag, if_none_match=None):
+        response = self.get(url, if_none_match or etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def assertModified(self, url, etag):
+        response = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        return response["ETag"]
+
+    def test_matching_etag_gets_304(self):
+        etag = self.etag(self.URL)
+        self.assertNotModified(self.URL, etag)
+        self.assertNotModified(self.URL, etag, f"W/{etag}")
+        self.assertNotModified(self.URL, etag, f'"other", {etag}')
+        self.assertEqual(self.get(self.URL, '"other"').status_code, 200)
+        # The query is part of the tag
+        self.assertNotEqual(self.etag(self.URL + "?page_size=5"), etag)
+
+    def test_detail_etag(self):
+        url = f"{self.URL}{PersonWorkload.objects.first().pk}/"
+        etag = self.etag(url)
+        self.assertNotModified(url, etag)
+
+    def test_new_etag_after_fake_shotgun_update(self):
+        etag = self.etag(self.URL)
+        self.sg.update("PersonWorkload", PersonWorkload.objects.first().pk, {"man_week": 2.0})
+        etag = self.assertModified(self.URL, etag)
+        self.assertNotModified(self.URL, etag)
+
+    def test_new_etag_after_a_related_table_changes(self):
+        """A filter across relations depends on the tables it goes through."""
+        url = f"{self.URL}?subproject={self.subproject.pk}"
+        etag = self.etag(url)
+        phase = Phase.objects.filter(subproject=self.subproject).first()
+        self.sg.update("Phase", phase.pk, {"subproject": {"type": "Subproject", "id": self.other.pk}})
+        self.assertModified(url, etag)
+
+    def test_new_etag_after_bulk_and_cascade_paths(self):
+        etag = self.etag(self.URL)
+        with signals.paused():
+            PersonWorkload.objects.filter(person=self.persons[0]).update(man_week="4.0")
+        etag = self.assertModified(self.URL, etag)
+        self.sg.delete_cascade("Task", Task.objects.filter(asset__phase__subproject=self.other).first().pk)
+        etag = self.assertModified(self.URL, etag)
+        self.sg.delete_cascade("Subproject", self.other.pk)
+        self.assertModified(self.URL, etag)
+
+    def test_cursor_pages_are_stable_while_rows_are_inserted(self):
+        before = set(PersonWorkload.objects.values_list("pk", flat=True))
+        task = Task.objects.first()
+        seen = []
+        url = self.URL + "?page_size=7"
+        while url:
+            page = self.get(url).json()
+            seen.extend(row["id"] for row in page["results"])
+            # A row inserted between two pages goes after the cursor (ids only grow)
+            PersonWorkload.objects.create(task=task, person=self.persons[0], name="inserted",
+                                          week=FIRST_WEEK, man_week="0.1")
+            url = page["next"]
+            if len(seen) > 10 * len(before):
+                self.fail("the cursor never reaches the end")
+        self.assertEqual(seen, sorted(set(seen)), "a row was returned twice or out of order")
+        self.assertLessEqual(before, set(seen))
+
+    def test_sparse_fields(self):
+        with CaptureQueriesContext(connection) as ctx:
+            page = self.get(self.URL + "?fields=id,week").json()
+        self.assertTrue(page["results"])
+        for row in page["results"]:
+            self.assertEqual(set(row), {"id", "week"})
+        listed = [q["sql"] for q in ctx.captured_queries if "api_personworkload" in q["sql"]]
+        self.assertTrue(listed)
+        self.assertFalse([sql for sql in listed if "man_week" in sql], "an unrequested column was loaded")
+
+        # An M2M field is only prefetched when requested
+        tasks = self.get("/api/tasks/?fields=id,assignees").json()["results"]
+        self.assertEqual({key for row in tasks for key in row}, {"id", "assignees"})
+        with CaptureQueriesContext(connection) as ctx:
+            self.get("/api/tasks/?fields=id,name")
+        self.assertFalse([q for q in ctx.captured_queries if "api_task_assignees" in q["sql"]])
+
+
+class RpcParamsTests(TestCase):
+    """``params`` of ``/api3/json``: ``[auth, params]`` as shotgun_api3 sends it, or bare method params."""
+
+    URL = "/api3/json"
+    AUTH = {"script_name": "test", "script_key": "ignored"}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.subproject, _ = seed(2)
+
+    def call(self, method, params):
+        response = self.client.post(self.URL, json.dumps({"method_name": method, "params": params}),
+                                     content_type="application/json")
+        return response.status_code, response.json()
+
+    def rename(self, phase, name):
+        return {"request_type": "update", "type": "Phase", "id": phase.pk,
+                "fields": [{"field_name": "name", "value": name}]}
+
+    def test_auth_and_params(self):
+        read = {"type": "Phase", "filters": [["subproject", "is", self.subproject.pk]], "return_fields": ["name"]}
+        for params in ([self.AUTH, read], read):
+            status, body = self.call("read", params)
+            self.assertEqual(status, 200, body)
+            self.assertEqual(len(body["results"]["entities"]), Phase.objects.filter(subproject=self.subproject).count())
+
+    def test_batch(self):
+        first, second = Phase.objects.filter(subproject=self.subproject)[:2]
+        status, body = self.call("batch", [self.AUTH, [self.rename(first, "A"), self.rename(second, "B")]])
+        self.assertEqual(status, 200, body)
+        self.assertEqual(Phase.objects.get(pk=second.pk).name, "B")
+
+    def test_bare_batch_list_is_rejected(self):
+        """Two bare requests must not be taken for [auth, params] (dropping the first)."""
+        first, second = Phase.objects.filter(subproject=self.subproject)[:2]
+        status, body = self.call("batch", [self.rename(first, "A"), self.rename(second, "B")])
+        self.assertEqual(status, 400)
+        self.assertEqual(body["error_code"], ERR_BAD_REQUEST)
+        self.assertIn("bare list of requests", body["message"])
+        self.assertEqual(Phase.objects.get(pk=second.pk).name, second.name)
 
-# Create your tests here.
+        status, body = self.call("read", [1, 2])
+        self.assertEqual((status, body["error_code"]), (400, ERR_BAD_REQUEST))
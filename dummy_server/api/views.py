@@ -1,8 +1,34 @@
-"""View definitions for the dummy REST API."""
+"""View definitions for the dummy REST API.
+
+All list endpoints share :class:`FilteredReadOnlyViewSet`:
+
+- cursor pagination ordered by ``id`` (``?cursor=``, ``?page_size=`` up to
+  ``MAX_PAGE_SIZE``), so deep pages cost the same as the first one;
+- ``?fields=id,name`` sparse fieldsets; only the requested columns are
+  loaded and M2M fields are only prefetched when requested;
+- FK filters ``?<fk>=1,2,3`` and date filters ``?<field>_after=YYYY-MM-DD``
+  (>=) / ``?<field>_before=YYYY-MM-DD`` (<=) as declared per viewset;
+- M2M fields are prefetched per viewset.  Foreign keys are serialised as
+  ids (read from the ``<fk>_id`` column), so they need no join;
+- conditional GET: list responses carry an ETag built from the
+  :class:`~api.models.CollectionVersion` rows of the collections involved
+  (checked with one small query before the list query runs), detail
+  responses an ETag of their content.  A matching ``If-None-Match`` gets a
+  304 without a body.
+"""
+
+import datetime
+import hashlib
+import json
 
 from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from django.utils.http import parse_etags
 
 from .models import (
+    CollectionVersion,
     Department,
     Step,
     Person,
@@ -25,54 +51,209 @@ from .serializers import (
     PersonWorkloadSerializer,
     PMMWorkloadSerializer,
     WorkCategorySerializer,
+    requested_fields,
 )
 
+MAX_PAGE_SIZE = 5000
+
+# Clients may keep responses but have to revalidate them (cheap with the ETag)
+CACHE_CONTROL = "private, no-cache"
+
+
+class IdCursorPagination(CursorPagination):
+    page_size = 500
+    page_size_query_param = "page_size"
+    max_page_size = MAX_PAGE_SIZE
+    ordering = "id"
+
+
+class FilteredReadOnlyViewSet(viewsets.ReadOnlyModelViewSet):
+    """Read-only viewset with pagination, sparse fields and declared filters.
+
+    Subclasses set ``fk_filters`` (query parameter -> relation lookup for
+    id lists), ``date_filters`` (date fields accepting ``_after`` /
+    ``_before``) and ``prefetch_related`` (M2M fields).
+    """
+
+    pagination_class = IdCursorPagination
+    fk_filters: dict = {}
+    date_filters: tuple = ()
+    prefetch_related: tuple = ()
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        params = self.request.query_params
+        qs = self._apply_filters(qs, params)
+
+        fields = requested_fields(self.request)
+        if fields:
+            # Load only the requested columns (M2M fields have none); the pk
+            # is always needed for the cursor
+            columns = {f.name for f in qs.model._meta.concrete_fields if f.name in fields}
+            qs = qs.only("id", *columns)
+            prefetch = [n for n in self.prefetch_related if n in fields]
+        else:
+            prefetch = list(self.prefetch_related)
+        if prefetch:
+            qs = qs.prefetch_related(*prefetch)
+        return qs
+
+    def list(self, request, *args, **kwargs):
+        etag = self._collection_etag(request)
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
+        response = super().list(request, *args, **kwargs)
+        response["ETag"] = etag
+        response["Cache-Control"] = CACHE_CONTROL
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        payload = json.dumps(response.data, sort_keys=True, default=str)
+        etag = _quote(hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20])
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
+        response["ETag"] = etag
+        response["Cache-Control"] = CACHE_CONTROL
+        return response
+
+    def _collection_etag(self, request) -> str:
+        """ETag of a list: versions of every collection the result depends on + the query."""
+        model = self.queryset.model
+        names = {model.__name__}
+        # Filters across relations depend on the related tables too
+        for name, lookup in self.fk_filters.items():
+            if request.query_params.get(name):
+                names.update(f.related_model.__name__ for f in _relation_path(model, lookup)[:-1])
+        versions = dict.fromkeys(sorted(names), (0, 0))
+        for name, version, count in CollectionVersion.objects.filter(name__in=names).values_list(
+                "name", "version", "count"):
+            versions[name] = (version, count)
+        key = "|".join(f"{n}:{v}:{c}" for n, (v, c) in versions.items())
+        fmt = getattr(request, "accepted_renderer", None)
+        key += f"|{request.get_full_path()}|{getattr(fmt, 'format', '')}"
+        return _quote(hashlib.sha1(key.encode("utf-8")).hexdigest()[:20])
+
+    def _apply_filters(self, qs, params):
+        lookups = {}
+        distinct = False
+        for name, lookup in self.fk_filters.items():
+            raw = params.get(name)
+            if not raw:
+                continue
+            try:
+                lookups[f"{lookup}__in"] = [int(v) for v in raw.split(",") if v.strip()]
+            except ValueError:
+                raise ValidationError({name: "Expected a comma separated list of ids."})
+            # Filtering across a to-many relation can repeat rows
+            distinct = distinct or any(
+                f.many_to_many or f.one_to_many for f in _relation_path(self.queryset.model, lookup))
+        for name in self.date_filters:
+            for suffix, op in (("after", "gte"), ("before", "lte")):
+                raw = params.get(f"{name}_{suffix}")
+                if not raw:
+                    continue
+                try:
+                    lookups[f"{name}__{op}"] = datetime.date.fromisoformat(raw)
+                except ValueError:
+                    raise ValidationError({f"{name}_{suffix}": "Expected YYYY-MM-DD."})
+        if not lookups:
+            return qs
+        qs = qs.filter(**lookups)
+        return qs.distinct() if distinct else qs
+
+
+def _quote(tag: str) -> str:
+    return f'"{tag}"'
+
+
+def _etag_matches(request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    # Weak comparison (RFC 9110 13.1.2)
+    tags = parse_etags(header)
+    return "*" in tags or etag in {t[2:] if t.startswith("W/") else t for t in tags}
+
+
+def _not_modified(etag: str) -> Response:
+    response = Response(status=304)
+    response["ETag"] = etag
+    response["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def _relation_path(model, lookup):
+    """Fields along a ``a__b__c`` relation lookup."""
+    fields = []
+    for part in lookup.split("__"):
+        field = model._meta.get_field(part)
+        fields.append(field)
+        model = field.related_model
+    return fields
+
 
-class DepartmentViewSet(viewsets.ReadOnlyModelViewSet):
+class DepartmentViewSet(FilteredReadOnlyViewSet):
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
 
 
-class StepViewSet(viewsets.ReadOnlyModelViewSet):
+class StepViewSet(FilteredReadOnlyViewSet):
     queryset = Step.objects.all()
     serializer_class = StepSerializer
 
 
-class PersonViewSet(viewsets.ReadOnlyModelViewSet):
+class PersonViewSet(FilteredReadOnlyViewSet):
     queryset = Person.objects.all()
     serializer_class = PersonSerializer
+    fk_filters = {"department": "department", "manager": "manager", "subproject": "subproject"}
+    prefetch_related = ("subproject",)
 
 
-class SubprojectViewSet(viewsets.ReadOnlyModelViewSet):
+class SubprojectViewSet(FilteredReadOnlyViewSet):
     queryset = Subproject.objects.all()
     serializer_class = SubprojectSerializer
+    fk_filters = {"department": "department", "editing": "editing"}
+    date_filters = ("start_date", "end_date")
 
 
-class PhaseViewSet(viewsets.ReadOnlyModelViewSet):
+class PhaseViewSet(FilteredReadOnlyViewSet):
     queryset = Phase.objects.all()
     serializer_class = PhaseSerializer
+    fk_filters = {"subproject": "subproject"}
+    date_filters = ("start_date", "end_date")
 
 
-class AssetViewSet(viewsets.ReadOnlyModelViewSet):
+class AssetViewSet(FilteredReadOnlyViewSet):
     queryset = Asset.objects.all()
     serializer_class = AssetSerializer
+    fk_filters = {"phase": "phase", "subproject": "phase__subproject",
+                  "work_category": "work_category", "step": "step"}
+    date_filters = ("start_date", "end_date")
 
 
-class TaskViewSet(viewsets.ReadOnlyModelViewSet):
+class TaskViewSet(FilteredReadOnlyViewSet):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
+    fk_filters = {"asset": "asset", "subproject": "asset__phase__subproject", "assignees": "assignees"}
+    date_filters = ("start_date", "end_date")
+    prefetch_related = ("assignees",)
 
-class PersonWorkloadViewSet(viewsets.ReadOnlyModelViewSet):
+class PersonWorkloadViewSet(FilteredReadOnlyViewSet):
     queryset = PersonWorkload.objects.all()
     serializer_class = PersonWorkloadSerializer
+    fk_filters = {"task": "task", "person": "person", "subproject": "task__asset__phase__subproject"}
+    date_filters = ("week",)
 
 
-class PMMWorkloadViewSet(viewsets.ReadOnlyModelViewSet):
+class PMMWorkloadViewSet(FilteredReadOnlyViewSet):
     queryset = PMMWorkload.objects.all()
     serializer_class = PMMWorkloadSerializer
+    fk_filters = {"subproject": "subproject", "work_category": "work_category"}
+    date_filters = ("week",)
 
 
-class WorkCategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class WorkCategoryViewSet(FilteredReadOnlyViewSet):
     queryset = WorkCategory.objects.all()
     serializer_class = WorkCategorySerializer
 
@@ -0,0 +1,151 @@
+"""Concurrent read/write throughput of the dummy backend per SQLite profile.
+
+Builds a sample database once (``generate_sample_data``), then for each
+``DUMMY_DB_PROFILE`` runs reader and writer processes against a fresh copy
+of it for a fixed time and reports operations per second, latency
+percentiles and "database is locked" errors.
+
+Readers run the queries the desktop app and the REST API issue (workloads
+of a subproject, a week range, the phases of a subproject); writers update
+PMM workloads through ``FakeShotgun.update`` (one transaction per write).
+
+Usage:
+    python dummy_server/benchmarks/bench_sqlite_profile.py [--profiles default,tuned]
+        [--readers 4] [--writers 2] [--duration 10] [--scale 2]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def _setup_django(profile: str, db_path: str) -> None:
+    os.environ["DUMMY_DB_PROFILE"] = profile
+    os.environ["DUMMY_DB_PATH"] = db_path
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dummy_server.settings")
+    sys.path.insert(0, SERVER_DIR)
+    import django
+    django.setup()
+
+
+def _worker(args):
+    role, profile, db_path, start_at, duration, seed = args
+    _setup_django(profile, db_path)
+    from django.db import OperationalError, connection
+    from api.models import Phase, PMMWorkload, PersonWorkload, Subproject
+    from fake_shotgun import FakeShotgun
+
+    rnd = random.Random(seed)
+    subprojects = list(Subproject.objects.values_list("id", flat=True))
+    pmm_ids = list(PMMWorkload.objects.values_list("id", flat=True))
+    weeks = sorted(set(PersonWorkload.objects.values_list("week", flat=True)))
+    sg = FakeShotgun()
+
+    def read():
+        kind = rnd.randrange(3)
+        if kind == 0:
+            list(PMMWorkload.objects.filter(subproject_id=rnd.choice(subprojects))
+                 .values_list("id", "work_category_id", "week", "man_week"))
+        elif kind == 1:
+            i = rnd.randrange(max(1, len(weeks) - 8))
+            list(PersonWorkload.objects.filter(week__gte=weeks[i], week__lte=weeks[min(i + 8, len(weeks) - 1)])
+                 .values_list("id", "person_id", "task_id", "week", "man_week"))
+        else:
+            list(Phase.objects.filter(subproject_id=rnd.choice(subprojects)).values())
+
+    def write():
+        sg.update("PMMWorkload", rnd.choice(pmm_ids), {"man_week": round(rnd.uniform(1.0, 5.0), 1)})
+
+    op = read if role == "read" else write
+    latencies, errors = [], 0
+    connection.ensure_connection()
+    time.sleep(max(0.0, start_at - time.time()))
+    end = time.perf_counter() + duration
+    while True:
+        t0 = time.perf_counter()
+        if t0 >= end:
+            break
+        try:
+            op()
+            latencies.append(time.perf_counter() - t0)
+        except OperationalError:
+            errors += 1
+    connection.close()
+    return role, latencies, errors
+
+
+def _build_database(path: str, scale: float) -> None:
+    env = dict(os.environ, DUMMY_DB_PATH=path, DUMMY_DB_PROFILE="default")
+    manage = os.path.join(SERVER_DIR, "manage.py")
+    subprocess.run([sys.executable, manage, "migrate", "-v0"], check=True, env=env, cwd=SERVER_DIR)
+    subprocess.run([sys.executable, manage, "generate_sample_data", "--scale", str(scale), "--seed", "1"],
+                   check=True, env=env, cwd=SERVER_DIR, stdout=subprocess.DEVNULL)
+
+
+def run_profile(profile: str, base_db: str, workdir: str, readers: int, writers: int, duration: float) -> dict:
+    db_path = os.path.join(workdir, f"{profile}.sqlite3")
+    shutil.copyfile(base_db, db_path)
+    roles = ["read"] * readers + ["write"] * writers
+    # Leave time for the workers to import Django before the clock starts
+    start_at = time.time() + 3.0 + 0.2 * len(roles)
+    jobs = [(role, profile, db_path, start_at, duration, i) for i, role in enumerate(roles)]
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(len(roles)) as pool:
+        results = pool.map(_worker, jobs)
+    summary = {}
+    for role in ("read", "write"):
+        lat = [x for r, l, _ in results if r == role for x in l]
+        errs = sum(e for r, _, e in results if r == role)
+        summary[role] = {
+            "ops": len(lat),
+            "ops_per_s": len(lat) / duration,
+            "p50_ms": _percentile(lat, 0.50) * 1000,
+            "p95_ms": _percentile(lat, 0.95) * 1000,
+            "p99_ms": _percentile(lat, 0.99) * 1000,
+            "locked": errs,
+        }
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", default="default,tuned")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per profile")
+    parser.add_argument("--scale", type=float, default=2.0, help="generate_sample_data --scale")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_sqlite_")
+    try:
+        base_db = os.path.join(workdir, "base.sqlite3")
+        print(f"building sample database (scale {args.scale}) ...")
+        _build_database(base_db, args.scale)
+        print(f"{args.readers} readers, {args.writers} writers, {args.duration:.0f}s per profile")
+        for profile in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+            s = run_profile(profile, base_db, workdir, args.readers, args.writers, args.duration)
+            for role in ("read", "write"):
+                r = s[role]
+                print(f"  {profile:8s} {role:5s} {r['ops_per_s']:9.1f} ops/s  p50 {r['p50_ms']:7.2f} ms  "
+                      f"p95 {r['p95_ms']:7.2f} ms  p99 {r['p99_ms']:7.2f} ms  locked {r['locked']}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
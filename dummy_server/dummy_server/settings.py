@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -36,9 +39,9 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    'api',  # 追加: APIア (runserver を上書きするため staticfiles より前)
     'django.contrib.staticfiles',
     'rest_framework',
-    'api',  # 追加: APIア
     'corsheaders',  # 追加: CORS対応
 ]
 
@@ -81,10 +84,39 @@ WSGI_APPLICATION = 'dummy_server.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('DUMMY_DB_PATH') or BASE_DIR / 'db.sqlite3',
     }
 }
 
+# DUMMY_DB_PROFILE=tuned: SQLite settings for several concurrent clients
+# (desktop app, REST server, tests).  WAL lets readers run next to a writer,
+# synchronous=NORMAL only fsyncs at checkpoints (safe against crashes of the
+# app, not of the OS), IMMEDIATE transactions take the write lock up front
+# so busy_timeout applies instead of failing on lock upgrade, and
+# connections are kept open between requests.  The WAL journal mode is
+# stored in the database file and stays on for the default profile too.
+DB_PROFILE = os.environ.get('DUMMY_DB_PROFILE', 'default').lower()
+SQLITE_TUNED_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # KiB (64 MiB)
+    'temp_store': 'MEMORY',
+    'busy_timeout': 20000,  # ms
+}
+if DB_PROFILE == 'tuned':
+    DATABASES['default'].update({
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {k}={v}' for k, v in SQLITE_TUNED_PRAGMAS.items()),
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+        },
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    })
+elif DB_PROFILE != 'default':
+    raise ImproperlyConfigured(f"DUMMY_DB_PROFILE must be 'default' or 'tuned', not {DB_PROFILE!r}")
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -17,6 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework import routers
+from api import rpc
 from api.views import (
     DepartmentViewSet,
     StepViewSet,
@@ -45,4 +46,5 @@ router.register(r'workcategories', WorkCategoryViewSet)
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
+    path('api3/json', rpc.json_rpc),
 ]
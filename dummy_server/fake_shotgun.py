@@ -9,13 +9,16 @@ Enhancements:
   contains, not_contains, starts_with, ends_with, <, <=, >, >=, between/range) with
   AND/OR grouping via filter_operator.
 - optional ordering and pagination parameters.
+- summarize with ShotGrid-like grouping (nested "groups" with per-group "summaries").
 """
 from __future__ import annotations
 
 from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 from django.apps import apps
-from django.db.models import Count, Sum, Q
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Avg, Count, F, Max, Min, Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek, TruncYear
 import datetime
 from decimal import Decimal
 
@@ -30,13 +33,44 @@ class FakeShotgun:
         Returns:
             True if deleted, False if not found
         """
-        Model = self._model(entity_type)
+        Model = self._writable_model(entity_type)
         try:
             obj = Model.objects.get(id=entity_id)
             obj.delete()
             return True
         except Model.DoesNotExist:
             return False
+
+    def delete_impact(self, entity_type: str, entity_id: int) -> Dict[str, Any]:
+        """
+        Rows a cascading delete of the entity would remove or unlink, without writing.
+        Returns:
+            {"found": bool, "deleted": {entity type: rows}, "updated": {"Type.field": rows}}
+            ("deleted" includes the entity itself and names entity types only; M2M links
+            removed count in "updated" as "Owner.field": owner rows that lose links)
+        """
+        from api import cascade
+
+        Model = self._writable_model(entity_type)
+        if not Model.objects.filter(id=entity_id).exists():
+            return {"found": False, "deleted": {}, "updated": {}}
+        return {"found": True, **cascade.impact(Model, [entity_id])}
+
+    def delete_cascade(self, entity_type: str, entity_id: int) -> Dict[str, Any]:
+        """
+        Delete the entity and everything depending on it with one statement per
+        table, in one transaction (see ``api.cascade``).
+        Returns:
+            The rows removed / unlinked, in the format of ``delete_impact``, plus
+            "ids": {"deleted": {entity type: ids}, "changed": {entity type: ids}}
+            ("changed": rows kept whose link was cleared or lost M2M links)
+        """
+        from api import cascade
+
+        Model = self._writable_model(entity_type)
+        if not Model.objects.filter(id=entity_id).exists():
+            return {"found": False, "deleted": {}, "updated": {}}
+        return {"found": True, **cascade.delete(Model, [entity_id])}
     """Simplified Shotgun API backed by local models."""
 
     def __init__(self) -> None:
@@ -58,9 +92,20 @@ class FakeShotgun:
                 "PMMWorkload": apps.get_model("api", "PMMWorkload"),
                 "WorkCategory": apps.get_model("api", "WorkCategory"),
                 "Step": apps.get_model("api", "Step"),
+                # Weekly man_week totals maintained by api.rollups (read only)
+                "PersonWeekRollup": apps.get_model("api", "PersonWeekRollup"),
+                "PMMWeekRollup": apps.get_model("api", "PMMWeekRollup"),
+                "SubprojectWeekRollup": apps.get_model("api", "SubprojectWeekRollup"),
             }
 
+    READ_ONLY_TYPES = {"PersonWeekRollup", "PMMWeekRollup", "SubprojectWeekRollup"}
+
     # utility
+    def _writable_model(self, entity_type: str):
+        if entity_type in self.READ_ONLY_TYPES:
+            raise ValueError(f"{entity_type} is read only")
+        return self._model(entity_type)
+
     def _model(self, entity_type: str):
         self._ensure_models()
         model = self._model_map.get(entity_type)
@@ -129,6 +174,36 @@ class FakeShotgun:
                 return None
         return current
 
+    def _related_lookups(self, Model, fields: Optional[List[str]] = None) -> Tuple[List[str], List[str]]:
+        """(select_related, prefetch_related) lookups loading every link ``_serialize`` reads.
+
+        Forward FK chains are joined; a many-to-many (or reverse) relation is
+        prefetched, together with the links below it the dotted path reads.
+        Without *fields* every FK and many-to-many field of *Model* is loaded.
+        """
+        if not fields:
+            return ([f.name for f in Model._meta.fields if f.is_relation],
+                    [f.name for f in Model._meta.many_to_many])
+        select: List[str] = []
+        prefetch: List[str] = []
+        for dotted in fields:
+            current = Model
+            path: List[str] = []
+            many = False
+            for part in dotted.split("."):
+                try:
+                    field = current._meta.get_field(part)
+                except FieldDoesNotExist:
+                    break  # property such as "type"
+                if not field.is_relation:
+                    break
+                path.append(part)
+                many = many or field.many_to_many or field.one_to_many
+                current = field.related_model
+            if path:
+                (prefetch if many else select).append("__".join(path))
+        return select, prefetch
+
     def _serialize(self, obj: Any, fields: Optional[List[str]] = None) -> Dict[str, Any]:
         result: Dict[str, Any] = {}
         # Always include id and type to be ShotGrid-like
@@ -272,6 +347,12 @@ class FakeShotgun:
         qs = Model.objects.all()
         if filters:
             qs = self._apply_filters(qs, filters, filter_operator)
+        # Load the links the serialized fields read with the rows (no query per row)
+        select, prefetch = self._related_lookups(Model, fields)
+        if select:
+            qs = qs.select_related(*select)
+        if prefetch:
+            qs = qs.prefetch_related(*prefetch)
         # ordering
         if order:
             ordering: List[str] = []
@@ -312,7 +393,7 @@ class FakeShotgun:
         Returns:
             Dict in Shotgun format (id, type, ...fields)
         """
-        Model = self._model(entity_type)
+        Model = self._writable_model(entity_type)
         # Handle link fields: convert dicts to model instances
         for k, v in data.items():
             field_obj = None
@@ -346,7 +427,7 @@ class FakeShotgun:
         Returns:
             Dict in Shotgun format (id, type, ...fields)
         """
-        Model = self._model(entity_type)
+        Model = self._writable_model(entity_type)
         # Handle link fields: convert dicts to model instances
         update_data = data.copy()
         for k, v in data.items():
@@ -364,26 +445,149 @@ class FakeShotgun:
         # Remove M2M fields for update
         m2m_fields = [f.name for f in Model._meta.many_to_many]
         m2m_data = {k: update_data.pop(k) for k in m2m_fields if k in update_data}
-        Model.objects.filter(id=entity_id).update(**update_data)
+        from django.db import transaction
+        from api import rollups
+
+        # QuerySet.update() sends no signals: update the rollups and bump the
+        # REST collection version here
+        with transaction.atomic():
+            state = rollups.before_write(Model, [entity_id])
+            Model.objects.filter(id=entity_id).update(**update_data)
+            rollups.after_write(Model, [entity_id], state)
+            apps.get_model("api", "CollectionVersion").bump(Model)
         obj = Model.objects.get(id=entity_id)
         # Set M2M after update
         for k, v in m2m_data.items():
             getattr(obj, k).set(v)
         return self._serialize(obj, return_fields)
 
+    def batch(self, requests: List[Dict[str, Any]]) -> List[Any]:
+        """Shotgun-like batch: run create / update / delete requests in one transaction.
+
+        Each request is {"request_type": "create"|"update"|"delete",
+        "entity_type", "entity_id" (update/delete), "data" (create/update),
+        "return_fields" (create)}.  Returns the result of every request in
+        order; any failure rolls back the whole batch.
+        """
+        from django.db import transaction
+
+        results: List[Any] = []
+        with transaction.atomic():
+            for req in requests:
+                kind = req.get("request_type")
+                if kind == "create":
+                    results.append(self.create(req["entity_type"], dict(req.get("data") or {}), req.get("return_fields")))
+                elif kind == "update":
+                    results.append(self.update(req["entity_type"], req["entity_id"], dict(req.get("data") or {})))
+                elif kind == "delete":
+                    results.append(self.delete(req["entity_type"], req["entity_id"]))
+                else:
+                    raise ValueError(f"Invalid request_type in batch: {kind}")
+        return results
+
+    # ----------------------
+    # summarize
+    # ----------------------
+    _SUMMARY_AGGREGATES = {"count": Count, "sum": Sum, "average": Avg, "min": Min, "max": Max}
+    _GROUP_TRUNCS = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth, "year": TruncYear}
+
+    def _related_model(self, Model, dotted_field: str):
+        """Model the dotted path points to when it ends on a relation, else None."""
+        current = Model
+        for part in dotted_field.split("."):
+            field = current._meta.get_field(part)
+            if not field.is_relation:
+                return None
+            current = field.related_model
+        return current
+
+    def _summaries(self, summary_fields: List[Dict[str, str]]) -> Dict[str, Any]:
+        aggregates = {}
+        for i, spec in enumerate(summary_fields):
+            field = spec.get("field") or spec.get("column")
+            agg = self._SUMMARY_AGGREGATES.get((spec.get("type") or "count").lower())
+            if not field or agg is None:
+                continue
+            aggregates[f"_s{i}"] = agg(field.replace(".", "__"))
+        return aggregates
+
     def summarize(self, entity_type: str, filters: Optional[List] = None,
-                  summary_fields: Optional[List[Dict[str, str]]] = None) -> Any:
+                  summary_fields: Optional[List[Dict[str, str]]] = None,
+                  filter_operator: str = "all",
+                  grouping: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        """ShotGrid-like summarize.
+
+        summary_fields: [{"field": "man_week", "type": "sum"}, ...] ("column" is
+            accepted for "field"); types count / sum / average / min / max.
+        grouping: [{"field": "work_category", "type": "exact", "direction": "asc"}, ...];
+            types exact / day / week / month / year.
+
+        Returns {"summaries": {...}, "groups": [{"group_name", "group_value",
+        "summaries", "groups"}, ...]}.  Every grouping level is one GROUP BY
+        query, so the cost does not depend on the number of rows.
+        """
         Model = self._model(entity_type)
         qs = Model.objects.all()
         if filters:
-            qs = self._apply_filters(qs, filters)
+            qs = self._apply_filters(qs, filters, filter_operator)
         summary_fields = summary_fields or []
-        results = {}
-        for field in summary_fields:
-            column = field.get("column")
-            op = field.get("type", "count")
-            if op == "count":
-                results[column] = qs.aggregate(v=Count(column))["v"]
-            elif op == "sum":
-                results[column] = qs.aggregate(v=Sum(column))["v"]
-        return results
+        aggregates = self._summaries(summary_fields)
+        names = {f"_s{i}": (spec.get("field") or spec.get("column")) for i, spec in enumerate(summary_fields)}
+
+        def _pack(row: Dict[str, Any]) -> Dict[str, Any]:
+            return {names[k]: self._format_value(row.get(k)) for k in aggregates}
+
+        result: Dict[str, Any] = {"summaries": _pack(qs.aggregate(**aggregates)) if aggregates else {}, "groups": []}
+        if not grouping:
+            return result
+
+        # Group key expressions and link resolvers per level
+        keys: List[str] = []
+        annotations: Dict[str, Any] = {}
+        related: List[Any] = []
+        for i, spec in enumerate(grouping):
+            lookup = spec["field"].replace(".", "__")
+            trunc = self._GROUP_TRUNCS.get((spec.get("type") or "exact").lower())
+            key = f"_g{i}"
+            annotations[key] = trunc(lookup) if trunc else F(lookup)
+            keys.append(key)
+            related.append(None if trunc else self._related_model(Model, spec["field"]))
+        grouped = qs.annotate(**annotations)
+
+        # One query per level: level n is grouped by the first n+1 keys
+        levels: List[List[Dict[str, Any]]] = []
+        for depth in range(len(keys)):
+            levels.append(list(grouped.values(*keys[:depth + 1]).annotate(**aggregates).order_by(*keys[:depth + 1])))
+
+        # Resolve link values (one query per related model)
+        links: List[Dict[Any, Dict[str, Any]]] = []
+        for depth, RelModel in enumerate(related):
+            if RelModel is None:
+                links.append({})
+                continue
+            ids = {row[keys[depth]] for row in levels[depth] if row[keys[depth]] is not None}
+            links.append({pk: self._to_link(obj) for pk, obj in RelModel.objects.in_bulk(ids).items()})
+
+        def _group(depth: int, value: Any) -> Dict[str, Any]:
+            if related[depth] is not None:
+                link = links[depth].get(value)
+                return {"group_name": link["name"] if link else "", "group_value": link}
+            formatted = self._format_value(value)
+            return {"group_name": "" if formatted is None else str(formatted), "group_value": formatted}
+
+        index: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        for depth, rows in enumerate(levels):
+            for row in rows:
+                path = tuple(row[k] for k in keys[:depth + 1])
+                node = _group(depth, path[-1])
+                node["summaries"] = _pack(row)
+                node["groups"] = []
+                index[path] = node
+                parent = index[path[:-1]]["groups"] if depth else result["groups"]
+                parent.append(node)
+
+        for depth, spec in enumerate(grouping):
+            if (spec.get("direction") or "asc").lower() == "desc":
+                for node in [n for p, n in index.items() if len(p) == depth] if depth else [result]:
+                    node["groups"].reverse()
+        return result
@@ -3,7 +3,7 @@ import { useEffect } from "react";
 import { useAppContext } from "./context/AppContext";
 import { useFilterContext } from "./context/FilterContext";
 import { useDialogContext } from "./context/DialogContext";
-import { initLoad, channelReady } from "./api/bridgeApi";
+import { initLoad, channelReady, onPageRefreshed, onEntitiesChanged } from "./api/bridgeApi";
 
 
 const Initializer = () => {
@@ -17,6 +17,7 @@ const Initializer = () => {
     setSelectedPersonList,
     setSelectedSubprojectId,
     setCurrentUser,
+    applyEntityChanges,
   } = useAppContext();
 
   const { setFilters } = useFilterContext();
@@ -56,6 +57,42 @@ const Initializer = () => {
     fetchInitialData();
   }, []);
 
+  // 作成・更新・削除やバックグラウンド同期による変更を差分で反映
+  useEffect(() => {
+    let unsubscribe: (() => void) | undefined;
+    let disposed = false;
+    onEntitiesChanged((changes) => applyEntityChanges(changes || [])).then((fn) => {
+      if (disposed) fn();
+      else unsubscribe = fn;
+    });
+    return () => {
+      disposed = true;
+      unsubscribe && unsubscribe();
+    };
+  }, [applyEntityChanges]);
+
+  // initLoadがローカルスナップショットを返した場合、バックグラウンド更新結果を反映
+  useEffect(() => {
+    let unsubscribe: (() => void) | undefined;
+    let disposed = false;
+    onPageRefreshed((key, data) => {
+      if (!key.startsWith("init_load:") || !data || data.offline) return;
+      addSteps(data.steps || []);
+      addSubprojects(data.subprojects || []);
+      addPhases(data.phases || []);
+      addPeople(data.person || []);
+      setWorkCategories(data.workCategories || []);
+      if (data.currentUser) setCurrentUser(data.currentUser);
+    }).then((fn) => {
+      if (disposed) fn();
+      else unsubscribe = fn;
+    });
+    return () => {
+      disposed = true;
+      unsubscribe && unsubscribe();
+    };
+  }, []);
+
   return null;
 };
 
@@ -1,7 +1,7 @@
 // Utilities for accessing the Qt WebChannel dataBridge object.
 // Always `await channelReady` before calling any bridge API.
 
-import { IAsset, ITask ,IPhase, IPMMWorkload, IPersonWorkload} from "../context/AppContext";
+import { IAsset, ITask ,IPhase, IPMMWorkload, IPersonWorkload, IEntityChange} from "../context/AppContext";
 type BridgeObject = any;
 
 let bridgePromise: Promise<BridgeObject | null> | null = null;
@@ -67,6 +67,37 @@ async function callBridge(method: string, ...args: any[]): Promise<any> {
   return bridge[method](...args);
 }
 
+/**
+ * Subscribe to background refreshes of snapshot-backed pages
+ * (`init_load:<parameters>`, `project_page:<id>`). The `init_load` payload
+ * carries the same selectedSubprojectId / selectedPersonList / filters as
+ * initLoad. Returns an unsubscribe function.
+ */
+export async function onPageRefreshed(handler: (key: string, data: any) => void): Promise<() => void> {
+  await channelReady;
+  const bridge = await getBridge();
+  if (!bridge || !bridge.pageRefreshed) {
+    return () => {};
+  }
+  bridge.pageRefreshed.connect(handler);
+  return () => bridge.pageRefreshed.disconnect(handler);
+}
+
+/**
+ * Subscribe to entity change events pushed by the bridge after
+ * create/update/delete calls and background refreshes.
+ * Returns an unsubscribe function.
+ */
+export async function onEntitiesChanged(handler: (changes: IEntityChange[]) => void): Promise<() => void> {
+  await channelReady;
+  const bridge = await getBridge();
+  if (!bridge || !bridge.entitiesChanged) {
+    return () => {};
+  }
+  bridge.entitiesChanged.connect(handler);
+  return () => bridge.entitiesChanged.disconnect(handler);
+}
+
 // Initial bulk load: steps + data for all three pages
 export function initLoad() {
   console.log("call initLoad");
@@ -128,6 +159,31 @@ export function fetchAssignmentWorkloads(startIso: string, endIso: string) {
   });
 }
 
+// Per-person weekly totals above a threshold, grouped by the backend
+export interface IOverAllocationOptions {
+  startIso: string;
+  endIso: string;
+  threshold?: number;
+  personIds?: number[];
+  departmentIds?: number[];
+}
+
+export interface IOverAllocation {
+  person: { id: number; name: string };
+  week: string;
+  total: number;
+  excess: number;
+}
+
+export function fetchOverAllocations(options: IOverAllocationOptions): Promise<{ range: [string, string]; threshold: number; rows: IOverAllocation[] }> {
+  return callBridge('fetchOverAllocations', JSON.stringify(options)).then((res) => {
+    if (res && res.error) {
+      throw new Error(res.message || 'DB Error');
+    }
+    return res;
+  });
+}
+
 export function fetchSteps() {
   console.log("call fetchSteps");
   return callBridge('fetchSteps');
@@ -162,6 +218,39 @@ export function deleteEntity(type: string, id: number) {
   });
 }
 
+export interface IDeleteImpact {
+  found: boolean;
+  /** rows per entity type, including the entity itself */
+  deleted: Record<string, number>;
+  /** rows whose link is cleared (FK) or that lose M2M links, keyed "Type.field" */
+  updated: Record<string, number>;
+  /** deleteEntityCascade only: ids removed, and ids kept but changed (link cleared / M2M links lost) */
+  ids?: { deleted: Record<string, number[]>; changed: Record<string, number[]> };
+}
+
+/** previewDelete / deleteEntityCascade exist only on the dummy backends: offer them only when this is true */
+export function supportsCascadeDelete(): Promise<boolean> {
+  return callBridge('supportsCascadeDelete').then((res) => Boolean(res && res.supported));
+}
+
+export function previewDelete(type: string, id: number): Promise<IDeleteImpact> {
+  return callBridge('previewDelete', type, id).then((res) => {
+    if (!res || res.success === false) {
+      throw new Error((res && res.error) || 'DB Error');
+    }
+    return res;
+  });
+}
+
+export function deleteEntityCascade(type: string, id: number): Promise<IDeleteImpact> {
+  return callBridge('deleteEntityCascade', type, id).then((res) => {
+    if (!res || (res.success === false && res.error)) {
+      throw new Error((res && res.error) || 'DB Error');
+    }
+    return res;
+  });
+}
+
 export async function createEntities<T extends object>(dataArr: Partial<T>[]): Promise<T[]> {
   console.log("call createEntities", dataArr);
   const dataStr = JSON.stringify(dataArr);
@@ -207,13 +296,78 @@ export function openFlowPtUrl(assetId: number) {
   return callBridge('openFlowPtUrl', assetId);
 }
 
+// --- Background exports ---
+export interface IExportProgress {
+  jobId: string;
+  kind?: string;
+  stage: string;
+  done: number;
+  total: number;
+}
+
+/**
+ * Start an export slot and wait for its exportFinished signal.
+ * The slot returns `{ success, jobId, path }` right after the save dialog;
+ * progress is reported through `onProgress` until the job finishes.
+ * Resolves with the exporter result (`{ success, path }` or `{ success: false, error }`).
+ */
+async function runExportJob(method: string, args: string | any[], onProgress?: (p: IExportProgress) => void): Promise<any> {
+  const callArgs = Array.isArray(args) ? args : [args];
+  await channelReady;
+  const bridge = await getBridge();
+  if (!bridge || !bridge.exportFinished) {
+    return callBridge(method, ...callArgs);
+  }
+  let jobId: string | null = null;
+  // Results that arrive before the slot returned its job id
+  const early: Record<string, any> = {};
+  let resolveFinished: (res: any) => void = () => {};
+  const finished = new Promise<any>((resolve) => { resolveFinished = resolve; });
+  const handleFinished = (id: string, res: any) => {
+    if (jobId === null) {
+      early[id] = res;
+    } else if (id === jobId) {
+      resolveFinished(res);
+    }
+  };
+  const handleProgress = (id: string, info: any) => {
+    if (onProgress && id === jobId) {
+      onProgress({ jobId: id, ...info });
+    }
+  };
+  bridge.exportFinished.connect(handleFinished);
+  bridge.exportProgress.connect(handleProgress);
+  try {
+    const started = await callBridge(method, ...callArgs);
+    if (!started || !started.jobId) {
+      // Dialog canceled or validation error
+      return started;
+    }
+    jobId = started.jobId as string;
+    if (onProgress) {
+      onProgress({ jobId, stage: 'started', done: 0, total: 0 });
+    }
+    if (early[jobId] !== undefined) {
+      return early[jobId];
+    }
+    return await finished;
+  } finally {
+    bridge.exportFinished.disconnect(handleFinished);
+    bridge.exportProgress.disconnect(handleProgress);
+  }
+}
+
+export function cancelExport(jobId: string) {
+  return callBridge('cancelExport', jobId);
+}
+
 // --- Export: PMM Workloads CSV ---
 export function exportPMMWorkloadsCSV(payload: {
   subproject: { id: number; name?: string };
   records: IPMMWorkload[];
-}) {
+}, onProgress?: (p: IExportProgress) => void) {
   const dataStr = JSON.stringify(payload);
-  return callBridge('exportPMMWorkloadsCSV', dataStr).then((res) => {
+  return runExportJob('exportPMMWorkloadsCSV', dataStr, onProgress).then((res) => {
     if (res && res.error) {
       throw new Error(res.error || 'Export Error');
     }
@@ -226,12 +380,100 @@ export function exportPMMWorkloadsXlsx(payload: {
   subproject: { id: number; name?: string };
   records: IPMMWorkload[];
   phases?: IPhase[];
-}) {
+  /** patch an earlier export of the same file in place (keeps a .pmm-state.json next to it); default off */
+  incremental?: boolean;
+}, onProgress?: (p: IExportProgress) => void) {
   const dataStr = JSON.stringify(payload);
-  return callBridge('exportPMMWorkloadsXlsx', dataStr).then((res) => {
+  return runExportJob('exportPMMWorkloadsXlsx', dataStr, onProgress).then((res) => {
+    if (res && res.error) {
+      throw new Error(res.error || 'Export Error');
+    }
+    return res;
+  });
+}
+
+// --- Export: PMM Workloads read from the backend (only the subproject id is sent) ---
+export function exportSubprojectPMMXlsx(subprojectId: number, startIso?: string, endIso?: string,
+  onProgress?: (p: IExportProgress) => void, options?: { incremental?: boolean }) {
+  const args = [subprojectId, startIso || '', endIso || '', Boolean(options && options.incremental)];
+  return runExportJob('exportSubprojectPMMXlsx', args, onProgress).then((res) => {
     if (res && res.error) {
       throw new Error(res.error || 'Export Error');
     }
     return res;
   });
-}
\ No newline at end of file
+}
+
+export function exportSubprojectPMMCSV(subprojectId: number, startIso?: string, endIso?: string,
+  onProgress?: (p: IExportProgress) => void) {
+  return runExportJob('exportSubprojectPMMCSV', [subprojectId, startIso || '', endIso || ''], onProgress).then((res) => {
+    if (res && res.error) {
+      throw new Error(res.error || 'Export Error');
+    }
+    return res;
+  });
+}
+
+// --- Export: PMM Workloads for several subprojects (folder or zip) ---
+export function exportPMMWorkloadsBulk(subprojectIds: number[], asZip: boolean, onProgress?: (p: IExportProgress) => void) {
+  const dataStr = JSON.stringify({ subprojectIds, zip: asZip });
+  return runExportJob('exportPMMWorkloadsBulk', dataStr, onProgress).then((res) => {
+    if (res && res.error) {
+      throw new Error(res.error || 'Export Error');
+    }
+    return res;
+  });
+}
+
+// --- Export: Assignment person x week workload table ---
+export interface IPersonWorkloadExportOptions {
+  startIso: string;
+  endIso: string;
+  personIds?: number[];
+  groupBy?: 'task' | 'subproject';
+  format?: 'xlsx' | 'csv';
+}
+
+export function exportPersonWorkloads(options: IPersonWorkloadExportOptions, onProgress?: (p: IExportProgress) => void) {
+  return runExportJob('exportPersonWorkloads', JSON.stringify(options), onProgress).then((res) => {
+    if (res && res.error) {
+      throw new Error(res.error || 'Export Error');
+    }
+    return res;
+  });
+}
+
+// --- Perf instrumentation ---
+export function getPerfStats() {
+  return callBridge('getPerfStats');
+}
+
+export function setPerfEnabled(enabled: boolean) {
+  return callBridge('setPerfEnabled', enabled);
+}
+
+export function resetPerfStats() {
+  return callBridge('resetPerfStats');
+}
+
+// --- Batched calls ---
+export interface IBatchCall {
+  method: string;
+  args?: any[];
+}
+
+export interface IBatchResult {
+  success: boolean;
+  error?: string;
+  failedIndex?: number;
+  results: { ok: boolean; result?: any; error?: string }[];
+}
+
+/**
+ * Run several bridge calls in one QWebChannel round trip.
+ * Writes in the batch are applied atomically when the backend supports it.
+ * Object arguments are sent as-is (no need to JSON.stringify them).
+ */
+export function callBatch(calls: IBatchCall[]): Promise<IBatchResult> {
+  return callBridge('callBatch', JSON.stringify(calls));
+}
@@ -146,6 +146,15 @@ export interface IStep {
     color: string; // "r, g, b"
 }
 
+// bridge.entitiesChanged で通知される変更イベント
+export interface IEntityChange {
+    op: "create" | "update" | "delete";
+    type: string;
+    id: number;
+    fields: string[];
+    data: any | null;
+}
+
 export interface IAppContext {
     steps: IStep[];
     addSteps: (steps: IStep[]) => void;
@@ -203,6 +212,8 @@ export interface IAppContext {
 
     isEditMode: boolean;
     setEditMode: (enabled: boolean) => void;
+
+    applyEntityChanges: (changes: IEntityChange[]) => void;
 }
 
 const defaultParams: IAppContext = {
@@ -248,6 +259,7 @@ const defaultParams: IAppContext = {
     setCurrentPage: () => {},
     isEditMode: false,
     setEditMode: () => {},
+    applyEntityChanges: () => {},
 };
 
 const AppContext = createContext<IAppContext>({
@@ -466,6 +478,52 @@ export const AppProvider = ({ children }: { children: ReactNode }) => {
         setMilestoneTasks((prev) => prev.filter((m) => m.id !== id));
     }, []);
 
+    // bridgeからの変更イベントをまとめて反映（ページ再取得なし）
+    const applyEntityChanges = useCallback((changes: IEntityChange[]) => {
+        const upserts: Record<string, any[]> = {};
+        const removals: Record<string, Set<number>> = {};
+        changes.forEach((c) => {
+            if (c.op === "delete") {
+                if (!removals[c.type]) removals[c.type] = new Set<number>();
+                removals[c.type].add(c.id);
+            } else if (c.data) {
+                if (!upserts[c.type]) upserts[c.type] = [];
+                upserts[c.type].push(c.data);
+            }
+        });
+        const adders: Record<string, (items: any[]) => void> = {
+            Step: addSteps,
+            Subproject: addSubprojects,
+            Phase: addPhases,
+            Asset: addAssets,
+            Task: addTasks,
+            MilestoneTask: addMilestoneTasks,
+            PersonWorkload: addPersonWorkloads,
+            PMMWorkload: addPMMWorkloads,
+            Person: addPeople,
+        };
+        const setters: Record<string, React.Dispatch<React.SetStateAction<any[]>>> = {
+            Step: setSteps,
+            Subproject: setSubprojects,
+            Phase: setPhases,
+            Asset: setAssets,
+            Task: setTasks,
+            MilestoneTask: setMilestoneTasks,
+            PersonWorkload: setPersonWorkloads,
+            PMMWorkload: setPMMWorkloads,
+            Person: setPeople,
+        };
+        Object.keys(upserts).forEach((type) => {
+            const add = adders[type];
+            if (add) add(upserts[type]);
+        });
+        Object.keys(removals).forEach((type) => {
+            const set = setters[type];
+            const ids = removals[type];
+            if (set) set((prev) => prev.filter((e) => !ids.has(e.id)));
+        });
+    }, [addSteps, addSubprojects, addPhases, addAssets, addTasks, addMilestoneTasks, addPersonWorkloads, addPMMWorkloads, addPeople]);
+
     return (
         <AppContext.Provider
             value={{
@@ -511,6 +569,7 @@ export const AppProvider = ({ children }: { children: ReactNode }) => {
                 setCurrentPage,
                 isEditMode,
                 setEditMode,
+                applyEntityChanges,
             }}
         >
             {children}
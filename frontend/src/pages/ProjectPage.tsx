@@ -4,7 +4,7 @@ import RefreshIcon from '@mui/icons-material/Refresh';
 import { Main } from "../components/StyledComponents";
 import { useAppContext, IPerson } from "../context/AppContext";
 import ErrorBoundary from "../components/ErrorBoundary";
-import { fetchProjectPage, acquireEditLock, heartbeatEditLock, releaseEditLock } from "../api/bridgeApi";
+import { fetchProjectPage, acquireEditLock, heartbeatEditLock, releaseEditLock, onPageRefreshed } from "../api/bridgeApi";
 import AssetTab from "../pages/projectPageTabs/AssetTab";
 import TaskTab from "../pages/projectPageTabs/TaskTab";
 import WorkloadTab from "../pages/projectPageTabs/WorkloadTab";
@@ -195,6 +195,29 @@ const ProjectPage: React.FC = () => {
     fetchData();
   }, [fetchData]);
 
+  // ローカルスナップショット表示後のバックグラウンド更新を反映
+  useEffect(() => {
+    if (!selectedSubprojectId) return;
+    let unsubscribe: (() => void) | undefined;
+    let disposed = false;
+    onPageRefreshed((key, data) => {
+      if (key !== `project_page:${selectedSubprojectId}` || !data || data.offline) return;
+      addPhases(data.phases || []);
+      addAssets(data.assets || []);
+      addTasks(data.tasks || []);
+      addMilestoneTasks(data.milestoneTasks || []);
+      addPersonWorkloads(data.personworkloads || []);
+      addPMMWorkloads(data.pmmworkloads || []);
+    }).then((fn) => {
+      if (disposed) fn();
+      else unsubscribe = fn;
+    });
+    return () => {
+      disposed = true;
+      unsubscribe && unsubscribe();
+    };
+  }, [selectedSubprojectId, addPhases, addAssets, addTasks, addMilestoneTasks, addPersonWorkloads, addPMMWorkloads]);
+
   // --- サブプロジェクト関連データのフィルタリング ---
   const currentSubproject = subprojects.find(sp => sp.id === selectedSubprojectId);
   // Phase
@@ -10,13 +10,16 @@ import {
 	Box,
 	IconButton,
 	Tooltip,
+	Button,
+	CircularProgress,
+	Typography,
 } from "@mui/material";
 import { ExpandMore, ChevronRight } from "@mui/icons-material";
 import RefreshIcon from '@mui/icons-material/Refresh';
 import DateRangeFilter from "../../components/filters/DateRangeFilter";
 import { CollapsibleFilterPanel, CheckboxFilter } from "../../components/filters";
 import { useFilterContext } from "../../context/FilterContext";
-import { fetchAssignmentWorkloads } from "../../api/bridgeApi";
+import { fetchAssignmentWorkloads, exportPersonWorkloads, cancelExport, IExportProgress } from "../../api/bridgeApi";
 import { useAppContext } from "../../context/AppContext";
 import { useDialogContext } from "../../context/DialogContext";
 
@@ -29,6 +32,8 @@ const AssinmentWorkload: React.FC = () => {
 	const groupsPageKey = "assignment:workload:groups"; // Department filter for people
 	const debounceRef = useRef<number | undefined>(undefined);
 	const [expandedPersons, setExpandedPersons] = useState<Set<number>>(new Set());
+	const [exporting, setExporting] = useState(false);
+	const [exportProgress, setExportProgress] = useState<IExportProgress | null>(null);
 
 
 	const itemsDateRange = filters[itemsPageKey]?.dateRange;
@@ -193,6 +198,35 @@ const AssinmentWorkload: React.FC = () => {
 		return getFilteredData(groupsPageKey, sorted);
 	}, [people, getFilteredData, groupsFilter]);
 
+	// Export: 表示中の期間・人（部署フィルタ後）を Person x Subproject x Week で書き出す
+	const handleExport = async () => {
+		if (!itemsStart || !itemsEnd) return;
+		try {
+			setExporting(true);
+			const res = await exportPersonWorkloads({
+				startIso: itemsStart,
+				endIso: itemsEnd,
+				personIds: peopleFiltered.map(p => p.id),
+				groupBy: 'subproject',
+			}, setExportProgress);
+			if (res && res.success) {
+				openDialog({ title: "Export Complete", message: `Saved to:\n${res.path}`, okText: "OK" });
+			} else if (!(res && res.cancelled) && !(res && res.error === 'canceled')) {
+				openDialog({ title: "Export Failed", message: (res && res.error) || "Failed to export.", okText: "OK" });
+			}
+		} catch (e: any) {
+			if (e?.message !== 'canceled') {
+				openDialog({ title: "Export Failed", message: e?.message || String(e), okText: "OK" });
+			}
+		} finally {
+			setExporting(false);
+			setExportProgress(null);
+		}
+	};
+	const exportProgressLabel = exportProgress && exportProgress.total > 0
+		? `${exportProgress.stage} ${exportProgress.done}/${exportProgress.total}`
+		: exportProgress?.stage;
+
 	return (
 		<Box sx={{ display: 'flex', flexDirection: 'column', width: '100%', height: '100vh', overflow: 'hidden' }}>
 			<Box sx={{ display: 'flex', alignItems: 'center', gap: 1, mb: 2, flexShrink: 0 }}>
@@ -215,6 +249,15 @@ const AssinmentWorkload: React.FC = () => {
 						</IconButton>
 					</span>
 				</Tooltip>
+				<Button variant="contained" color="primary" onClick={handleExport} disabled={exporting || !itemsStart || !itemsEnd}>
+					{exporting ? <><CircularProgress size={16} sx={{ mr: 1 }} />Exporting…</> : 'Export XLSX'}
+				</Button>
+				{exporting && exportProgress && (
+					<>
+						<Typography variant="caption">{exportProgressLabel}</Typography>
+						<Button size="small" onClick={() => cancelExport(exportProgress.jobId)}>Cancel</Button>
+					</>
+				)}
 				{/* 右上: 行に作用するフィルタ群 */}
 				<Box sx={{ ml: 'auto' }}>
 					<CollapsibleFilterPanel pageKey={groupsPageKey}>
@@ -13,7 +13,8 @@ import { useDialogContext } from "../../context/DialogContext";
 
 // 型定義
 import type { IPhase, IAsset, ITask, IForignKey, IPersonWorkload, IPMMWorkload, IPerson, IWorkCategory, ISubproject } from "../../context/AppContext";
-import { updateEntity, createEntity, exportPMMWorkloadsXlsx } from "../../api/bridgeApi";
+import { updateEntity, createEntity, exportSubprojectPMMXlsx, cancelExport } from "../../api/bridgeApi";
+import type { IExportProgress } from "../../api/bridgeApi";
 
 interface WorkloadTabProps {
   phases: IPhase[];
@@ -37,6 +38,7 @@ const WorkloadTab: React.FC<WorkloadTabProps> = ({ phases, assets, tasks, person
   const { openDialog } = useDialogContext();
   // Exporting state must be declared before any early return
   const [exporting, setExporting] = React.useState(false);
+  const [exportProgress, setExportProgress] = React.useState<IExportProgress | null>(null);
 
   const selectedWorkCategoryName = filters[assetFilterKey]?.dropdown?.["work_category.name"]?.[0];
   const selectedWorkCategory: IForignKey = {
@@ -126,12 +128,9 @@ const WorkloadTab: React.FC<WorkloadTabProps> = ({ phases, assets, tasks, person
       }
       try {
         setExporting(true);
-        const res = await exportPMMWorkloadsXlsx({
-          subproject: { id: currentSubproject.id, name: currentSubproject.name },
-          records,
-          phases: phases.filter(p => p.subproject?.id === currentSubproject.id),
-        });
-        console.log("exportPMMWorkloadsXlsx res:", res, res.success);
+        // Records and phases are read from the backend; only the id crosses the bridge
+        const res = await exportSubprojectPMMXlsx(currentSubproject.id, undefined, undefined, setExportProgress);
+        console.log("exportSubprojectPMMXlsx res:", res, res.success);
         if (res && res.success) {
           openDialog({ title: 'Export Complete', message: `Saved to:\n${res.path}`, okText: 'OK' });
         } else {
@@ -142,12 +141,24 @@ const WorkloadTab: React.FC<WorkloadTabProps> = ({ phases, assets, tasks, person
         openDialog({ title: 'Export Failed', message: e?.message || String(e), okText: 'OK' });
       } finally {
         setExporting(false);
+        setExportProgress(null);
       }
     };
+    const progressLabel = exportProgress && exportProgress.total > 0
+      ? `${exportProgress.stage} ${exportProgress.done}/${exportProgress.total}`
+      : exportProgress?.stage;
     return (
-      <Button variant="contained" color="primary" onClick={handleExport} disabled={disabled}>
-        {exporting ? <><CircularProgress size={16} sx={{ mr: 1 }} />Exporting…</> : 'Export XLSX'}
-      </Button>
+      <Box sx={{ display: 'flex', alignItems: 'center', gap: 1 }}>
+        <Button variant="contained" color="primary" onClick={handleExport} disabled={disabled}>
+          {exporting ? <><CircularProgress size={16} sx={{ mr: 1 }} />Exporting…</> : 'Export XLSX'}
+        </Button>
+        {exporting && exportProgress && (
+          <>
+            <Typography variant="caption">{progressLabel}</Typography>
+            <Button size="small" onClick={() => cancelExport(exportProgress.jobId)}>Cancel</Button>
+          </>
+        )}
+      </Box>
     );
   };
   // 展開トグル
@@ -1,10 +1,228 @@
-"""Abstraction layer for Shotgun API or local fake implementation."""
+"""Abstraction layer for Shotgun API or local fake implementation.
+
+Backends of :class:`ShotgunClient`:
+
+- ``USE_DUMMY_SHOTGUN=1`` (default): :class:`FakeShotgun` in-process (Django).
+- ``USE_DUMMY_SHOTGUN=1`` and ``DUMMY_SHOTGUN_URL=http://127.0.0.1:8000``
+  (or ``base_url``): :class:`HttpShotgun`, the dummy server's ShotGrid-style
+  JSON RPC endpoint over HTTP, without Django in this process.
+- ``USE_DUMMY_SHOTGUN=0``: ``shotgun_api3.Shotgun``.
+"""
 from __future__ import annotations
 
+import contextlib
+import datetime
+import decimal
+import http.client
+import json
 import os
-from typing import Any, Dict, List, Optional
+import queue
+import urllib.parse
+from typing import Any, ContextManager, Dict, List, Optional, Tuple
+
+
+class RpcFault(Exception):
+    """Error answered by the JSON RPC endpoint (``exception`` in the response)."""
+
+    def __init__(self, message: str, code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP connections shared by threads.
+
+    A call takes an idle connection (or opens one) and puts it back once the
+    response is read, so sequential calls reuse one TCP connection and
+    concurrent calls get up to ``size`` kept-alive ones.  A request failing
+    on a reused connection (closed by the server while idle) is retried once
+    on a new one.
+    """
+
+    def __init__(self, url: str, size: int = 8, timeout: float = 60.0) -> None:
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Invalid server URL: {url}")
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port
+        self._timeout = timeout
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(maxsize=size)
+
+    def _connect(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        return cls(self._host, self._port, timeout=self._timeout)
+
+    def request(self, method: str, path: str, body: bytes, headers: Dict[str, str]) -> Tuple[int, bytes]:
+        for attempt in range(2):
+            try:
+                conn, reused = self._idle.get_nowait(), True
+            except queue.Empty:
+                conn, reused = self._connect(), False
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (http.client.RemoteDisconnected, ConnectionError):
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                try:
+                    self._idle.put_nowait(conn)
+                except queue.Full:
+                    conn.close()
+            return resp.status, data
+        raise ConnectionError("unreachable")
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class HttpShotgun:
+    """Shotgun-like client of the dummy server's ``/api3/json`` endpoint.
+
+    Requests use the ShotGrid API wire format (``method_name`` + ``params``,
+    filters as ``logical_operator`` / ``conditions``), ``find`` pages through
+    results ``ENTITIES_PER_PAGE`` at a time like ``shotgun_api3`` does.
+    """
+
+    ENTITIES_PER_PAGE = 500
+    RPC_PATH = "/api3/json"
+
+    def __init__(self, base_url: str, script_name: Optional[str] = None, api_key: Optional[str] = None,
+                 pool_size: int = 8, timeout: float = 60.0) -> None:
+        self._pool = _ConnectionPool(base_url, size=pool_size, timeout=timeout)
+        self._path = urllib.parse.urlsplit(base_url).path.rstrip("/") + self.RPC_PATH
+        self._auth = {"script_name": script_name, "script_key": api_key}
+
+    def _call_rpc(self, method: str, params: Any) -> Any:
+        body = json.dumps({"method_name": method, "params": [self._auth, params]},
+                          default=_json_default, separators=(",", ":")).encode("utf-8")
+        status, data = self._pool.request("POST", self._path, body, {
+            "Content-Type": "application/json; charset=utf-8",
+            "Accept": "application/json",
+        })
+        try:
+            response = json.loads(data or b"null")
+        except ValueError:
+            raise RpcFault(f"HTTP {status}: {data[:200]!r}")
+        if isinstance(response, dict) and response.get("exception"):
+            raise RpcFault(response.get("message") or f"HTTP {status}", response.get("error_code"))
+        if status >= 400:
+            raise RpcFault(f"HTTP {status}")
+        return response.get("results")
+
+    @classmethod
+    def _translate_filters(cls, filters: List, filter_operator: Optional[str] = None) -> Dict[str, Any]:
+        """``[[path, relation, value], {"filter_operator", "filters"}, ...]`` to the wire format."""
+        conditions = []
+        for f in filters or []:
+            if isinstance(f, dict):
+                conditions.append(cls._translate_filters(f.get("filters") or [], f.get("filter_operator")))
+                continue
+            if len(f) == 2:
+                path, relation, values = f[0], "is", [f[1]]
+            else:
+                path, relation, values = f[0], f[1], list(f[2:])
+                if len(values) == 1 and isinstance(values[0], (list, tuple)):
+                    values = list(values[0])
+            conditions.append({"path": path, "relation": relation, "values": values})
+        operator = "or" if (filter_operator or "all").lower() in ("any", "or") else "and"
+        return {"logical_operator": operator, "conditions": conditions}
 
-from django.apps import apps
+    @staticmethod
+    def _fields(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{"field_name": k, "value": v} for k, v in data.items()]
+
+    def find(self, entity_type: str, filters: Optional[List] = None, fields: Optional[List[str]] = None,
+             order: Optional[List[Dict[str, str]]] = None, filter_operator: Optional[str] = None,
+             limit: int = 0, page: int = 0) -> List[Dict[str, Any]]:
+        per_page = min(limit, self.ENTITIES_PER_PAGE) if limit else self.ENTITIES_PER_PAGE
+        params: Dict[str, Any] = {
+            "type": entity_type,
+            "return_fields": fields,
+            "filters": self._translate_filters(filters or [], filter_operator),
+            "paging": {"entities_per_page": per_page, "current_page": page or 1},
+        }
+        if order:
+            params["sorts"] = [{"field_name": o.get("field_name") or o.get("field"),
+                                "direction": o.get("direction", "asc")} for o in order]
+        records: List[Dict[str, Any]] = []
+        while True:
+            entities = self._call_rpc("read", params)["entities"]
+            records.extend(entities)
+            # An explicit page is one request, like shotgun_api3
+            if page or len(entities) < per_page or (limit and len(records) >= limit):
+                break
+            params["paging"]["current_page"] += 1
+        return records[:limit] if limit else records
+
+    def find_one(self, entity_type: str, filters: Optional[List] = None,
+                 fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        results = self.find(entity_type, filters, fields, limit=1)
+        return results[0] if results else None
+
+    def create(self, entity_type: str, data: Dict[str, Any], return_fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        return self._call_rpc("create", {"type": entity_type, "fields": self._fields(data),
+                                         "return_fields": return_fields})
+
+    def update(self, entity_type: str, entity_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
+        return self._call_rpc("update", {"type": entity_type, "id": entity_id, "fields": self._fields(data)})
+
+    def delete(self, entity_type: str, entity_id: int) -> bool:
+        return self._call_rpc("delete", {"type": entity_type, "id": entity_id})
+
+    def delete_impact(self, entity_type: str, entity_id: int) -> Dict[str, Any]:
+        return self._call_rpc("delete_impact", {"type": entity_type, "id": entity_id})
+
+    def delete_cascade(self, entity_type: str, entity_id: int) -> Dict[str, Any]:
+        return self._call_rpc("delete_cascade", {"type": entity_type, "id": entity_id})
+
+    def summarize(self, entity_type: str, filters: Optional[List] = None,
+                  summary_fields: Optional[List[Dict[str, str]]] = None,
+                  filter_operator: Optional[str] = None,
+                  grouping: Optional[List[Dict[str, str]]] = None) -> Any:
+        return self._call_rpc("summarize", {
+            "type": entity_type,
+            "filters": self._translate_filters(filters or [], filter_operator),
+            "summaries": summary_fields or [],
+            "grouping": grouping,
+        })
+
+    def batch(self, requests: List[Dict[str, Any]]) -> List[Any]:
+        """Run create / update / delete requests in one server-side transaction."""
+        return self._call_rpc("batch", [
+            {
+                "request_type": r["request_type"],
+                "type": r["entity_type"],
+                **({"id": r["entity_id"]} if "entity_id" in r else {}),
+                **({"fields": self._fields(r["data"])} if "data" in r else {}),
+                **({"return_fields": r["return_fields"]} if r.get("return_fields") else {}),
+            }
+            for r in requests
+        ])
+
+    def close(self) -> None:
+        self._pool.close()
 
 
 class ShotgunClient:
@@ -16,10 +234,17 @@ class ShotgunClient:
                  api_key: Optional[str] = None, use_dummy: bool | None = None) -> None:
         if use_dummy is None:
             use_dummy = os.environ.get("USE_DUMMY_SHOTGUN", "1") == "1"
-        if use_dummy:
+        dummy_url = base_url or os.environ.get("DUMMY_SHOTGUN_URL")
+        if use_dummy and dummy_url:
+            self._impl = HttpShotgun(dummy_url, script_name, api_key)
+            self.supports_transactions = False
+            self.supports_rollups = True
+            self.supports_cascade_delete = True
+        elif use_dummy:
             # When using the local dummy implementation, ensure the Django
             # application registry is initialised before accessing any models.
             import django
+            from django.apps import apps
             if not apps.ready:
                 django.setup()
             try:
@@ -27,9 +252,15 @@ class ShotgunClient:
             except ImportError:
                 from fake_shotgun import FakeShotgun
             self._impl = FakeShotgun()
+            self.supports_transactions = True
+            self.supports_rollups = True
+            self.supports_cascade_delete = True
         else:
             import shotgun_api3
             self._impl = shotgun_api3.Shotgun(base_url, script_name, api_key)
+            self.supports_transactions = False
+            self.supports_rollups = False
+            self.supports_cascade_delete = False
 
     def find(self, entity_type: str, filters: Optional[List] = None,
              fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
@@ -42,11 +273,38 @@ class ShotgunClient:
         return self._impl.update(entity_type, entity_id, data)
 
     def summarize(self, entity_type: str, filters: Optional[List] = None,
-                  summary_fields: Optional[List[Dict[str, str]]] = None) -> Any:
-        return self._impl.summarize(entity_type, filters or [], summary_fields or [])
+                  summary_fields: Optional[List[Dict[str, str]]] = None,
+                  grouping: Optional[List[Dict[str, str]]] = None) -> Any:
+        """Aggregate on the server; ``grouping`` returns nested ``groups`` like ShotGrid."""
+        return self._impl.summarize(entity_type, filters or [], summary_fields or [], grouping=grouping)
     
     def find_one(self, entity_type: str, filters: Optional[List] = None,
                  fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """Find a single entity matching the filters."""
-        results = self._impl.find(entity_type, filters or [], fields or None)
+        results = self._impl.find(entity_type, filters or [], fields or None, limit=1)
         return results[0] if results else None
+
+    def batch(self, requests: List[Dict[str, Any]]) -> List[Any]:
+        """Create / update / delete in one backend request (atomic on the dummy backends)."""
+        return self._impl.batch(requests)
+
+    def delete_impact(self, entity_type: str, entity_id: int) -> Dict[str, Any]:
+        """Rows a cascading delete would remove / unlink per entity type.
+
+        Only on the dummy backends: check ``supports_cascade_delete`` first.
+        """
+        return self._impl.delete_impact(entity_type, entity_id)
+
+    def delete_cascade(self, entity_type: str, entity_id: int) -> Dict[str, Any]:
+        """Delete an entity and its dependents with set-based statements.
+
+        Only on the dummy backends: check ``supports_cascade_delete`` first.
+        """
+        return self._impl.delete_cascade(entity_type, entity_id)
+
+    def transaction(self) -> ContextManager:
+        """Group writes atomically when the backend supports it (dummy/Django only)."""
+        if self.supports_transactions:
+            from django.db import transaction
+            return transaction.atomic()
+        return contextlib.nullcontext()